@@ -15,12 +15,13 @@ logging.getLogger('streamlit.runtime.memory_media_file_storage').setLevel(loggin
 from config import GODOT_BIN, ENCODE_SCRIPT, FAVICON_PATH
 
 # Import utilities
+from core import metrics
+from memory_accounting import admin_authorized, get_memory_logger
 from session_manager import initialize_session_state
 from ui_components import apply_custom_css, render_sidebar
 
-# Import views
-from views.selection import render_selection_view
-from views.editor import render_editor_view
+# Views are imported on their route (see "Route to Appropriate View"),
+# so a page only loads the modules it renders
 
 # =====================================================================
 # Page Configuration
@@ -43,6 +44,12 @@ apply_custom_css()
 # Initialize session state
 initialize_session_state()
 
+# Periodic memory log line (started once per process)
+get_memory_logger()
+
+# Record this run's timing spans for the sidebar debug panel (only this session's toggle)
+metrics.begin_run(record=st.session_state.get("perf_debug", False))
+
 # Render sidebar
 render_sidebar()
 
@@ -52,6 +59,12 @@ render_sidebar()
 
 st.title("Miscrits Sprite Tool")
 
+# Admin: memory accounting across sessions (?admin=memory&token=<MISCRITS_ADMIN_TOKEN>)
+if st.query_params.get("admin") == "memory" and admin_authorized(st.query_params.get("token")):
+    from views.memory_admin import render_memory_admin
+    render_memory_admin()
+    st.stop()
+
 # =====================================================================
 # Linux Permission Fix (Critical for Streamlit Cloud)
 # =====================================================================
@@ -88,8 +101,10 @@ if not ENCODE_SCRIPT.exists():
 current_step = st.session_state.get("step", 1)
 
 if current_step == 1:
+    from views.selection import render_selection_view
     render_selection_view()
 elif current_step == 2:
+    from views.editor import render_editor_view
     render_editor_view()
 else:
     st.error("Unknown step in session state. Resetting.")
@@ -104,4 +119,8 @@ if current_step == 2:
     st.info(
         "💡 These replacements work per cache file. If you clear your sprites folder, "
         "you'll need to place the patched file back in again."
-    )
\ No newline at end of file
+    )
+
+last_run = metrics.end_run()
+if st.session_state.get("perf_debug"):
+    st.session_state["_perf_last_run"] = last_run
\ No newline at end of file
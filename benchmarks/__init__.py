@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Miscrits Sprite Replacer.
+Run from the repository root, e.g. `python -m benchmarks.bench_catalog`.
+"""
@@ -0,0 +1,102 @@
+"""
+Catalog representation benchmark: legacy list-of-dicts vs the compact Catalog.
+
+Measures retained memory of the processed catalog and the latency of a cache hit
+(st.cache_data unpickles a copy per hit, st.cache_resource hands out a reference)
+on a synthetic catalog 10x the size of the real one.
+
+    python -m benchmarks.bench_catalog [--scale 10]
+"""
+import argparse
+import json
+import logging
+import pickle
+import time
+import tracemalloc
+from typing import Dict, List
+
+import streamlit as st
+
+from core.catalog import build_catalog
+from benchmarks.synthetic import REAL_CATALOG_SIZE, make_miscrits
+
+# Caching outside `streamlit run` warns on every call
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+
+def legacy_process(data: List[Dict]) -> List[Dict]:
+    """The previous load_miscrits_from_api processing loop"""
+    processed = []
+    for miscrit in data:
+        names = miscrit.get("names", [miscrit.get("name", "Unknown")])
+        for evo_idx, evo_name in enumerate(names):
+            processed.append({
+                "id": miscrit.get("id"),
+                "base_name": names[0] if names else "Unknown",
+                "evo_stage": evo_idx + 1,
+                "evo_name": evo_name,
+                "total_stages": len(names),
+                "element": miscrit.get("element", "None"),
+                "rarity": miscrit.get("rarity", "Common"),
+                "image": miscrit.get("image"),
+                "locations": miscrit.get("locations", []),
+                "all_names": names,
+            })
+    return processed
+
+
+def retained_bytes(build, raw) -> int:
+    """Bytes still allocated after building (and keeping) the catalog"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(raw)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def hit_latency_us(fn, repeat: int) -> float:
+    fn()  # populate the cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=10, help="multiple of the real catalog size")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Round-trip through JSON so strings are distinct objects, as with a real response
+    raw = json.loads(json.dumps(make_miscrits(REAL_CATALOG_SIZE * args.scale, abilities=0)))
+
+    legacy_mem = retained_bytes(legacy_process, raw)
+    compact_mem = retained_bytes(build_catalog, raw)
+
+    legacy = legacy_process(raw)
+    compact = build_catalog(raw)
+
+    @st.cache_data
+    def legacy_cached():
+        return legacy
+
+    @st.cache_resource
+    def compact_cached():
+        return compact
+
+    legacy_hit = hit_latency_us(legacy_cached, args.repeat)
+    compact_hit = hit_latency_us(compact_cached, args.repeat)
+
+    print(f"Synthetic catalog: {len(raw)} Miscrits, {len(compact)} stages ({args.scale}x real)")
+    print(f"{'':<16}{'retained':>14}{'pickled':>14}{'cache hit':>14}")
+    print(f"{'list-of-dicts':<16}{legacy_mem / 1e6:>11.2f} MB"
+          f"{len(pickle.dumps(legacy)) / 1e6:>11.2f} MB{legacy_hit:>11.0f} us")
+    print(f"{'Catalog':<16}{compact_mem / 1e6:>11.2f} MB"
+          f"{len(pickle.dumps(compact)) / 1e6:>11.2f} MB{compact_hit:>11.0f} us")
+
+
+if __name__ == "__main__":
+    main()
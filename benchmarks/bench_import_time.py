@@ -0,0 +1,98 @@
+"""
+Import-time budget: cold import cost of the core library, the views and app startup.
+
+Each target is imported in a fresh interpreter (best of --repeat runs). core.* and the
+command-line tools must also stay Streamlit-free. "app" is one AppTest run of app.py
+(script startup up to the first rendered page). Exits 1 when a target is over budget.
+
+    python -m benchmarks.bench_import_time [--repeat 5] [--json results.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets in milliseconds (cold import on a developer machine)
+BUDGETS_MS = {
+    "core.catalog": 30,
+    "core.fetch": 40,
+    "core.image": 80,
+    "core.encode": 40,
+    "core.catalog_store": 250,
+    "core.jobs": 40,
+    "core.scratch": 30,
+    "core.blobs": 30,
+    "core.metrics": 30,
+    "core.memory": 30,
+    "patch_miscrits": 80,
+    "build_sprite_pack": 150,
+    "views.selection": 800,
+    "views.moves_editor": 800,
+    "app": 1500,
+}
+
+# Must not pull in streamlit
+STREAMLIT_FREE = (
+    "core.catalog", "core.fetch", "core.image", "core.encode", "core.catalog_store",
+    "core.jobs", "core.scratch", "core.blobs", "core.metrics",
+    "core.memory",
+    "patch_miscrits", "build_sprite_pack",
+)
+
+_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, "streamlit" in sys.modules)
+"""
+
+_APP_PROBE = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+AppTest.from_file({app!r}, default_timeout=60).run()
+print(time.perf_counter() - start, True)
+"""
+
+
+def measure(target: str) -> tuple:
+    """(seconds, imported streamlit) for one cold run in a fresh interpreter"""
+    if target == "app":
+        code = _APP_PROBE.format(app=str(ROOT / "app.py"))
+    else:
+        code = _IMPORT_PROBE.format(module=target)
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[-2]), out[-1] == "True"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="write results here as JSON")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    for target, budget in BUDGETS_MS.items():
+        runs = [measure(target) for _ in range(args.repeat)]
+        best_ms = min(secs for secs, _ in runs) * 1000
+        leaks = target in STREAMLIT_FREE and any(st for _, st in runs)
+        ok = best_ms <= budget and not leaks
+        failed |= not ok
+        results.append({"target": target, "ms": round(best_ms, 1), "budget_ms": budget,
+                        "imports_streamlit": any(st for _, st in runs), "ok": ok})
+        note = "  (imports streamlit!)" if leaks else ""
+        print(f"{target:<20} {best_ms:8.1f} ms  budget {budget:5d} ms  {'ok' if ok else 'OVER'}{note}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,524 @@
+"""
+Load test: N concurrent sessions running scripted user flows against a real app server.
+
+Starts `streamlit run app.py` against the stand-in CDN (benchmarks/stand_in_cdn.py) and the
+stub encoder (benchmarks/stub_godot.py), then, for each --sessions level, drives N clients
+over the browser's websocket protocol for --duration seconds. A flow browses two pages,
+searches, selects a Miscrit and a stage, uploads an image, drags the scale slider, waits
+for the encode and downloads it, then edits a move in the Moves Editor and downloads the
+export. Per level it reports rerun latency (p50/p95/p99), throughput, and the server's
+thread count and RSS (from /proc, so Linux only).
+
+AppTest can't stand in for the server here: it swaps a process-wide runtime on every run,
+so sessions can't run side by side.
+
+    python -m benchmarks.bench_load [--sessions 1 4 16] [--duration 30] [--json load.json]
+"""
+import argparse
+import asyncio
+import gzip
+import io
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+STUB_GODOT = Path(__file__).resolve().parent / "stub_godot.py"
+
+# Step of a flow -> rerun latencies in seconds
+Samples = Dict[str, List[float]]
+
+
+class FlowError(RuntimeError):
+    """The app showed an exception or did not get where the flow expected"""
+
+
+# ------------------------------
+# Browser protocol client
+# ------------------------------
+class Session:
+    """
+    One browser tab: a websocket to /_stcore/stream sending rerun requests with widget
+    states and collecting the elements each run renders, like the frontend does.
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session_id: Optional[str] = None
+        self.elements: List = []          # (fragment_id, Element) of the last run
+        self.values: Dict[str, object] = {}  # widget id -> WidgetState set by this client
+        self.fragments: Dict[str, float] = {}  # run_every fragments -> interval
+        self._ws = None
+        self._pending: List = []
+
+    async def connect(self) -> None:
+        from tornado.websocket import websocket_connect
+        url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self._ws = await websocket_connect(url, subprotocols=["streamlit"])
+
+    def close(self) -> None:
+        if self._ws is not None:
+            self._ws.close()
+
+    async def _receive(self):
+        if self._pending:
+            return self._pending.pop(0)
+        return await self._read()
+
+    async def _read(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        data = await asyncio.wait_for(self._ws.read_message(), self.timeout)
+        if data is None:
+            raise FlowError("server closed the connection")
+        msg = ForwardMsg()
+        msg.ParseFromString(data)
+        return msg
+
+    async def _send(self, back_msg) -> None:
+        await self._ws.write_message(back_msg.SerializeToString(), binary=True)
+
+    async def rerun(self, triggers=(), fragment_id: str = "") -> float:
+        """Rerun with this client's widget values plus one-shot triggers; returns seconds"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.fragment_id = fragment_id
+        state.is_auto_rerun = bool(fragment_id)
+        state.widget_states.widgets.extend(self.values.values())
+        state.widget_states.widgets.extend(triggers)
+
+        start = time.perf_counter()
+        await self._send(msg)
+        done = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+        while True:
+            fwd = await self._receive()
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self._new_run(fwd.new_session)
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self.elements.append((fwd.delta.fragment_id, fwd.delta.new_element))
+            elif kind == "auto_rerun":
+                self.fragments[fwd.auto_rerun.fragment_id] = fwd.auto_rerun.interval
+            elif kind == "script_finished" and fwd.script_finished in done:
+                break
+            elif kind == "script_finished" and fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                raise FlowError("script failed to compile")
+        elapsed = time.perf_counter() - start
+        # Like the frontend, forget the values of widgets this run did not render
+        live = {wid for _, wid in self._widget_ids()}
+        self.values = {wid: value for wid, value in self.values.items() if wid in live}
+        for _, element in self.elements:
+            if element.WhichOneof("type") == "exception":
+                raise FlowError(element.exception.message)
+        return elapsed
+
+    def _new_run(self, new_session) -> None:
+        if new_session.initialize.session_id:
+            self.session_id = new_session.initialize.session_id
+        fragments = set(new_session.fragment_ids_this_run)
+        if fragments:
+            self.elements = [(fid, el) for fid, el in self.elements if fid not in fragments]
+        else:
+            self.elements = []
+            self.fragments = {}
+
+    def _widget_ids(self):
+        for _, element in self.elements:
+            kind = element.WhichOneof("type")
+            widget = getattr(element, kind)
+            if hasattr(widget, "id") and widget.id.startswith("$$ID-"):
+                yield kind, widget.id
+
+    def find(self, kind: str, label: Optional[str] = None, key_prefix: Optional[str] = None):
+        """First widget of `kind` with this label or user key prefix, or None"""
+        for _, element in self.elements:
+            if element.WhichOneof("type") != kind:
+                continue
+            widget = getattr(element, kind)
+            user_key = widget.id.split("-", 2)[2] if widget.id.count("-") >= 2 else ""
+            if label is not None and widget.label != label:
+                continue
+            if key_prefix is not None and not user_key.startswith(key_prefix):
+                continue
+            return widget
+        return None
+
+    def widget(self, kind: str, label: Optional[str] = None, key_prefix: Optional[str] = None):
+        widget = self.find(kind, label, key_prefix)
+        if widget is None:
+            raise FlowError(f"no {kind} {label or key_prefix or ''} on the page ({self.page()})")
+        return widget
+
+    def page(self) -> str:
+        """Headings and alerts of the last run, to tell where a flow went off track"""
+        texts = [el.heading.body if el.WhichOneof("type") == "heading" else el.alert.body
+                 for _, el in self.elements if el.WhichOneof("type") in ("heading", "alert")]
+        return " | ".join(texts)[:200] or "empty"
+
+    def set_value(self, widget, field: str, value) -> None:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        state = WidgetState(id=widget.id)
+        if field == "file_uploader_state_value":
+            state.file_uploader_state_value.CopyFrom(value)
+        elif field == "double_array_value":
+            state.double_array_value.data.extend(value)
+        else:
+            setattr(state, field, value)
+        self.values[widget.id] = state
+
+    async def click(self, widget) -> float:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        return await self.rerun([WidgetState(id=widget.id, trigger_value=True)])
+
+    async def upload(self, widget, name: str, data: bytes) -> float:
+        """Upload a file the way the frontend does, then rerun with it"""
+        import requests
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.Common_pb2 import FileUploaderState
+
+        request = BackMsg()
+        request.file_urls_request.request_id = f"upload-{time.monotonic_ns()}"
+        request.file_urls_request.file_names.append(name)
+        request.file_urls_request.session_id = self.session_id or ""
+        await self._send(request)
+        while True:
+            # Anything else arriving meanwhile is handled by the next rerun()
+            fwd = await self._read()
+            if fwd.WhichOneof("type") != "file_urls_response":
+                self._pending.append(fwd)
+                continue
+            if fwd.file_urls_response.error_msg:
+                raise FlowError(fwd.file_urls_response.error_msg)
+            urls = fwd.file_urls_response.file_urls[0]
+            break
+        resp = await asyncio.to_thread(
+            requests.put, self.base_url + urls.upload_url, files={"file": (name, data, "image/png")},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        state = FileUploaderState(max_file_id=0)
+        info = state.uploaded_file_info.add()
+        info.file_id, info.name, info.size = urls.file_id, name, len(data)
+        info.file_urls.CopyFrom(urls)
+        self.set_value(widget, "file_uploader_state_value", state)
+        return await self.rerun()
+
+    async def download(self, widget) -> int:
+        import requests
+        resp = await asyncio.to_thread(requests.get, self.base_url + widget.url, timeout=self.timeout)
+        resp.raise_for_status()
+        return len(resp.content)
+
+
+# ------------------------------
+# User flow
+# ------------------------------
+def _png(rng: random.Random) -> bytes:
+    from PIL import Image
+    buf = io.BytesIO()
+    color = (rng.randrange(256), rng.randrange(256), rng.randrange(256), 255)
+    Image.new("RGBA", (rng.randint(120, 400), rng.randint(120, 400)), color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+async def wait_for_job(session: Session, record, deadline: float):
+    """Poll the encode panel (fragment reruns, as the browser does) until it has a download"""
+    while time.monotonic() < deadline:
+        button = session.find("download_button")
+        if button is not None:
+            return button
+        if session.find("button", label="🔁 Retry") is not None:
+            raise FlowError("encode job failed")
+        if session.fragments:
+            fragment_id, interval = next(iter(session.fragments.items()))
+            await asyncio.sleep(interval)
+            record("job_poll", await session.rerun(fragment_id=fragment_id))
+        else:
+            await asyncio.sleep(0.5)
+            record("job_poll", await session.rerun())
+    raise FlowError("encode job did not finish in time")
+
+
+async def flow(session: Session, rng: random.Random, record, think: float, job_timeout: float) -> None:
+    async def pause():
+        if think:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+
+    # Browse
+    record("open", await session.rerun())
+    for _ in range(2):
+        await pause()
+        record("page", await session.click(session.widget("button", label="Next ➡️")))
+    # Search, then clear it
+    await pause()
+    search = session.widget("text_input", label="Search Miscrits...")
+    session.set_value(search, "string_value", rng.choice(["flu", "ter", "zap", "kin", "dra"]))
+    record("search", await session.rerun())
+    session.set_value(search, "string_value", "")
+    record("search", await session.rerun())
+
+    # Select a Miscrit and a stage, upload, resize
+    await pause()
+    cards = [w for kind, w in _widgets(session, "button") if w.id.split("-", 2)[-1].startswith("sel_")]
+    if not cards:
+        raise FlowError("no Miscrit cards on the page")
+    record("select", await session.click(rng.choice(cards)))
+    record("stage", await session.click(session.widget("button", key_prefix="stage_1")))
+    await pause()
+    record("upload", await session.upload(session.widget("file_uploader"), "sprite.png", _png(rng)))
+    for _ in range(3):
+        await pause()
+        scale = session.widget("slider", label="Scale")
+        session.set_value(scale, "double_array_value", [round(rng.uniform(0.6, 1.9), 1)])
+        record("resize", await session.rerun())
+
+    # Encode and download
+    download = await wait_for_job(session, record, time.monotonic() + job_timeout)
+    await session.download(download)
+    record("download", await session.click(download))
+    await pause()
+    record("back", await session.click(session.widget("button", label="⬅️ Back to Selection")))
+
+    # Moves Editor: edit one move, export, back to the Miscrits
+    mode = session.widget("radio", label="Mode")
+    session.set_value(mode, "int_value", 2)
+    record("moves_open", await session.rerun())
+    await pause()
+    name = session.widget("text_input", key_prefix="name_")
+    session.set_value(name, "string_value", f"Load Move {rng.randrange(10_000)}")
+    record("moves_edit", await session.rerun())
+    record("moves_export", await session.click(session.widget("button", label="📦 Prepare Download")))
+    await session.download(session.widget("download_button", label="⬇️ Download .json"))
+    session.set_value(mode, "int_value", 0)
+    record("back", await session.rerun())
+
+
+def _widgets(session: Session, kind: str):
+    for _, element in session.elements:
+        if element.WhichOneof("type") == kind:
+            yield kind, getattr(element, kind)
+
+
+async def run_level(base_url: str, sessions: int, duration: float, think: float,
+                    timeout: float, job_timeout: float, seed: int) -> Dict:
+    samples: Samples = {}
+    counts = {"flows": 0, "errors": 0}
+    errors: Dict[str, int] = {}
+    deadline = time.monotonic() + duration
+
+    def record(step: str, seconds: float) -> None:
+        samples.setdefault(step, []).append(seconds)
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        # Stagger arrivals over the first seconds
+        await asyncio.sleep(rng.uniform(0, min(2.0, duration / 4)))
+        while time.monotonic() < deadline:
+            session = Session(base_url, timeout)
+            try:
+                await session.connect()
+                await flow(session, rng, record, think, job_timeout)
+                counts["flows"] += 1
+            except Exception as e:
+                counts["errors"] += 1
+                reason = f"{type(e).__name__}: {e}"[:120]
+                errors[reason] = errors.get(reason, 0) + 1
+            finally:
+                session.close()
+
+    started = time.monotonic()
+    await asyncio.gather(*(user(i) for i in range(sessions)))
+    wall = time.monotonic() - started
+    return {"samples": samples, "flows": counts["flows"], "errors": counts["errors"],
+            "error_kinds": errors, "wall_s": wall}
+
+
+# ------------------------------
+# Server
+# ------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_status(pid: int) -> Dict[str, int]:
+    """Threads and RSS bytes of a process (Linux /proc)"""
+    status = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key == "Threads":
+                status["threads"] = int(value)
+            elif key == "VmRSS":
+                status["rss"] = int(value.split()[0]) * 1024
+    return status
+
+
+def start_server(env: Dict[str, str], log_path: Path) -> Tuple[subprocess.Popen, str]:
+    import requests
+    port = _free_port()
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", str(ROOT / "app.py"),
+        "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+        # The client has no browser cookies to echo back
+        "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false",
+    ]
+    log = open(log_path, "wb")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if proc.poll() is not None:
+            raise RuntimeError(f"app server exited, see {log_path}")
+        try:
+            if requests.get(base_url + "/_stcore/health", timeout=1).ok:
+                return proc, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"app server did not start, see {log_path}")
+
+
+async def sample_server(pid: int, peaks: Dict[str, int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        for key, value in proc_status(pid).items():
+            peaks[key] = max(peaks.get(key, 0), value)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.25)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def measure_level(proc, base_url: str, args, sessions: int) -> Dict:
+    peaks: Dict[str, int] = {}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_server(proc.pid, peaks, stop))
+    result = await run_level(base_url, sessions, args.duration, args.think,
+                             args.timeout, args.job_timeout, args.seed)
+    stop.set()
+    await sampler
+    result.update(peak_threads=peaks.get("threads", 0), peak_rss=peaks.get("rss", 0),
+                  **{f"end_{k}": v for k, v in proc_status(proc.pid).items()})
+    return result
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _latency(values: List[float]) -> Dict[str, float]:
+    ms = sorted(v * 1000 for v in values)
+    return {"n": len(ms), **{f"p{p}_ms": round(_percentile(ms, p), 1) for p in (50, 95, 99)}}
+
+
+def summarize(sessions: int, result: Dict) -> Dict:
+    everything = [s for values in result["samples"].values() for s in values]
+    return {
+        "sessions": sessions,
+        "reruns": len(everything),
+        "flows": result["flows"],
+        "errors": result["errors"],
+        "error_kinds": result["error_kinds"],
+        "reruns_per_s": round(len(everything) / result["wall_s"], 2),
+        "flows_per_min": round(result["flows"] * 60 / result["wall_s"], 2),
+        "latency": _latency(everything),
+        "steps": {step: _latency(values) for step, values in sorted(result["samples"].items())},
+        "peak_threads": result["peak_threads"],
+        "peak_rss_mb": round(result["peak_rss"] / 2**20, 1),
+        "end_threads": result.get("end_threads", 0),
+        "end_rss_mb": round(result.get("end_rss", 0) / 2**20, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=30, help="seconds per level")
+    parser.add_argument("--think", type=float, default=0.3, help="mean pause between user actions (s)")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stand-in response")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--encode-delay", type=float, default=0.5, help="stub encoder seconds per file")
+    parser.add_argument("--miscrits", type=int, default=600, help="synthetic catalog size")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for one rerun")
+    parser.add_argument("--job-timeout", type=float, default=120, help="seconds to wait for an encode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write the results here as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/status"):
+        print("bench_load reads thread counts and RSS from /proc: Linux only")
+        return 2
+    logging.getLogger("tornado").setLevel(logging.ERROR)
+
+    workdir = Path(tempfile.mkdtemp(prefix="miscrits_load_"))
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.stand_in_cdn import StandInCDN
+    from benchmarks.synthetic import make_miscrits
+    raw = json.dumps(make_miscrits(args.miscrits, seed=args.seed + 7)).encode("utf-8")
+    cdn = StandInCDN(raw, args.latency, failure_rate=args.failure_rate, seed=args.seed).start()
+
+    env = dict(
+        os.environ,
+        MISCRITS_CACHE_DIR=str(workdir / "cache"),
+        MISCRITS_SCRATCH_DIR=str(workdir / "scratch"),
+        MISCRITS_ASSET_PROXY=cdn.url,
+        MISCRITS_GODOT_BIN=str(STUB_GODOT),
+        MISCRITS_STUB_ENCODE_DELAY=str(args.encode_delay),
+        MISCRITS_MEMORY_LOG_INTERVAL="0",
+    )
+    # The server starts from a catalog snapshot, as in production after the first fetch
+    (workdir / "cache").mkdir(parents=True)
+    (workdir / "cache" / "miscrits.json.gz").write_bytes(gzip.compress(raw))
+
+    log_path = workdir / "server.log"
+    proc, base_url = start_server(env, log_path)
+    idle = proc_status(proc.pid)
+    levels = []
+    try:
+        for sessions in args.sessions:
+            result = asyncio.run(measure_level(proc, base_url, args, sessions))
+            levels.append(summarize(sessions, result))
+            row = levels[-1]
+            print(f"{sessions:>4} sessions  {row['reruns']:>6} reruns  {row['flows']:>4} flows  "
+                  f"{row['errors']:>3} errors  p50 {row['latency']['p50_ms']:>7.1f}  "
+                  f"p95 {row['latency']['p95_ms']:>7.1f}  p99 {row['latency']['p99_ms']:>7.1f} ms  "
+                  f"{row['reruns_per_s']:>6.1f} reruns/s  threads {row['peak_threads']:>3}  "
+                  f"RSS {row['peak_rss_mb']:>6.1f} MB", flush=True)
+            for reason, count in row["error_kinds"].items():
+                print(f"        {count}x {reason}")
+    finally:
+        proc.terminate()
+        proc.wait(10)
+        cdn.stop()
+
+    if args.json:
+        report = {
+            "settings": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+            "idle": {"threads": idle.get("threads", 0), "rss_mb": round(idle.get("rss", 0) / 2**20, 1)},
+            "stand_in": {"requests": cdn.requests, "injected_failures": cdn.failures},
+            "levels": levels,
+        }
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"results: {args.json}")
+    print(f"server log: {log_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Leak check: repeated select → upload → back cycles must not grow memory.
+
+Drives the selection and editor views with AppTest against a synthetic catalog (assets
+from benchmarks.stand_in_cdn): pick a Miscrit, upload an image, then go back
+(go_back_to_selection, as "⬅️ Back to Selection"). After --warmup cycles fill the caches, traced Python memory and the session state's deep
+size must stay flat over --cycles more. Exits 1 when either grows past its budget.
+--inject-growth N keeps N more bytes in session state every cycle, to check that the
+bench catches a leak.
+
+    python -m benchmarks.bench_session_leak [--cycles 30] [--warmup 5] [--inject-growth N]
+"""
+import argparse
+import gc
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict
+
+# Per-cycle growth allowed once warm (allocator noise, interned strings)
+TRACED_BUDGET_PER_CYCLE = 16 * 1024
+STATE_BUDGET_PER_CYCLE = 256
+
+
+def _app():
+    import streamlit as st
+    from session_manager import go_back_to_selection, initialize_session_state
+    initialize_session_state()
+    # What "⬅️ Back to Selection" does; set as a flag because AppTest keeps the
+    # editor's widgets around after the button's st.rerun()
+    if st.session_state.pop("_bench_back", False):
+        go_back_to_selection()
+        inject = st.session_state.get("_bench_inject", 0)
+        if inject:
+            st.session_state.setdefault("_bench_leak", []).append(bytes(inject))
+    if st.session_state["step"] == 1:
+        from views.selection import render_selection_view
+        render_selection_view()
+    else:
+        from views.editor import render_editor_view
+        render_editor_view()
+
+
+def _upload_png() -> bytes:
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.new("RGBA", (300, 200), (255, 0, 0, 255)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def prepare() -> Path:
+    """
+    Private cache/scratch dirs holding a synthetic catalog snapshot, with sprites served
+    by a local stand-in CDN. Call before anything imports config (a fresh process);
+    returns the work directory.
+    """
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from benchmarks.stand_in_cdn import StandInCDN
+    from benchmarks.synthetic import make_miscrits
+
+    raw = json.dumps(make_miscrits(60)).encode("utf-8")
+    cdn = StandInCDN(raw).start()
+    workdir = Path(tempfile.mkdtemp(prefix="miscrits_leak_"))
+    os.environ["MISCRITS_CACHE_DIR"] = str(workdir / "cache")
+    os.environ["MISCRITS_SCRATCH_DIR"] = str(workdir / "scratch")
+    os.environ["MISCRITS_ASSET_PROXY"] = cdn.url
+    os.environ["MISCRITS_MEMORY_LOG_INTERVAL"] = "0"
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    from config import CATALOG_SNAPSHOT_PATH
+    CATALOG_SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CATALOG_SNAPSHOT_PATH.write_bytes(gzip.compress(raw))
+    return workdir
+
+
+def measure(cycles: int, warmup: int, inject_growth: int = 0) -> Dict[str, float]:
+    """
+    Run warmup + cycles select → upload → back cycles; traced memory and session state
+    deep size before and after the measured cycles, and their growth per cycle.
+    """
+    from streamlit.testing.v1 import AppTest
+    from core.memory import deep_sizeof
+    from session_manager import put_blob
+
+    png = _upload_png()
+    at = AppTest.from_function(_app, default_timeout=60)
+    at.session_state["_bench_inject"] = inject_growth
+
+    def cycle():
+        at.run()
+        # First Miscrit of the grid
+        next(b for b in at.button if (b.key or "").startswith("sel_")).click().run()
+        at.session_state["selected_stage"] = 1
+        at.session_state["uploaded_image_blob"] = put_blob(png)
+        at.run()
+        assert any(b.label == "⬅️ Back to Selection" for b in at.button)
+        at.session_state["_bench_back"] = True
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    def state_bytes() -> int:
+        # Every user-visible key, as a server session holds it between runs (values
+        # from earlier runs live in the compacted state, not just this run's writes)
+        return deep_sizeof(at.session_state._state.filtered_state)
+
+    tracemalloc.start()
+    try:
+        for _ in range(warmup):
+            cycle()
+        gc.collect()
+        traced_start, state_start = tracemalloc.get_traced_memory()[0], state_bytes()
+        for _ in range(cycles):
+            cycle()
+        gc.collect()
+        traced_end, state_end = tracemalloc.get_traced_memory()[0], state_bytes()
+    finally:
+        tracemalloc.stop()
+    return {
+        "traced_start": traced_start, "traced_end": traced_end,
+        "state_start": state_start, "state_end": state_end,
+        "traced_growth": (traced_end - traced_start) / cycles,
+        "state_growth": (state_end - state_start) / cycles,
+    }
+
+
+def within_budget(result: Dict[str, float]) -> bool:
+    return (result["traced_growth"] <= TRACED_BUDGET_PER_CYCLE
+            and result["state_growth"] <= STATE_BUDGET_PER_CYCLE)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--inject-growth", type=int, default=0, metavar="BYTES",
+                        help="deliberately leak this much session state per cycle")
+    args = parser.parse_args()
+
+    prepare()
+    from core.memory import format_bytes
+    result = measure(args.cycles, args.warmup, args.inject_growth)
+    ok = within_budget(result)
+    print(f"cycles          {args.cycles} (after {args.warmup} warm-up)")
+    print(f"traced memory   {format_bytes(result['traced_start'])} -> {format_bytes(result['traced_end'])}"
+          f"  ({format_bytes(result['traced_growth'])}/cycle, budget {format_bytes(TRACED_BUDGET_PER_CYCLE)})")
+    print(f"session state   {format_bytes(result['state_start'])} -> {format_bytes(result['state_end'])}"
+          f"  ({format_bytes(result['state_growth'])}/cycle, budget {format_bytes(STATE_BUDGET_PER_CYCLE)})")
+    print("ok" if ok else "LEAK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+End-to-end benchmark suite against a local stand-in CDN (benchmarks/stand_in_cdn.py).
+
+Starts the stand-in with the given latency and failure rate, routes the app to it
+(MISCRITS_ASSET_PROXY) and times, over --repeat runs each:
+    catalog   cold fetch, 304 revalidation, load from the snapshot; search and filters
+    grid      selection page build with cold and warm sprite caches, search rerun
+    editor    open, upload, resize and the encode job (skipped without a Godot binary)
+    moves     Moves Editor open, edit a move, prepare the export
+Results (p50/p95/mean per measurement, the settings and the commit) are written as JSON,
+by default to .cache/bench/<commit>.json. --compare BASE.json prints the change against
+an earlier run and exits 1 when a p50 regressed by more than --tolerance.
+
+    python -m benchmarks.bench_suite [--latency 0.02] [--failure-rate 0] [--compare old.json]
+"""
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / ".cache" / "bench"
+
+
+class Recorder:
+    """Samples in milliseconds per measurement name"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.skipped: Dict[str, str] = {}
+
+    def time(self, name: str, fn: Callable) -> None:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return
+        self.samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+    def skip(self, name: str, reason: str) -> None:
+        self.skipped[name] = reason
+
+    def summary(self) -> Dict[str, Dict]:
+        results = {}
+        for name in sorted(set(self.samples) | set(self.errors) | set(self.skipped)):
+            if name in self.skipped:
+                results[name] = {"skipped": self.skipped[name]}
+                continue
+            ms = sorted(self.samples.get(name, []))
+            row = {"n": len(ms), "errors": self.errors.get(name, 0)}
+            if ms:
+                row.update({
+                    "p50_ms": round(_percentile(ms, 50), 2), "p95_ms": round(_percentile(ms, 95), 2),
+                    "mean_ms": round(statistics.fmean(ms), 2), "min_ms": round(ms[0], 2), "max_ms": round(ms[-1], 2),
+                })
+            results[name] = row
+        return results
+
+
+def _percentile(sorted_ms: List[float], pct: float) -> float:
+    k = (len(sorted_ms) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_ms) - 1)
+    return sorted_ms[lo] + (sorted_ms[hi] - sorted_ms[lo]) * (k - lo)
+
+
+def _commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _png(seed: int) -> bytes:
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.new("RGBA", (300, 200), (seed % 256, (seed // 256) % 256, 120, 255)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _check(at) -> None:
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+# ------------------------------
+# Scenarios
+# ------------------------------
+def bench_catalog(rec: Recorder, repeat: int, workdir: Path) -> None:
+    from config import (
+        CATALOG_REFRESH_INTERVAL, CATALOG_RETRY_INTERVAL, FETCH_TIMEOUT, MISCRITS_JSON_URL,
+        SEARCH_RESULT_CACHE_SIZE, SEARCH_SYNONYMS,
+    )
+    from core.catalog_store import CatalogStore
+    from search_index import SearchIndex
+
+    def store(path: Path) -> CatalogStore:
+        return CatalogStore(MISCRITS_JSON_URL, path, refresh_interval=CATALOG_REFRESH_INTERVAL,
+                            timeout=FETCH_TIMEOUT, retry_interval=CATALOG_RETRY_INTERVAL)
+
+    def cold(path: Path):
+        if store(path).get() is None:
+            raise RuntimeError("catalog fetch failed")
+
+    paths = [workdir / f"catalog_{i}.json.gz" for i in range(repeat)]
+    for path in paths:
+        rec.time("catalog_cold_fetch", lambda: cold(path))
+    warm = next((p for p in paths if p.exists()), None)
+    if warm is None:
+        rec.skip("catalog_snapshot_load", "no catalog fetched")
+        return
+
+    for _ in range(repeat):
+        rec.time("catalog_snapshot_load", lambda: store(warm).get())
+    live = store(warm)
+
+    def revalidate():
+        live.refresh_now()
+        if live.last_error:
+            raise RuntimeError(live.last_error)
+
+    for _ in range(repeat):
+        rec.time("catalog_revalidate", revalidate)
+
+    catalog = live.get().catalog
+    first = catalog.first_stages()
+    index = None
+
+    def build():
+        nonlocal index
+        index = SearchIndex(first, SEARCH_SYNONYMS, SEARCH_RESULT_CACHE_SIZE, source=catalog)
+
+    for _ in range(repeat):
+        rec.time("search_index_build", build)
+    # Distinct queries: each one misses the index's result cache
+    names = [m["evo_name"] for m in first]
+    for i in range(repeat):
+        rec.time("search_query", lambda: index.search(names[(i * 7) % len(names)][:4 + i % 3]))
+    for i in range(repeat):
+        rarity, element = index.rarities[i % len(index.rarities)], index.elements[i % len(index.elements)]
+        rec.time("search_filter", lambda: index.search("", [rarity], [element]))
+
+
+def _selection_app():
+    from session_manager import initialize_session_state
+    initialize_session_state()
+    import streamlit as st
+    if st.session_state["step"] == 1:
+        from views.selection import render_selection_view
+        render_selection_view()
+    else:
+        from views.editor import render_editor_view
+        render_editor_view()
+
+
+def bench_grid_and_editor(rec: Recorder, repeat: int) -> None:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from session_manager import put_blob
+
+    for i in range(repeat):
+        # Cold: sprite caches cleared, so every card is fetched from the stand-in
+        st.cache_data.clear()
+        at = AppTest.from_function(_selection_app, default_timeout=60)
+        rec.time("grid_page_cold", lambda: _check(at.run()))
+        rec.time("grid_page_warm", lambda: _check(at.run()))
+        search = next(t for t in at.text_input if t.label.startswith("Search"))
+        rec.time("grid_search_rerun", lambda: _check(search.set_value("a" * (1 + i % 2)).run()))
+        search.set_value("").run()
+
+        cards = [b for b in at.button if (b.key or "").startswith("sel_")]
+        if not cards:
+            raise RuntimeError("selection grid rendered no cards")
+        rec.time("editor_open", lambda: _check(cards[i % len(cards)].click().run()))
+        at.session_state["selected_stage"] = 1
+        at.session_state["uploaded_image_blob"] = put_blob(_png(i))
+        rec.time("editor_upload", lambda: _check(at.run()))
+        scale = next((s for s in at.slider if s.label == "Scale"), None)
+        if scale is not None:
+            rec.time("editor_resize", lambda: _check(scale.set_value(1.1 if scale.value != 1.1 else 1.2).run()))
+
+
+def bench_encode(rec: Recorder, repeat: int, workdir: Path) -> None:
+    from config import GODOT_BIN
+    if not os.access(GODOT_BIN, os.X_OK):
+        rec.skip("encode_job", f"{GODOT_BIN.name} is not executable (MISCRITS_GODOT_BIN selects another encoder)")
+        return
+    from core.encode_jobs import ENCODE_SPRITE, register_encode_jobs
+    from core.jobs import DONE, JobService
+
+    service = JobService(workdir / "jobs.sqlite3", workdir / "artifacts", workers=1)
+    register_encode_jobs(service)
+
+    def encode(seed: int):
+        job = service.submit(ENCODE_SPRITE, {"png": service.artifacts.put(_png(1000 + seed)), "name": f"bench_{seed}"})
+        while job.active:
+            time.sleep(0.01)
+            job = service.get(job.id)
+        if job.state != DONE:
+            raise RuntimeError(job.error)
+
+    for i in range(repeat):
+        rec.time("encode_job", lambda: encode(i))
+
+
+def _moves_app():
+    from session_manager import initialize_session_state
+    initialize_session_state()
+    from views.moves_editor import render_moves_editor
+    render_moves_editor()
+
+
+def bench_moves(rec: Recorder, repeat: int) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    for i in range(repeat):
+        at = AppTest.from_function(_moves_app, default_timeout=60)
+        rec.time("moves_open", lambda: _check(at.run()))
+        name = next(t for t in at.text_input if (t.key or "").startswith("name_"))
+        rec.time("moves_edit", lambda: _check(name.set_value(f"Bench Move {i}").run()))
+        prepare = next(b for b in at.button if b.label == "📦 Prepare Download")
+        rec.time("moves_export", lambda: _check(prepare.click().run()))
+
+
+# ------------------------------
+# Comparison
+# ------------------------------
+def compare(current: Dict, base: Dict, tolerance: float) -> bool:
+    """Print p50 changes against `base`; True when any measurement regressed"""
+    print(f"\nvs {base.get('commit') or 'base'} (tolerance {tolerance:.0%})")
+    if base.get("settings") != current["settings"]:
+        print(f"note: settings differ, base ran with {base.get('settings')}")
+    regressed = False
+    for name, row in current["results"].items():
+        old = base.get("results", {}).get(name, {})
+        if "p50_ms" not in row or "p50_ms" not in old:
+            continue
+        change = (row["p50_ms"] - old["p50_ms"]) / old["p50_ms"] if old["p50_ms"] else 0.0
+        worse = change > tolerance
+        regressed |= worse
+        print(f"{name:<24}{old['p50_ms']:>10.1f} ->{row['p50_ms']:>10.1f} ms  {change:+7.1%}"
+              f"{'  REGRESSION' if worse else ''}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stand-in response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--miscrits", type=int, default=600, help="synthetic catalog size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=["catalog", "grid", "encode", "moves"])
+    parser.add_argument("--json", type=Path, help="results file (default .cache/bench/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # Private cache/scratch dirs; set before config is imported
+    workdir = Path(tempfile.mkdtemp(prefix="miscrits_bench_"))
+    os.environ["MISCRITS_CACHE_DIR"] = str(workdir / "cache")
+    os.environ["MISCRITS_SCRATCH_DIR"] = str(workdir / "scratch")
+    os.environ["MISCRITS_MEMORY_LOG_INTERVAL"] = "0"
+    sys.path.insert(0, str(ROOT))
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    logging.getLogger("core.catalog_store").setLevel(logging.ERROR)
+
+    from benchmarks.stand_in_cdn import StandInCDN
+    from benchmarks.synthetic import make_miscrits
+    raw = json.dumps(make_miscrits(args.miscrits, seed=args.seed + 7)).encode("utf-8")
+    cdn = StandInCDN(raw, args.latency, args.jitter, args.failure_rate, seed=args.seed).start()
+    os.environ["MISCRITS_ASSET_PROXY"] = cdn.url
+
+    from config import CATALOG_SNAPSHOT_PATH
+    # The app's own store starts from a snapshot, as in production after the first fetch
+    CATALOG_SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CATALOG_SNAPSHOT_PATH.write_bytes(gzip.compress(raw))
+
+    rec = Recorder()
+    scenarios = args.only or ["catalog", "grid", "encode", "moves"]
+    started = time.perf_counter()
+    try:
+        if "catalog" in scenarios:
+            bench_catalog(rec, args.repeat, workdir)
+        if "grid" in scenarios:
+            bench_grid_and_editor(rec, args.repeat)
+        if "encode" in scenarios:
+            bench_encode(rec, args.repeat, workdir)
+        if "moves" in scenarios:
+            bench_moves(rec, args.repeat)
+    finally:
+        cdn.stop()
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "repeat": args.repeat, "latency": args.latency, "jitter": args.jitter,
+            "failure_rate": args.failure_rate, "miscrits": args.miscrits, "seed": args.seed,
+        },
+        "server": {"requests": cdn.requests, "injected_failures": cdn.failures},
+        "wall_s": round(time.perf_counter() - started, 1),
+        "results": rec.summary(),
+    }
+
+    print(f"{'measurement':<24}{'n':>4}{'err':>5}{'p50':>10}{'p95':>10}{'mean':>10}  ms")
+    for name, row in report["results"].items():
+        if "skipped" in row:
+            print(f"{name:<24}  skipped: {row['skipped']}")
+        elif "p50_ms" in row:
+            print(f"{name:<24}{row['n']:>4}{row['errors']:>5}{row['p50_ms']:>10.1f}"
+                  f"{row['p95_ms']:>10.1f}{row['mean_ms']:>10.1f}")
+        else:
+            print(f"{name:<24}{row['n']:>4}{row['errors']:>5}  (all failed)")
+    print(f"stand-in: {cdn.requests} requests, {cdn.failures} injected failures")
+
+    out = args.json or RESULTS_DIR / f"{commit or 'results'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results: {out}")
+
+    if args.compare:
+        base = json.loads(args.compare.read_text(encoding="utf-8"))
+        return 1 if compare(report, base, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
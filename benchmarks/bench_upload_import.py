@@ -0,0 +1,102 @@
+"""
+Moves Editor upload import: json.loads(read().decode()) vs the streaming parser.
+
+Each variant runs in a fresh subprocess over the same ~20 MB synthetic miscrits.json
+held in memory (as Streamlit holds an upload), reporting import time, peak RSS (and its
+growth over the upload bytes) and the peak traced Python allocation.
+
+    python -m benchmarks.bench_upload_import [--size-mb 20]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_miscrits
+
+
+def legacy_import(upload: io.BytesIO):
+    return json.loads(upload.read().decode("utf-8"))
+
+
+def streaming_import(upload: io.BytesIO):
+    from json_stream import load_json_array
+    return load_json_array(upload)[0]
+
+
+VARIANTS = {"legacy": legacy_import, "streaming": streaming_import}
+
+
+def write_synthetic(path: str, size_mb: float) -> None:
+    # ~3 KB per Miscrit with the default 12 abilities
+    count = 600
+    while True:
+        payload = json.dumps(make_miscrits(count), separators=(",", ":")).encode("utf-8")
+        if len(payload) >= size_mb * 1e6:
+            break
+        count = int(count * size_mb * 1e6 / len(payload)) + 1
+    with open(path, "wb") as f:
+        f.write(payload)
+
+
+def run_variant(name: str, path: str, trace: bool) -> dict:
+    """Child process body: import once, report time and memory as JSON"""
+    with open(path, "rb") as f:
+        upload = io.BytesIO(f.read())
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    data = VARIANTS[name](upload)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    # ru_maxrss is KiB on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {
+        "variant": name, "items": len(data), "seconds": elapsed,
+        "peak_alloc": peak, "peak_rss": rss, "rss_before": base_rss,
+    }
+
+
+def spawn(name: str, path: str, trace: bool) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_upload_import", "--variant", name, "--file", path]
+    if trace:
+        cmd.append("--trace")
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=20)
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.file, args.trace)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "miscrits.json")
+        write_synthetic(path, args.size_mb)
+        size = os.path.getsize(path)
+        print(f"Synthetic upload: {size / 1e6:.1f} MB")
+        print(f"{'':<12}{'time':>10}{'peak RSS':>12}{'RSS growth':>13}{'peak alloc':>13}")
+        for name in VARIANTS:
+            # Timing and RSS without tracemalloc (it doubles both), allocations traced separately
+            r = spawn(name, path, trace=False)
+            alloc = spawn(name, path, trace=True)["peak_alloc"]
+            print(f"{name:<12}{r['seconds']:>9.2f}s{r['peak_rss'] / 1e6:>9.0f} MB"
+                  f"{(r['peak_rss'] - r['rss_before']) / 1e6:>10.0f} MB{alloc / 1e6:>10.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
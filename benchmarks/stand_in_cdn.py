@@ -0,0 +1,162 @@
+"""
+Local stand-in for the game's hosts: miscrits.json, sprites, avatars and icons.
+
+The app reaches it through config.ASSET_PROXY, which turns https://<host>/<path> into
+<proxy>/<host>/<path>. The catalog URL serves a synthetic miscrits.json (with an ETag,
+so revalidation gets 304s) and any .png path a generated image, the same bytes for the
+same path. Every response is delayed by `latency` (± `jitter`) seconds and a share
+`failure_rate` of requests fails with a 503.
+
+    python -m benchmarks.stand_in_cdn [--port 8765] [--latency 0.05] [--failure-rate 0.02]
+    MISCRITS_ASSET_PROXY=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+@functools.lru_cache(maxsize=None)
+def _catalog_path() -> str:
+    # Imported late: callers set MISCRITS_ASSET_PROXY to this server's url before config loads
+    from config import MISCRITS_JSON_URL
+    parts = urlsplit(MISCRITS_JSON_URL)
+    return f"/{parts.netloc}{parts.path or '/'}"
+
+
+def make_png(key: str) -> bytes:
+    """A sprite-like PNG whose size and colour derive from `key`"""
+    from PIL import Image, ImageDraw
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    width, height = 96 + digest[0] % 160, 96 + digest[1] % 160
+    img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(img).ellipse((4, 4, width - 4, height - 4), fill=(digest[2], digest[3], digest[4], 255))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+class StandInCDN:
+    """Threaded HTTP server on localhost; `url` is the value for MISCRITS_ASSET_PROXY"""
+
+    def __init__(self, catalog: bytes, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0, port: int = 0):
+        self.catalog = catalog
+        self.catalog_etag = '"{}"'.format(hashlib.sha256(catalog).hexdigest()[:16])
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._pngs: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self) -> "StandInCDN":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="stand-in-cdn", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInCDN":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _delay_and_fault(self) -> bool:
+        """Sleep for the configured latency; True when this request should fail"""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def _png(self, path: str) -> bytes:
+        with self._lock:
+            data = self._pngs.get(path)
+        if data is None:
+            data = make_png(path)
+            with self._lock:
+                self._pngs[path] = data
+        return data
+
+    def _handler(self):
+        cdn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if cdn._delay_and_fault():
+                    return self._send(503, b"injected failure", "text/plain")
+                if path == _catalog_path():
+                    if self.headers.get("If-None-Match") == cdn.catalog_etag:
+                        return self._send(304, b"", "application/json")
+                    return self._send(200, cdn.catalog, "application/json", {"ETag": cdn.catalog_etag})
+                if path.endswith(".png"):
+                    return self._send(200, cdn._png(path), "image/png")
+                self._send(404, b"not found", "text/plain")
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    from benchmarks.synthetic import REAL_CATALOG_SIZE, make_miscrits
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--miscrits", type=int, default=REAL_CATALOG_SIZE, help="synthetic catalog size")
+    args = parser.parse_args()
+
+    catalog = json.dumps(make_miscrits(args.miscrits)).encode("utf-8")
+    cdn = StandInCDN(catalog, args.latency, args.jitter, args.failure_rate, port=args.port)
+    print(f"Serving on {cdn.url} (MISCRITS_ASSET_PROXY={cdn.url})")
+    try:
+        cdn.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
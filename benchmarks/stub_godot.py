@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Godot binary, for load tests without Godot:
+
+    MISCRITS_GODOT_BIN=benchmarks/stub_godot.py streamlit run app.py
+
+Takes the same command line (--headless --script <gd> -- <in> <out> ...) and writes
+each PNG to its output wrapped like FileAccess.store_var(PackedByteArray). Each file
+takes MISCRITS_STUB_ENCODE_DELAY seconds (default 0.5), plus 0.3 s per start to
+imitate Godot booting.
+"""
+import os
+import struct
+import sys
+import time
+
+# Variant.Type.PACKED_BYTE_ARRAY in Godot 4
+_PACKED_BYTE_ARRAY = 29
+STARTUP_SECONDS = 0.3
+
+
+def encode(src: str, dst: str) -> bool:
+    try:
+        with open(src, "rb") as f:
+            data = f.read()
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        with open(dst, "wb") as f:
+            f.write(struct.pack("<II", _PACKED_BYTE_ARRAY, len(data)) + data + b"\0" * (-len(data) % 4))
+        return True
+    except OSError as e:
+        print(f"stub_godot: {e}", file=sys.stderr)
+        return False
+
+
+def main(argv) -> int:
+    if "--" not in argv:
+        print("usage: stub_godot.py --headless --script <gd> -- <PNG_IN> <OUT> [...]", file=sys.stderr)
+        return 1
+    pairs = argv[argv.index("--") + 1:]
+    if not pairs or len(pairs) % 2:
+        return 1
+    delay = float(os.environ.get("MISCRITS_STUB_ENCODE_DELAY", "0.5"))
+    time.sleep(STARTUP_SECONDS)
+    failed = 0
+    for src, dst in zip(pairs[::2], pairs[1::2]):
+        time.sleep(delay)
+        failed += not encode(src, dst)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""
+Synthetic miscrits.json generator shaped like the real game file
+"""
+import random
+from typing import Dict, List
+
+# Approximate size of the live catalog (Miscrits, not evolution stages)
+REAL_CATALOG_SIZE = 600
+
+ELEMENTS = [
+    "Physical", "Fire", "Water", "Nature", "Wind", "Earth", "Lightning",
+    "FireWind", "WaterEarth", "NatureLightning",
+]
+RARITIES = ["Common", "Rare", "Epic", "Exotic", "Legendary"]
+LOCATIONS = ["Forest", "Mount Gemma", "Cave", "Shores", "Moon", "Sunfall Shores"]
+ABILITY_TYPES = ["Attack", "Attack", "Attack", "Buff", "Dot", "Heal", "Hot", "Bot"]
+SYLLABLES = ["flu", "e", "af", "ter", "burn", "pil", "ler", "zap", "ra", "kin", "mo", "gu", "vex", "dra"]
+
+
+def _word(rng: random.Random, parts: int = 3) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def make_miscrits(count: int = REAL_CATALOG_SIZE, abilities: int = 12, seed: int = 7) -> List[Dict]:
+    """Build `count` raw Miscrits with names, locations, abilities and ability_order"""
+    rng = random.Random(seed)
+    data = []
+    for mid in range(1, count + 1):
+        element = rng.choice(ELEMENTS)
+        names = [_word(rng) for _ in range(4)]
+        ability_list = []
+        for aid in range(1, abilities + 1):
+            ab_type = rng.choice(ABILITY_TYPES)
+            ability_list.append({
+                "id": mid * 100 + aid,
+                "name": f"{_word(rng, 2)} {_word(rng, 2)}",
+                "type": ab_type,
+                "element": element if ab_type == "Attack" else "Misc",
+                "ap": rng.randint(-20, 40),
+                "accuracy": rng.choice([80, 90, 100]),
+                "keys": rng.sample(["acc", "ea", "pd", "ed", "spd"], 2),
+                "turns": rng.randint(0, 3),
+                "desc": " ".join(_word(rng, 2) for _ in range(12)),
+            })
+        data.append({
+            "id": mid,
+            "names": names,
+            "element": element,
+            "rarity": rng.choice(RARITIES),
+            "image": f"{names[0].lower()}.png",
+            "locations": rng.sample(LOCATIONS, 2),
+            "abilities": ability_list,
+            "ability_order": [a["id"] for a in ability_list],
+        })
+    return data
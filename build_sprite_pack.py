@@ -0,0 +1,101 @@
+"""
+Build a pack of encoded sprites/avatars from a manifest, without Streamlit.
+
+    python build_sprite_pack.py manifest.csv -o pack.zip [--catalog miscrits.json]
+
+Manifest rows are (name, stage, kind, image, scale[, keep_aspect]) with kind "sprite"
+or "avatar". With --catalog, `name` may be any name of the Miscrit and `stage` picks
+the evolution. Output files are named by sprite_cache_filename of the CDN URL, written
+to a directory or streamed into a zip (when -o ends in .zip). Phase timings and
+throughput (sprites/s) are reported on stderr.
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from config import ENCODE_WORKERS, GODOT_BIN
+from core.encode import encode_batch
+from sprite_pack import fetch_original_sizes, read_manifest, resize_all, resolve_stage_names, write_zip
+from timing import PhaseTimer
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Resize and encode a batch of sprites/avatars")
+    parser.add_argument("manifest", type=Path, help="CSV or JSON manifest")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output directory, or a .zip file")
+    parser.add_argument("--catalog", type=Path, help="miscrits.json used to resolve evolution stage names")
+    parser.add_argument("--processes", type=int, default=None, help="resize processes (default: CPU count)")
+    parser.add_argument("--encoders", type=int, default=ENCODE_WORKERS, help="concurrent Godot processes")
+    parser.add_argument("--godot", type=Path, default=GODOT_BIN, help="Godot binary")
+    parser.add_argument("--skip-encode", action="store_true", help="pack the resized PNGs without encoding")
+    args = parser.parse_args(argv)
+
+    timer = PhaseTimer()
+    try:
+        with timer.phase("manifest"):
+            items = read_manifest(args.manifest)
+            if args.catalog:
+                with open(args.catalog, "r", encoding="utf-8") as f:
+                    items = resolve_stage_names(items, json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    names = {}
+    for item in items:
+        if item.cache_name in names:
+            print(f"warning: {item.kind} of {item.name} listed twice, the last row wins", file=sys.stderr)
+        names[item.cache_name] = item
+    items = list(names.values())
+
+    if not args.skip_encode and not args.godot.exists():
+        print(f"error: Godot binary not found at {args.godot}", file=sys.stderr)
+        return 2
+
+    workdir = Path(tempfile.mkdtemp(prefix="miscrits_pack_"))
+    try:
+        with timer.phase("sizes"):
+            original_sizes = fetch_original_sizes(items)
+        with timer.phase("resize"):
+            pngs = resize_all(items, original_sizes, workdir / "resized", args.processes)
+
+        if args.skip_encode:
+            outputs = [(f"{item.cache_name}.png", png) for item, png in zip(items, pngs)]
+        else:
+            encoded_dir = workdir / "encoded"
+            encoded_dir.mkdir()
+            pairs = [(png, encoded_dir / item.cache_name) for item, png in zip(items, pngs)]
+            with timer.phase("encode"):
+                results = encode_batch(pairs, godot_bin=args.godot, workers=args.encoders)
+            outputs = []
+            for item, (_, dst), ok in zip(items, pairs, results):
+                if ok:
+                    outputs.append((item.cache_name, dst))
+                else:
+                    print(f"failed: {item.kind} of {item.name} ({item.image})", file=sys.stderr)
+
+        with timer.phase("pack"):
+            if args.output.suffix.lower() == ".zip":
+                write_zip(outputs, args.output)
+            else:
+                args.output.mkdir(parents=True, exist_ok=True)
+                for arcname, path in outputs:
+                    shutil.copyfile(path, args.output / arcname)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total = sum(timer.totals.values())
+    print(f"Packed {len(outputs)}/{len(items)} files -> {args.output}", file=sys.stderr)
+    print(timer.report(), file=sys.stderr)
+    print(f"  throughput {len(outputs) / total if total else 0.0:.1f} sprites/s", file=sys.stderr)
+    return 0 if len(outputs) == len(items) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
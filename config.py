@@ -4,6 +4,7 @@ Configuration constants for the Miscrits Sprite Replacer
 from pathlib import Path
 import os
 import platform
+import tempfile
 
 # Paths
 ROOT = Path(__file__).parent.resolve()
@@ -17,17 +18,25 @@ else:
     # Ensure this filename matches EXACTLY what you upload to the bin/ folder
     GODOT_BIN_NAME = "Godot_v4.1-stable_linux.x86_64" 
 
-GODOT_BIN = ROOT / "bin" / GODOT_BIN_NAME
+# MISCRITS_GODOT_BIN swaps in another encoder (benchmarks/stub_godot.py for load tests)
+GODOT_BIN = Path(os.environ.get("MISCRITS_GODOT_BIN") or ROOT / "bin" / GODOT_BIN_NAME)
 
 ENCODE_SCRIPT = ROOT / "gd_scripts" / "crits_single_encode.gd"
 FAVICON_PATH = ROOT / "assets" / "favicon.ico"
 BOSSES_CATALOG_PATH = ROOT / "assets" / "bosses.json"
 
+# Persistent cache (last good catalog snapshot etc.)
+CACHE_DIR = Path(os.environ.get("MISCRITS_CACHE_DIR", ROOT / ".cache"))
+CATALOG_SNAPSHOT_PATH = CACHE_DIR / "miscrits.json.gz"
+
 # CDN URLs
 MISCRITS_JSON_URL = "https://miscrits-proxy.yatosquare.workers.dev/"
 ELEMENT_ICON_BASE = "https://worldofmiscrits.com"
 SPRITE_CDN_BASE = "https://cdn.worldofmiscrits.com/miscrits"
 AVATAR_CDN_BASE = "https://cdn.worldofmiscrits.com/avatars"
+# Send every asset and catalog request to <proxy>/<host>/<path> instead (e.g. the
+# stand-in CDN of benchmarks/stand_in_cdn.py). URLs and cache keys stay canonical.
+ASSET_PROXY = os.environ.get("MISCRITS_ASSET_PROXY", "").rstrip("/")
 
 # Local miscrits.json path
 if system == "Windows":
@@ -43,5 +52,62 @@ AVATAR_SIZE = (50, 50)
 PREVIEW_CANVAS_SIZE = (256, 256)
 AVATAR_PREVIEW_SIZE = (128, 128)
 
+# Search
+# Whole-query and per-word synonyms applied before matching
+SEARCH_SYNONYMS = {
+    "gb": "global boss",
+    "globalboss": "global boss",
+}
+SEARCH_RESULT_CACHE_SIZE = 128
+
+# Sprite caches are keyed on the catalog version; this only bounds their size
+SPRITE_CACHE_MAX_ENTRIES = 512
+
+# Moves Editor undo history: hard caps on steps and on individual changes held
+UNDO_MAX_STEPS = 100
+UNDO_MAX_ITEMS = 20000
+# Consecutive edits of the same field within this many seconds undo as one step
+UNDO_COALESCE_SECONDS = 2.0
+
 # Timeouts
 FETCH_TIMEOUT = 5
+
+# Memory accounting: a log line every this many seconds (0 = off) and optional
+# tracemalloc (allocation sites in the ?admin=memory view; slows the app down)
+MEMORY_LOG_INTERVAL = int(os.environ.get("MISCRITS_MEMORY_LOG_INTERVAL", "0"))
+MEMORY_TRACEMALLOC = os.environ.get("MISCRITS_TRACEMALLOC", "") == "1"
+# Admin views (?admin=memory&token=...) need this token; unset disables them
+ADMIN_TOKEN = os.environ.get("MISCRITS_ADMIN_TOKEN", "")
+
+# Timing spans and counters (core.metrics); also switchable from the sidebar debug panel
+METRICS_ENABLED = os.environ.get("MISCRITS_METRICS", "") == "1"
+
+# Godot processes run side by side when encoding a batch of sprites
+ENCODE_WORKERS = 2
+
+# Background jobs (encodes): job table, content-addressed results, worker threads
+JOBS_DB_PATH = CACHE_DIR / "jobs.sqlite3"
+ARTIFACT_DIR = CACHE_DIR / "artifacts"
+JOB_WORKERS = 2
+# Seconds between job status refreshes in the views
+JOB_POLL_INTERVAL = 0.5
+# Finished jobs (and results nothing references) are dropped after JOB_TTL seconds;
+# the artifact store is kept under ARTIFACT_QUOTA bytes, checked every JOB_PRUNE_INTERVAL
+JOB_TTL = 3600
+ARTIFACT_QUOTA = 1024 * 1024 * 1024
+JOB_PRUNE_INTERVAL = 300
+
+# Scratch storage: session workdirs and shared previews (disposable)
+SCRATCH_DIR = Path(os.environ.get("MISCRITS_SCRATCH_DIR", Path(tempfile.gettempdir()) / "miscrits_scratch"))
+# Workdirs of sessions not seen for this many seconds are removed
+SCRATCH_SESSION_TTL = 3600
+SCRATCH_SESSION_QUOTA = 128 * 1024 * 1024
+SCRATCH_TOTAL_QUOTA = 2 * 1024 * 1024 * 1024
+SCRATCH_REAP_INTERVAL = 300
+# Uploads held in memory across all sessions; the rest spill to scratch storage
+BLOB_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Catalog refresh: snapshots older than this are revalidated in the background
+CATALOG_REFRESH_INTERVAL = 1800
+# Minimum delay between upstream attempts after a failure
+CATALOG_RETRY_INTERVAL = 60
@@ -0,0 +1,21 @@
+"""
+Streamlit-free core of the Miscrits Sprite Tool.
+
+    core.fetch          CDN URLs, cache filenames and HTTP fetches
+    core.image          canvas placement and the replacement sizing rule
+    core.catalog        read-only Miscrit catalog and JSON file loading
+    core.catalog_store  stale-while-revalidate miscrits.json snapshots
+    core.encode         Godot sprite encoding (single and batched, cancellable)
+    core.jobs           job table, worker threads and content-addressed artifacts
+    core.encode_jobs    encode handlers for the job service
+    core.scratch        per-session workdirs, shared previews, quotas and reaper
+    core.blobs          upload blob store (memory LRU spilled to scratch)
+    core.metrics        timing spans, counters and per-run traces
+    core.memory         deep sizes, RSS, tracemalloc and the periodic memory log
+
+Nothing here imports streamlit or reports through the UI: failures are raised or
+returned, and the modules at the top level (data_loader, image_utils, encoder,
+job_service, session_manager, memory_accounting) adapt them to Streamlit caching and
+st.error. Submodules are not imported eagerly, so
+importing one part does not pay for the others.
+"""
@@ -0,0 +1,89 @@
+"""
+Blob store for large per-session payloads (uploads): session state holds only a handle.
+
+Blobs are addressed by sha256, so identical uploads from many sessions are stored once.
+The memory tier is an LRU bounded by a global byte budget; evicted blobs spill to files
+that are read back through mmap, so a cold blob costs page cache, not heap. Spilled
+files may be removed by whoever owns the directory (the scratch reaper): get() then
+returns None and the caller asks for the upload again.
+"""
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class BlobStore:
+    """Memory LRU over a directory of spilled blobs"""
+
+    def __init__(self, spill_dir: Path, memory_budget: int):
+        self.spill_dir = Path(spill_dir)
+        self.memory_budget = memory_budget
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def path(self, handle: str) -> Path:
+        return self.spill_dir / handle[:2] / f"{handle}.blob"
+
+    def put(self, data: bytes) -> str:
+        """Store data; returns its handle"""
+        handle = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if handle in self._memory:
+                self._memory.move_to_end(handle)
+                return handle
+            if len(data) > self.memory_budget // 4:
+                # Too big to be worth a share of the memory tier
+                self._spill(handle, data)
+                return handle
+            self._memory[handle] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_budget:
+                old, old_data = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_data)
+                self._spill(old, old_data)
+        return handle
+
+    def get(self, handle: Optional[str]) -> Optional[Buffer]:
+        """The blob's bytes (an mmap once spilled), or None if it is gone"""
+        if not handle:
+            return None
+        with self._lock:
+            data = self._memory.get(handle)
+            if data is not None:
+                self._memory.move_to_end(handle)
+                return data
+        path = self.path(handle)
+        try:
+            with open(path, "rb") as f:
+                os.utime(f.fileno())
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _spill(self, handle: str, data: bytes) -> None:
+        path = self.path(handle)
+        if path.exists():
+            os.utime(path)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,229 @@
+"""
+Compact, read-only catalog of Miscrit evolution stages.
+
+Every stage used to be its own dict repeating the names list, locations and the
+element/rarity strings of its Miscrit. Here each stage is a small slotted record that
+points at one shared per-Miscrit record holding interned strings and name/location
+tuples.
+"""
+import hashlib
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+def fingerprint(content: bytes) -> str:
+    """Content fingerprint of a catalog file; derived artifacts are keyed on it"""
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _intern(value):
+    """Intern plain strings so repeated values share one object"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class MiscritInfo:
+    """Fields shared by every evolution stage of one Miscrit"""
+    __slots__ = (
+        "id", "base_name", "total_stages", "element", "rarity",
+        "image", "locations", "all_names", "stages",
+    )
+
+    def __init__(self, id, base_name, total_stages, element, rarity, image, locations, all_names):
+        self.id = id
+        self.base_name = base_name
+        self.total_stages = total_stages
+        self.element = element
+        self.rarity = rarity
+        self.image = image
+        self.locations = locations
+        self.all_names = all_names
+        self.stages: Tuple["CatalogEntry", ...] = ()
+
+    def __reduce__(self):
+        # stages go through __setstate__ so the info <-> stage cycle pickles
+        return (MiscritInfo, (
+            self.id, self.base_name, self.total_stages, self.element,
+            self.rarity, self.image, self.locations, self.all_names,
+        ), self.stages)
+
+    def __setstate__(self, stages):
+        self.stages = stages
+
+
+def _shared_field(name: str) -> property:
+    return property(lambda self: getattr(self._info, name), doc=f"Shared `{name}` of the Miscrit")
+
+
+class CatalogEntry:
+    """
+    One evolution stage of a Miscrit.
+    Only the stage number and name are stored per stage; the rest is read through the
+    shared MiscritInfo. Supports the dict-style access (`m["id"]`, `m.get("rarity")`)
+    the views use.
+    """
+    __slots__ = ("_info", "evo_stage", "evo_name")
+
+    FIELDS = (
+        "id", "base_name", "evo_stage", "evo_name", "total_stages",
+        "element", "rarity", "image", "locations", "all_names",
+    )
+
+    id = _shared_field("id")
+    base_name = _shared_field("base_name")
+    total_stages = _shared_field("total_stages")
+    element = _shared_field("element")
+    rarity = _shared_field("rarity")
+    image = _shared_field("image")
+    locations = _shared_field("locations")
+    all_names = _shared_field("all_names")
+
+    def __init__(self, info: MiscritInfo, evo_stage: int, evo_name: str):
+        setter = object.__setattr__
+        setter(self, "_info", info)
+        setter(self, "evo_stage", evo_stage)
+        setter(self, "evo_name", evo_name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CatalogEntry is read-only")
+
+    def __reduce__(self):
+        return (CatalogEntry, (self._info, self.evo_stage, self.evo_name))
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS
+
+    def get(self, key: str, default=None):
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def to_dict(self) -> Dict:
+        """Plain dict copy (the legacy per-stage representation)"""
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CatalogEntry):
+            return NotImplemented
+        return self.id == other.id and self.evo_stage == other.evo_stage
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.evo_stage))
+
+    def __repr__(self) -> str:
+        return f"CatalogEntry(id={self.id!r}, evo_stage={self.evo_stage!r}, evo_name={self.evo_name!r})"
+
+
+class Catalog(Sequence):
+    """
+    Immutable sequence of CatalogEntry records with an id -> stages index.
+    Meant to be shared by reference (st.cache_resource), never copied per caller.
+    `version` is the fingerprint of the miscrits.json it was built from.
+    """
+
+    def __init__(self, entries: List[CatalogEntry], version: str = ""):
+        self.version = version
+        self._entries: Tuple[CatalogEntry, ...] = tuple(entries)
+        self._by_id: Dict[int, MiscritInfo] = {}
+        for entry in self._entries:
+            self._by_id.setdefault(entry.id, entry._info)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self._entries[index]
+
+    def stages(self, miscrit_id: int) -> Tuple[CatalogEntry, ...]:
+        """All evolution stages of a Miscrit, ordered by stage"""
+        info = self._by_id.get(miscrit_id)
+        return info.stages if info else ()
+
+    def stage(self, miscrit_id: int, stage: int) -> Optional[CatalogEntry]:
+        """A single evolution stage, or None"""
+        for entry in self.stages(miscrit_id):
+            if entry.evo_stage == stage:
+                return entry
+        return None
+
+    def first_stages(self) -> List[CatalogEntry]:
+        """Stage-1 entry of every Miscrit, in catalog order"""
+        return [info.stages[0] for info in self._by_id.values() if info.stages]
+
+
+class BossCatalog(list):
+    """The bosses.json list, tagged with the fingerprint of the file"""
+
+    def __init__(self, entries: List[Dict], version: str = ""):
+        super().__init__(entries)
+        self.version = version
+
+
+def build_catalog(data: List[Dict], version: str = "") -> Catalog:
+    """
+    Process raw miscrits.json data into a Catalog of evolution stages.
+    Field defaults match the previous list-of-dicts representation.
+    """
+    shared_tuples: Dict[tuple, tuple] = {}
+
+    def shared(values) -> tuple:
+        key = tuple(_intern(v) for v in values)
+        try:
+            return shared_tuples.setdefault(key, key)
+        except TypeError:
+            # Unhashable items (e.g. dict locations): keep a private tuple
+            return key
+
+    entries = []
+    for miscrit in data:
+        names = shared(miscrit.get("names", [miscrit.get("name", "Unknown")]))
+        info = MiscritInfo(
+            miscrit.get("id"),
+            names[0] if names else "Unknown",
+            len(names),
+            _intern(miscrit.get("element", "None")),
+            _intern(miscrit.get("rarity", "Common")),
+            miscrit.get("image"),
+            shared(miscrit.get("locations", [])),
+            names,
+        )
+        info.stages = tuple(CatalogEntry(info, evo_idx + 1, evo_name) for evo_idx, evo_name in enumerate(names))
+        entries.extend(info.stages)
+
+    return Catalog(entries, version)
+
+
+def get_miscrit_by_id_and_stage(miscrits: List[Dict], miscrit_id: int, stage: int) -> Optional[Dict]:
+    """Get a specific evolution stage of a miscrit"""
+    if isinstance(miscrits, Catalog):
+        return miscrits.stage(miscrit_id, stage)
+    for m in miscrits:
+        if m["id"] == miscrit_id and m["evo_stage"] == stage:
+            return m
+    return None
+
+
+def get_all_stages_for_miscrit(miscrits: List[Dict], miscrit_id: int) -> List[Dict]:
+    """Get all evolution stages for a given miscrit ID"""
+    if isinstance(miscrits, Catalog):
+        return list(miscrits.stages(miscrit_id))
+    stages = [m for m in miscrits if m["id"] == miscrit_id]
+    return sorted(stages, key=lambda x: x["evo_stage"])
+
+
+def read_json_file(path: Path):
+    """Parse a JSON file from its bytes (json.loads decodes UTF-8 itself: no text copy)"""
+    return json.loads(Path(path).read_bytes())
@@ -0,0 +1,225 @@
+"""
+Stale-while-revalidate store for the remote miscrits.json.
+
+The last good response is kept on disk (gzip) and loaded at startup, so requests never
+wait on the upstream once a snapshot exists. Stale snapshots are revalidated in a
+background thread with a conditional GET and swapped in atomically.
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from core import metrics
+from core.catalog import Catalog, build_catalog, fingerprint
+from core.fetch import routed_url
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """One immutable version of miscrits.json: compressed bytes plus the derived Catalog"""
+
+    @property
+    def version(self) -> str:
+        return self.catalog.version
+
+    def __init__(self, compressed: bytes, catalog: Catalog, etag: Optional[str],
+                 last_modified: Optional[str], fetched_at: float):
+        self.compressed = compressed
+        self.catalog = catalog
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def load_document(self) -> List[Dict]:
+        """Parse a fresh, private copy of the raw miscrits.json"""
+        return json.loads(gzip.decompress(self.compressed))
+
+    def revalidated(self, fetched_at: float) -> "CatalogSnapshot":
+        """Same content, new freshness timestamp (after a 304)"""
+        return CatalogSnapshot(self.compressed, self.catalog, self.etag, self.last_modified, fetched_at)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class CatalogStore:
+    """
+    Holds the current CatalogSnapshot and keeps it fresh.
+    get() only blocks on the network when there is no snapshot at all (first run);
+    concurrent first-run callers share that one fetch.
+    """
+
+    def __init__(self, url: str, path: Path, refresh_interval: float,
+                 timeout: float, retry_interval: float = 60):
+        self.url = url
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.name + ".meta.json")
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.last_error: Optional[str] = None
+
+        self._current: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        # Notified when a refresh ends, for blocking callers that found one in flight
+        self._refreshed = threading.Condition(self._lock)
+        self._refreshing = False
+        self._next_attempt = 0.0
+        self._loaded_disk = False
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def get(self) -> Optional[CatalogSnapshot]:
+        """Current snapshot; schedules a background refresh when it is stale"""
+        snapshot = self._current
+        if snapshot is None:
+            with self._lock:
+                if not self._loaded_disk:
+                    self._loaded_disk = True
+                    self._current = self._read_disk()
+            snapshot = self._current
+
+        if snapshot is None:
+            # Cold start without a snapshot: nothing to serve, fetch synchronously
+            self._refresh(blocking=True)
+            return self._current
+
+        if time.time() - snapshot.fetched_at > self.refresh_interval:
+            self._refresh(blocking=False)
+        return snapshot
+
+    def refresh_now(self) -> Optional[CatalogSnapshot]:
+        """Revalidate immediately (ignores the retry throttle)"""
+        self._next_attempt = 0.0
+        self._refresh(blocking=True)
+        return self._current
+
+    # ------------------------------
+    # Refresh
+    # ------------------------------
+    def _refresh(self, blocking: bool) -> None:
+        with self._lock:
+            if self._refreshing:
+                if blocking:
+                    # Another caller is already fetching: wait for its result
+                    self._refreshed.wait_for(lambda: not self._refreshing)
+                return
+            if time.time() < self._next_attempt:
+                return
+            self._refreshing = True
+
+        if blocking:
+            self._revalidate()
+        else:
+            threading.Thread(target=self._revalidate, name="catalog-refresh", daemon=True).start()
+
+    def _revalidate(self) -> None:
+        current = self._current
+        headers = {}
+        if current is not None:
+            if current.etag:
+                headers["If-None-Match"] = current.etag
+            if current.last_modified:
+                headers["If-Modified-Since"] = current.last_modified
+
+        try:
+            with metrics.span("catalog_fetch"):
+                resp = requests.get(routed_url(self.url), headers=headers, timeout=self.timeout)
+            metrics.inc("fetch_bytes", len(resp.content), source="catalog")
+            now = time.time()
+            if resp.status_code == 304 and current is not None:
+                snapshot = current.revalidated(now)
+                self._swap(snapshot)
+                self._write_meta(snapshot)
+            else:
+                resp.raise_for_status()
+                version = fingerprint(resp.content)
+                etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                if current is not None and current.version == version:
+                    # Unchanged content (upstream ignored the validators): keep every
+                    # derived artifact, only refresh the validators and timestamp
+                    snapshot = CatalogSnapshot(current.compressed, current.catalog, etag, last_modified, now)
+                    self._swap(snapshot)
+                    self._write_meta(snapshot)
+                else:
+                    catalog = build_catalog(json.loads(resp.content), version)
+                    snapshot = CatalogSnapshot(
+                        gzip.compress(resp.content, compresslevel=6), catalog, etag, last_modified, now,
+                    )
+                    self._swap(snapshot)
+                    self._persist(snapshot)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            self._next_attempt = time.time() + self.retry_interval
+            logger.warning("Catalog refresh from %s failed: %s", self.url, e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._refreshed.notify_all()
+
+    def _swap(self, snapshot: CatalogSnapshot) -> None:
+        # A single reference assignment: readers see either the old or the new snapshot
+        self._current = snapshot
+
+    # ------------------------------
+    # Disk
+    # ------------------------------
+    def _persist(self, snapshot: CatalogSnapshot) -> None:
+        try:
+            _atomic_write(self.path, snapshot.compressed)
+        except OSError as e:
+            logger.warning("Could not write catalog snapshot %s: %s", self.path, e)
+            return
+        self._write_meta(snapshot)
+
+    def _write_meta(self, snapshot: CatalogSnapshot) -> None:
+        meta = {
+            "etag": snapshot.etag,
+            "last_modified": snapshot.last_modified,
+            "fetched_at": snapshot.fetched_at,
+        }
+        try:
+            _atomic_write(self.meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            logger.warning("Could not write catalog snapshot metadata: %s", e)
+
+    def _read_disk(self) -> Optional[CatalogSnapshot]:
+        if not self.path.exists():
+            return None
+        try:
+            compressed = self.path.read_bytes()
+            content = gzip.decompress(compressed)
+            catalog = build_catalog(json.loads(content), fingerprint(content))
+            meta = {}
+            if self.meta_path.exists():
+                meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            return CatalogSnapshot(
+                compressed, catalog, meta.get("etag"), meta.get("last_modified"),
+                float(meta.get("fetched_at", 0.0)),
+            )
+        except Exception as e:
+            logger.warning("Ignoring unreadable catalog snapshot %s: %s", self.path, e)
+            return None
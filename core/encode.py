@@ -0,0 +1,86 @@
+"""
+Sprite encoding with Godot (the game's cache format)
+"""
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from config import ENCODE_SCRIPT, ENCODE_WORKERS, GODOT_BIN
+from core import metrics
+
+# In/out pairs per Godot start; keeps the command line well below OS limits
+ENCODE_CHUNK = 64
+# Seconds between cancellation checks while a Godot process runs
+CANCEL_POLL_SECONDS = 0.1
+
+# Returns True once the caller wants the encode stopped
+CancelHook = Callable[[], bool]
+
+
+class EncodeError(RuntimeError):
+    """Godot could not encode a sprite"""
+
+
+def _command(pairs: Sequence[Tuple[Path, Path]], godot_bin: Path, script: Path) -> List[str]:
+    cmd = [str(godot_bin), "--headless", "--script", str(script), "--"]
+    for src, dst in pairs:
+        cmd += [str(src), str(dst)]
+    return cmd
+
+
+@metrics.timed()
+def encode_sprite(input_path: Path, output_path: Path, godot_bin: Path = GODOT_BIN,
+                  script: Path = ENCODE_SCRIPT) -> bytes:
+    """Encode one image; returns the encoded bytes or raises EncodeError"""
+    try:
+        result = subprocess.run(_command([(input_path, output_path)], godot_bin, script),
+                                capture_output=True, text=True)
+    except OSError as e:
+        raise EncodeError(str(e)) from e
+    if result.returncode != 0 or not Path(output_path).exists():
+        raise EncodeError(result.stderr.strip() or f"Godot exited with status {result.returncode}")
+    try:
+        return Path(output_path).read_bytes()
+    except OSError as e:
+        raise EncodeError(f"Failed to read encoded file: {e}") from e
+
+
+def _encode_chunk(pairs: Sequence[Tuple[Path, Path]], godot_bin: Path, script: Path,
+                  cancelled: Optional[CancelHook] = None) -> List[bool]:
+    if cancelled is not None and cancelled():
+        return [False] * len(pairs)
+    try:
+        proc = subprocess.Popen(_command(pairs, godot_bin, script),
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return [False] * len(pairs)
+    while True:
+        try:
+            proc.wait(timeout=CANCEL_POLL_SECONDS if cancelled is not None else None)
+            break
+        except subprocess.TimeoutExpired:
+            if cancelled():
+                proc.kill()
+                proc.wait()
+                return [False] * len(pairs)
+    # Failures are per pair: judge each by its output file
+    return [Path(dst).exists() for _, dst in pairs]
+
+
+@metrics.timed()
+def encode_batch(pairs: Sequence[Tuple[Path, Path]], godot_bin: Path = GODOT_BIN,
+                 script: Path = ENCODE_SCRIPT, workers: int = ENCODE_WORKERS, chunk: int = ENCODE_CHUNK,
+                 cancelled: Optional[CancelHook] = None) -> List[bool]:
+    """
+    Encode many (png_in, encrypted_out) pairs with a few Godot starts.
+    Chunks run concurrently on `workers` Godot processes; returns success per pair.
+    Once `cancelled()` is true, running Godot processes are killed and chunks not yet
+    started are skipped (their pairs report False).
+    """
+    for _, dst in pairs:
+        Path(dst).unlink(missing_ok=True)
+    chunks = [pairs[i:i + chunk] for i in range(0, len(pairs), chunk)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = pool.map(lambda c: _encode_chunk(c, godot_bin, script, cancelled), chunks)
+        return [ok for chunk_result in results for ok in chunk_result]
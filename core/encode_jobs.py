@@ -0,0 +1,55 @@
+"""
+Encode jobs for the job service (core.jobs).
+
+Inputs are PNG artifacts, so a job's id covers the exact pixels it encodes:
+    encode_sprite  {"png": digest, "name": cache_name}             -> encoded file
+    encode_pack    {"files": [[cache_name, png digest], ...]}      -> zip of encoded files
+"""
+import zipfile
+from pathlib import Path
+from typing import Dict
+
+from config import ENCODE_WORKERS
+from core.encode import encode_batch
+from core.jobs import JobContext, JobService
+
+ENCODE_SPRITE = "encode_sprite"
+ENCODE_PACK = "encode_pack"
+
+
+def encode_sprite_job(ctx: JobContext, params: Dict) -> Path:
+    src = ctx.artifacts.path(params["png"])
+    dst = ctx.workdir / params["name"]
+    ctx.progress(0.1, "Encrypting...")
+    ok = encode_batch([(src, dst)], workers=1, cancelled=ctx.cancelled)[0]
+    ctx.check()
+    if not ok:
+        raise RuntimeError(f"Encoding failed for {params['name']}")
+    return dst
+
+
+def encode_pack_job(ctx: JobContext, params: Dict) -> Path:
+    files = params["files"]
+    pairs = [(ctx.artifacts.path(png), ctx.workdir / name) for name, png in files]
+    ctx.progress(0.05, f"Encrypting {len(pairs)} files...")
+    # Split the batch evenly so the Godot processes run side by side
+    chunk = max(1, -(-len(pairs) // ENCODE_WORKERS))
+    results = encode_batch(pairs, workers=ENCODE_WORKERS, chunk=chunk, cancelled=ctx.cancelled)
+    ctx.check()
+    failed = [name for (name, _), ok in zip(files, results) if not ok]
+    if failed:
+        raise RuntimeError(f"Encoding failed for: {', '.join(failed)}")
+
+    ctx.progress(0.9, "Zipping...")
+    zip_path = ctx.workdir / "pack.zip"
+    # Encoded sprites are already compressed: stored as-is
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for _, dst in pairs:
+            ctx.check()
+            zf.write(dst, dst.name)
+    return zip_path
+
+
+def register_encode_jobs(service: JobService) -> None:
+    service.register(ENCODE_SPRITE, encode_sprite_job)
+    service.register(ENCODE_PACK, encode_pack_job)
@@ -0,0 +1,76 @@
+"""
+CDN URLs, cache filenames and HTTP fetches of game assets
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import ASSET_PROXY, AVATAR_CDN_BASE, ELEMENT_ICON_BASE, FETCH_TIMEOUT, SPRITE_CDN_BASE
+from core import metrics
+
+# Fallback when an original sprite can't be fetched
+DEFAULT_SPRITE_SIZE = (256, 256)
+
+
+def sprite_cdn_url(name: str, suffix: str = "_back") -> str:
+    """Build CDN URL for a miscrit sprite"""
+    slug = name.replace(" ", "_").lower()
+    return f"{SPRITE_CDN_BASE}/{slug}{suffix}.png"
+
+
+def avatar_cdn_url(name: str) -> str:
+    """Build CDN URL for a Miscrit avatar icon (50x50)"""
+    slug = name.replace(" ", "_").lower()
+    return f"{AVATAR_CDN_BASE}/{slug}_avatar.png"
+
+
+def element_icon_url(element: str) -> str:
+    """Get the element icon URL"""
+    if not element:
+        return ""
+    slug = element.strip().lower().replace(" ", "")
+    return f"{ELEMENT_ICON_BASE}/{slug}.png"
+
+
+def sprite_cache_filename(url: str) -> str:
+    """Cache filename is SHA256 of the full CDN URL"""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def routed_url(url: str) -> str:
+    """Where a canonical URL is actually requested: through ASSET_PROXY when one is set"""
+    if not ASSET_PROXY:
+        return url
+    scheme, sep, rest = url.partition("://")
+    return f"{ASSET_PROXY}/{rest if sep else scheme}"
+
+
+def fetch_bytes(url: str, timeout: float = FETCH_TIMEOUT) -> bytes:
+    """GET a URL; raises requests.RequestException on failure or an error status"""
+    # requests and PIL are imported on first fetch: the URL helpers stay import-cheap
+    import requests
+    with metrics.span("fetch_bytes"):
+        resp = requests.get(routed_url(url), timeout=timeout)
+    resp.raise_for_status()
+    metrics.inc("fetch_bytes", len(resp.content), source="cdn")
+    return resp.content
+
+
+def fetch_image_size(url: str, timeout: float = FETCH_TIMEOUT) -> Optional[Tuple[int, int]]:
+    """Dimensions of a remote image, or None when it can't be fetched or decoded"""
+    from PIL import Image
+    try:
+        return Image.open(BytesIO(fetch_bytes(url, timeout))).size
+    except Exception:
+        return None
+
+
+def fetch_sizes(urls: Iterable[str], timeout: float = FETCH_TIMEOUT, workers: int = 8) -> Dict[str, Tuple[int, int]]:
+    """Image size per URL, fetched concurrently (DEFAULT_SPRITE_SIZE when unavailable)"""
+    urls = sorted(set(urls))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+        sizes = pool.map(lambda url: fetch_image_size(url, timeout) or DEFAULT_SPRITE_SIZE, urls)
+        return dict(zip(urls, sizes))
@@ -0,0 +1,57 @@
+"""
+Image placement and the sizing rule for replacement sprites and avatars
+"""
+from io import BytesIO
+from typing import Tuple
+
+from PIL import Image
+
+from config import AVATAR_SIZE
+
+
+def place_on_canvas(img: Image.Image, canvas_size: Tuple[int, int] = (256, 256)) -> Image.Image:
+    """Center an image on a transparent canvas of fixed size"""
+    canvas = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+    x = (canvas_size[0] - img.width) // 2
+    y = (canvas_size[1] - img.height) // 2
+    canvas.paste(img, (x, y), img)
+    return canvas
+
+
+def blank_canvas(canvas_size: Tuple[int, int] = (256, 256)) -> Image.Image:
+    return Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+
+
+def fit_on_canvas(data: bytes, canvas_size: Tuple[int, int] = (256, 256)) -> Image.Image:
+    """
+    Decode an image, scale it down to fit the canvas keeping its aspect ratio and
+    center it on a transparent canvas. Raises on undecodable data.
+    """
+    img = Image.open(BytesIO(data)).convert("RGBA")
+    img.thumbnail(canvas_size, Image.LANCZOS)
+    return place_on_canvas(img, canvas_size)
+
+
+def target_size(image_size: Tuple[int, int], original_size: Tuple[int, int], scale: float = 1.0,
+                keep_aspect: bool = True, is_avatar: bool = False) -> Tuple[int, int]:
+    """
+    Size a replacement image is resized to.
+    Avatars are always AVATAR_SIZE. Sprites take the original sprite's height times
+    `scale`, with the width following the upload's aspect ratio (or the original's
+    width times `scale` when the aspect is unlocked).
+    """
+    if is_avatar:
+        return AVATAR_SIZE
+    orig_w, orig_h = original_size
+    if keep_aspect:
+        aspect_ratio = image_size[0] / image_size[1]
+        target_h = int(orig_h * scale)
+        return int(target_h * aspect_ratio), target_h
+    return int(orig_w * scale), int(orig_h * scale)
+
+
+def resize_image(img: Image.Image, original_size: Tuple[int, int], scale: float = 1.0,
+                 keep_aspect: bool = True, is_avatar: bool = False) -> Image.Image:
+    """Resize an RGBA image by the target_size rule"""
+    size = target_size(img.size, original_size, scale, keep_aspect, is_avatar)
+    return img.resize(size, Image.LANCZOS)
@@ -0,0 +1,391 @@
+"""
+In-process job service: a persistent job table, worker threads, progress reporting,
+cancellation and content-addressed artifacts.
+
+A job is (kind, params). Its id is the hash of both, and params refer to inputs by
+artifact digest, so two sessions submitting the same work share one job and its
+result. Handlers are plain functions `handler(ctx, params)` registered per kind; the
+bytes (or the file) they return become the job's artifact. Work survives Streamlit reruns:
+views only submit and poll.
+
+A background pruner drops finished jobs untouched for `job_ttl` seconds and artifacts
+no remaining job produced or takes as input, then keeps the store within
+`artifact_quota` bytes, least recently used first. Pruned work simply runs again when
+it is next submitted.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler (by JobContext.check) once the job is cancelled"""
+
+
+class ArtifactStore:
+    """Immutable blobs on disk, addressed by their sha256"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def touch(self, digest: str) -> bool:
+        """Mark an artifact used (its mtime is the LRU clock); False if it is gone"""
+        try:
+            os.utime(self.path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def files(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """(digest, stat) of every stored artifact; job workdirs and temp files are skipped"""
+        for path in self.root.glob("??/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                yield path.name, path.stat()
+            except FileNotFoundError:
+                continue
+
+    def delete(self, digest: str) -> None:
+        self.path(digest).unlink(missing_ok=True)
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not self.touch(digest):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        return digest
+
+    def put_file(self, path: Path) -> str:
+        """Move a finished file into the store (same filesystem as the store expected)"""
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        target = self.path(digest)
+        if self.touch(digest):
+            Path(path).unlink(missing_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(path), str(target))
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        return self.path(digest).read_bytes()
+
+
+class Job:
+    """A row of the job table"""
+    __slots__ = ("id", "kind", "params", "state", "progress", "message", "artifact", "error", "created", "updated")
+
+    def __init__(self, id, kind, params, state, progress, message, artifact, error, created, updated):
+        self.id = id
+        self.kind = kind
+        self.params = json.loads(params) if isinstance(params, str) else params
+        self.state = state
+        self.progress = progress
+        self.message = message
+        self.artifact = artifact
+        self.error = error
+        self.created = created
+        self.updated = updated
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    def __repr__(self) -> str:
+        return f"Job({self.kind!r}, {self.id[:12]}, {self.state}, {self.progress:.0%})"
+
+
+class JobContext:
+    """
+    What a handler gets: progress reporting, cancellation checks, the artifacts (inputs)
+    and a scratch directory removed when the job ends.
+    """
+
+    def __init__(self, service: "JobService", job: Job, workdir: Path):
+        self.service = service
+        self.job = job
+        self.artifacts = service.artifacts
+        self.workdir = workdir
+
+    def cancelled(self) -> bool:
+        """True once the job was cancelled; a hook for long calls that can stop early"""
+        return self.job.id in self.service._cancelled
+
+    def check(self) -> None:
+        """Raise JobCancelled if the job was cancelled; call between steps"""
+        if self.cancelled():
+            raise JobCancelled()
+
+    def progress(self, fraction: float, message: str = "") -> None:
+        self.check()
+        self.service._update(self.job.id, progress=max(0.0, min(1.0, fraction)), message=message)
+
+
+Handler = Callable[[JobContext, Dict], Union[bytes, Path]]
+
+
+def _strings(value: Any) -> Iterator[str]:
+    """Every string in a JSON value; artifact digests in params are among them"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def job_id(kind: str, params: Dict[str, Any]) -> str:
+    """Content address of a job: identical (kind, params) share one job"""
+    canonical = json.dumps([kind, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class JobService:
+    """
+    Job table (sqlite) plus a pool of worker threads.
+    Jobs left queued or running by a previous process are re-queued at start.
+    With prune_interval > 0, prune() runs in the background every that many seconds.
+    """
+
+    def __init__(self, db_path: Path, artifact_dir: Path, workers: int = 2, job_ttl: float = 3600.0,
+                 artifact_quota: int = 1024 * 1024 * 1024, prune_interval: float = 0.0):
+        self.artifacts = ArtifactStore(artifact_dir)
+        self.job_ttl = job_ttl
+        self.artifact_quota = artifact_quota
+        self._handlers: Dict[str, Handler] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._cancelled: set = set()
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL,"
+            " state TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0, message TEXT NOT NULL DEFAULT '',"
+            " artifact TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+        if prune_interval > 0:
+            threading.Thread(target=self._prune_loop, args=(prune_interval,), name="job-pruner", daemon=True).start()
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def register(self, kind: str, handler: Handler) -> None:
+        """Register the handler for a job kind and resume its unfinished jobs"""
+        self._handlers[kind] = handler
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND state IN (?, ?)", (kind, QUEUED, RUNNING),
+            ).fetchall()
+            for (jid,) in rows:
+                self._db.execute("UPDATE jobs SET state = ?, updated = ? WHERE id = ?", (QUEUED, time.time(), jid))
+        for (jid,) in rows:
+            self._queue.put(jid)
+
+    def submit(self, kind: str, params: Dict[str, Any], retry: bool = False) -> Job:
+        """
+        Queue a job, or return the existing one for identical (kind, params).
+        Finished jobs whose artifact is gone run again; failed or cancelled ones only
+        with retry=True.
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind {kind!r}")
+        jid = job_id(kind, params)
+        now = time.time()
+        with self._lock:
+            job = self._get(jid)
+            if job is not None:
+                if job.active or (job.state == DONE and self.artifacts.exists(job.artifact)):
+                    return job
+                if job.state in (FAILED, CANCELLED) and not retry:
+                    return job
+            self._cancelled.discard(jid)
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, kind, params, state, progress, message, artifact, error, created, updated)"
+                " VALUES (?, ?, ?, ?, 0, '', NULL, NULL, ?, ?)",
+                (jid, kind, json.dumps(params, sort_keys=True), QUEUED, now, now),
+            )
+            job = self._get(jid)
+        self._queue.put(jid)
+        return job
+
+    def get(self, jid: str) -> Optional[Job]:
+        with self._lock:
+            return self._get(jid)
+
+    def cancel(self, jid: str) -> None:
+        """Cancel a queued job now, or a running one at its next progress()/check()"""
+        with self._lock:
+            job = self._get(jid)
+            if job is None or not job.active:
+                return
+            self._cancelled.add(jid)
+            if job.state == QUEUED:
+                self._set(jid, state=CANCELLED, message="Cancelled")
+
+    def artifact_path(self, job: Job) -> Optional[Path]:
+        if job.state != DONE or not job.artifact or not self.artifacts.touch(job.artifact):
+            return None
+        return self.artifacts.path(job.artifact)
+
+    def jobs(self, states: Optional[List[str]] = None, limit: int = 100) -> List[Job]:
+        """Most recently updated jobs, optionally filtered by state"""
+        sql, args = "SELECT * FROM jobs", []
+        if states:
+            sql += f" WHERE state IN ({','.join('?' * len(states))})"
+            args = list(states)
+        sql += " ORDER BY updated DESC LIMIT ?"
+        with self._lock:
+            return [Job(*row) for row in self._db.execute(sql, args + [limit]).fetchall()]
+
+    def prune(self) -> Tuple[int, int]:
+        """
+        Delete finished jobs not updated for job_ttl seconds, then artifacts that are
+        unreferenced and as old, then the least recently used ones over artifact_quota.
+        Inputs of queued or running jobs are never deleted. Returns (jobs, artifacts) removed.
+        """
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            jobs_removed = self._db.execute(
+                "DELETE FROM jobs WHERE state NOT IN (?, ?) AND updated < ?", (*ACTIVE_STATES, cutoff),
+            ).rowcount
+            pinned: Set[str] = set()
+            referenced: Set[str] = set()
+            for state, params, artifact in self._db.execute("SELECT state, params, artifact FROM jobs"):
+                inputs = set(_strings(json.loads(params)))
+                referenced |= inputs
+                if artifact:
+                    referenced.add(artifact)
+                if state in ACTIVE_STATES:
+                    pinned |= inputs
+
+        files = sorted(self.artifacts.files(), key=lambda f: f[1].st_mtime)
+        used = sum(stat.st_size for _, stat in files)
+        evicted: List[str] = []
+        for digest, stat in files:
+            if digest in pinned:
+                continue
+            expired = stat.st_mtime < cutoff and digest not in referenced
+            if expired or used > self.artifact_quota:
+                self.artifacts.delete(digest)
+                used -= stat.st_size
+                evicted.append(digest)
+
+        if evicted:
+            # Done jobs whose result is gone would only offer a missing download
+            with self._lock:
+                for i in range(0, len(evicted), 500):
+                    batch = evicted[i:i + 500]
+                    jobs_removed += self._db.execute(
+                        f"DELETE FROM jobs WHERE state = ? AND artifact IN ({','.join('?' * len(batch))})",
+                        (DONE, *batch),
+                    ).rowcount
+        if jobs_removed or evicted:
+            logger.info("Job pruner: removed %d jobs, %d artifacts", jobs_removed, len(evicted))
+        return jobs_removed, len(evicted)
+
+    def _prune_loop(self, interval: float) -> None:
+        while True:
+            try:
+                self.prune()
+            except Exception:
+                logger.exception("Job pruner failed")
+            time.sleep(interval)
+
+    # ------------------------------
+    # Workers
+    # ------------------------------
+    def _work(self) -> None:
+        while True:
+            jid = self._queue.get()
+            try:
+                self._run(jid)
+            except Exception:
+                logger.exception("Job worker crashed on %s", jid)
+
+    def _run(self, jid: str) -> None:
+        with self._lock:
+            job = self._get(jid)
+            if job is None or job.state != QUEUED:
+                # Cancelled while queued, or a duplicate queue entry
+                return
+            if jid in self._cancelled:
+                self._set(jid, state=CANCELLED, message="Cancelled")
+                return
+            self._set(jid, state=RUNNING, message="Started")
+        handler = self._handlers[job.kind]
+        # Scratch space on the store's filesystem, so result files move in without a copy
+        workdir = Path(tempfile.mkdtemp(prefix="job_", dir=self.artifacts.root))
+        try:
+            result = handler(JobContext(self, job, workdir), job.params)
+            digest = self.artifacts.put_file(result) if isinstance(result, Path) else self.artifacts.put(result)
+            self._update(jid, state=DONE, progress=1.0, message="Done", artifact=digest)
+        except JobCancelled:
+            self._update(jid, state=CANCELLED, message="Cancelled")
+        except Exception as e:
+            logger.warning("Job %s (%s) failed: %s", jid[:12], job.kind, e)
+            self._update(jid, state=FAILED, error=str(e), message="Failed")
+        finally:
+            self._cancelled.discard(jid)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # ------------------------------
+    # Table access (callers hold self._lock)
+    # ------------------------------
+    def _get(self, jid: str) -> Optional[Job]:
+        row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (jid,)).fetchone()
+        return Job(*row) if row else None
+
+    def _set(self, jid: str, **fields) -> None:
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), jid))
+
+    def _update(self, jid: str, **fields) -> None:
+        with self._lock:
+            self._set(jid, **fields)
@@ -0,0 +1,129 @@
+"""
+Memory accounting: deep object sizes, process RSS, tracemalloc snapshots and a
+periodic log line.
+
+Sizes are deep (everything reachable, each object counted once). Objects shared
+between sessions (the catalog, moves documents) are accounted once as globals and
+passed in `shared` so no session is charged for them.
+"""
+import gc
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Never descended into: code and type objects are not per-session data
+_SKIP_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+    types.CodeType, types.FrameType,
+)
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Bytes reachable from obj (sys.getsizeof over gc referents). Ids already in `seen`
+    are skipped and the ones visited are added, so a shared seen set splits a graph
+    between several owners without double counting.
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        oid = id(current)
+        if oid in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(oid)
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+        stack.extend(gc.get_referents(current))
+    return total
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def state_sizes(state: Mapping[str, Any], shared: Iterable[Any] = ()) -> Dict[str, int]:
+    """Deep size per session-state key, not counting `shared` objects"""
+    seen = {id(obj) for obj in shared}
+    sizes = {}
+    for key in sorted(state):
+        try:
+            sizes[key] = deep_sizeof(state[key], seen)
+        except Exception:
+            # A value can disappear while another thread runs the session
+            continue
+    return sizes
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+# ------------------------------
+# tracemalloc
+# ------------------------------
+def start_tracing(frames: int = 1) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = 20,
+                    previous: Optional[tracemalloc.Snapshot] = None) -> List[Dict]:
+    """Largest allocation sites by line, or the largest growth since `previous`"""
+    # Leave out tracemalloc's own bookkeeping
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    snapshot = snapshot.filter_traces(ignore)
+    if previous is None:
+        stats = snapshot.statistics("lineno")[:limit]
+        return [{"where": str(s.traceback), "size": s.size, "count": s.count} for s in stats]
+    stats = snapshot.compare_to(previous.filter_traces(ignore), "lineno")[:limit]
+    return [{"where": str(s.traceback), "size": s.size, "growth": s.size_diff, "count": s.count} for s in stats]
+
+
+# ------------------------------
+# Periodic log line
+# ------------------------------
+class MemoryLogger:
+    """Logs the line `report()` returns every `interval` seconds on a daemon thread"""
+
+    def __init__(self, report: Callable[[], str], interval: float):
+        self.report = report
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="memory-log", daemon=True)
+
+    def start(self) -> "MemoryLogger":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                logger.info(self.report())
+            except Exception:
+                logger.exception("Memory accounting failed")
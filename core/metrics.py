@@ -0,0 +1,215 @@
+"""
+Lightweight instrumentation: timing spans, counters and a Prometheus text export.
+
+Off by default (config.METRICS_ENABLED, or set_enabled(True) at runtime). When off, span()
+returns a shared no-op context and @timed / inc() cost a global check and a thread-local
+lookup, so the hooks can stay in hot paths.
+
+While enabled, spans and counters aggregate process-wide (count, total and max seconds
+per span name). Independently, a thread that called begin_run(record=True) records its
+own spans in order, so one script run can be broken down span by span (see end_run())
+without switching collection on for the whole process. propagate() carries that trace
+into worker threads.
+"""
+import functools
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import METRICS_ENABLED
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_local = threading.local()
+_NOOP = nullcontext()
+
+# name -> [count, total seconds, max seconds]
+_spans: Dict[str, List[float]] = {}
+# (name, sorted label items) -> value
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(on: bool) -> None:
+    global _enabled
+    _enabled = bool(on)
+
+
+def reset() -> None:
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+class _Span:
+    __slots__ = ("name", "start", "depth")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = getattr(_local, "depth", 0)
+        _local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.depth = self.depth
+        if _enabled:
+            with _lock:
+                stat = _spans.get(self.name)
+                if stat is None:
+                    _spans[self.name] = [1, elapsed, elapsed]
+                else:
+                    stat[0] += 1
+                    stat[1] += elapsed
+                    if elapsed > stat[2]:
+                        stat[2] = elapsed
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.append((self.name, self.depth, self.start, elapsed))
+        return False
+
+
+def _active() -> bool:
+    """Spans are timed when collection is on or this thread records a run"""
+    return _enabled or getattr(_local, "trace", None) is not None
+
+
+def span(name: str):
+    """Context manager timing a block under `name`"""
+    if not _active():
+        return _NOOP
+    return _Span(name)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator: time every call of the function (under its name by default)"""
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active():
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    """Add to a counter, e.g. inc("cache_requests", cache="sprite", result="hit")"""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+# ------------------------------
+# Per-run traces
+# ------------------------------
+def begin_run(record: bool = False) -> None:
+    """Start recording this thread's spans when `record` or collection is on"""
+    _local.trace = [] if record or _enabled else None
+    _local.depth = 0
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    Wrap fn (before handing it to a thread pool) so its spans join the calling
+    thread's run trace, nested under the current span.
+    """
+    trace, depth = getattr(_local, "trace", None), getattr(_local, "depth", 0)
+    if trace is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        saved = getattr(_local, "trace", None), getattr(_local, "depth", 0)
+        _local.trace, _local.depth = trace, depth
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.trace, _local.depth = saved
+    return wrapper
+
+
+def end_run() -> List[Tuple[str, int, float]]:
+    """Stop recording; this thread's spans as (name, depth, seconds) in start order"""
+    trace = getattr(_local, "trace", None) or []
+    _local.trace = None
+    return [(name, depth, elapsed) for name, depth, _, elapsed in sorted(trace, key=lambda s: s[2])]
+
+
+# ------------------------------
+# Reading
+# ------------------------------
+def span_stats() -> List[Dict]:
+    """One row per span name: count, total_ms, mean_ms, max_ms (slowest total first)"""
+    with _lock:
+        items = [(name, list(stat)) for name, stat in _spans.items()]
+    rows = [
+        {"span": name, "count": int(count), "total_ms": round(total * 1000, 2),
+         "mean_ms": round(total * 1000 / count, 3), "max_ms": round(peak * 1000, 2)}
+        for name, (count, total, peak) in items
+    ]
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
+
+
+def counters() -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    with _lock:
+        return dict(_counters)
+
+
+def counter(name: str, **labels: str) -> float:
+    with _lock:
+        return _counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def _labels(items) -> str:
+    if not items:
+        return ""
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def prometheus_text(prefix: str = "miscrits") -> str:
+    """All spans and counters in the Prometheus text exposition format"""
+    lines = [
+        f"# HELP {prefix}_span_seconds Wall time spent in instrumented spans",
+        f"# TYPE {prefix}_span_seconds summary",
+    ]
+    with _lock:
+        spans = sorted((name, list(stat)) for name, stat in _spans.items())
+        counts = sorted(_counters.items())
+    for name, (count, total, _) in spans:
+        lines.append(f"{prefix}_span_seconds_count{_labels([('span', name)])} {int(count)}")
+        lines.append(f"{prefix}_span_seconds_sum{_labels([('span', name)])} {total:.6f}")
+    lines.append(f"# HELP {prefix}_span_max_seconds Slowest call per span since start or reset")
+    lines.append(f"# TYPE {prefix}_span_max_seconds gauge")
+    for name, (_, _, peak) in spans:
+        lines.append(f"{prefix}_span_max_seconds{_labels([('span', name)])} {peak:.6f}")
+
+    typed = set()
+    for (name, labels), value in counts:
+        metric = f"{prefix}_{name}_total"
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
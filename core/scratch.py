@@ -0,0 +1,225 @@
+"""
+Scratch storage: per-session workdirs tracked by heartbeat, a shared content-addressed
+store for preview images, byte quotas and a background reaper.
+
+Layout under the root:
+    sessions/<session id>/        files of one session (.alive is its heartbeat)
+    shared/<sha[:2]>/<sha>        preview files, deduplicated across sessions
+    blobs/<sha[:2]>/<sha>.blob    uploads spilled by core.blobs (see blobs_dir)
+
+A session that stops sending heartbeats for `session_ttl` seconds has its workdir
+removed, and a spilled upload nobody read for as long goes too. Over the global quota,
+the least recently used shared previews go first, then the oldest session files, and
+only then the least recently used uploads: previews and session files are re-created
+by the app, an upload only by asking the user again.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_FILE = ".alive"
+# Heartbeats touch the disk at most this often per session
+HEARTBEAT_RESOLUTION = 30.0
+
+
+class QuotaExceeded(OSError):
+    """A single file is larger than the per-session quota"""
+
+
+def _files(root: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            try:
+                yield path, path.stat()
+            except FileNotFoundError:
+                continue
+
+
+class ScratchManager:
+    """Workdirs and shared previews under one root, kept within quotas"""
+
+    def __init__(self, root: Path, session_ttl: float, session_quota: int, total_quota: int,
+                 reap_interval: float = 300.0):
+        self.root = Path(root)
+        self.sessions_dir = self.root / "sessions"
+        self.shared_dir = self.root / "shared"
+        # Spill directory for core.blobs; reads touch the files (the LRU clock)
+        self.blobs_dir = self.root / "blobs"
+        self.session_ttl = session_ttl
+        self.session_quota = session_quota
+        self.total_quota = total_quota
+        self.reap_interval = reap_interval
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.shared_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self._last_beat: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._reaper = None
+
+    # ------------------------------
+    # Sessions
+    # ------------------------------
+    def workdir(self, session_id: str) -> Path:
+        """The session's workdir (re-created if it was reaped)"""
+        path = self.sessions_dir / session_id
+        if not path.is_dir():
+            path.mkdir(parents=True, exist_ok=True)
+            self._last_beat.pop(session_id, None)
+            self.heartbeat(session_id)
+        return path
+
+    def heartbeat(self, session_id: str) -> None:
+        """Mark the session alive; cheap enough to call on every script run"""
+        now = time.time()
+        if now - self._last_beat.get(session_id, 0.0) < HEARTBEAT_RESOLUTION:
+            return
+        self._last_beat[session_id] = now
+        path = self.sessions_dir / session_id
+        path.mkdir(parents=True, exist_ok=True)
+        (path / HEARTBEAT_FILE).touch()
+
+    def release(self, session_id: str) -> None:
+        """Delete the session's workdir now"""
+        shutil.rmtree(self.sessions_dir / session_id, ignore_errors=True)
+        self._last_beat.pop(session_id, None)
+
+    def commit(self, session_id: str, path: Path) -> None:
+        """
+        Account for a file just written to the session's workdir: older files of the
+        session are evicted until it fits the per-session quota. A file larger than the
+        quota on its own is deleted and QuotaExceeded raised.
+        """
+        size = Path(path).stat().st_size
+        if size > self.session_quota:
+            Path(path).unlink(missing_ok=True)
+            raise QuotaExceeded(f"{Path(path).name} is {size} bytes; the session limit is {self.session_quota}")
+        self._trim(self._session_files(session_id), self.session_quota, keep=Path(path))
+
+    def _session_files(self, session_id: str) -> List[Tuple[Path, os.stat_result]]:
+        # Files still being written (*.tmp) are left alone
+        return [
+            (p, s) for p, s in _files(self.sessions_dir / session_id)
+            if p.name != HEARTBEAT_FILE and p.suffix != ".tmp"
+        ]
+
+    # ------------------------------
+    # Shared previews
+    # ------------------------------
+    def put_shared(self, data: bytes, suffix: str = "") -> Path:
+        """Store bytes once for all sessions; returns the path (its mtime is the LRU clock)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.shared_dir / digest[:2] / (digest + suffix)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    # ------------------------------
+    # Reaping
+    # ------------------------------
+    def reap(self) -> Tuple[int, int]:
+        """
+        Remove expired workdirs and uploads, then enforce the quotas.
+        Returns (workdirs removed, bytes freed).
+        """
+        now = time.time()
+        removed, freed = 0, 0
+        for session in list(self.sessions_dir.iterdir()):
+            try:
+                alive = (session / HEARTBEAT_FILE).stat().st_mtime
+            except FileNotFoundError:
+                alive = session.stat().st_mtime
+            if now - alive > self.session_ttl:
+                freed += sum(s.st_size for _, s in _files(session))
+                shutil.rmtree(session, ignore_errors=True)
+                self._last_beat.pop(session.name, None)
+                removed += 1
+
+        blob_files = []
+        for path, stat in _files(self.blobs_dir):
+            if path.suffix == ".tmp":
+                continue
+            if now - stat.st_mtime > self.session_ttl:
+                path.unlink(missing_ok=True)
+                freed += stat.st_size
+            else:
+                blob_files.append((path, stat))
+
+        session_files = []
+        for session in self.sessions_dir.iterdir():
+            files = self._session_files(session.name)
+            freed += self._trim(files, self.session_quota)
+            session_files += [(p, s) for p, s in files if p.exists()]
+
+        shared_files = list(_files(self.shared_dir))
+        session_bytes = sum(s.st_size for _, s in session_files)
+        shared_bytes = sum(s.st_size for _, s in shared_files)
+        blob_bytes = sum(s.st_size for _, s in blob_files)
+        if session_bytes + shared_bytes + blob_bytes > self.total_quota:
+            # Previews are re-created on the next render; session files go only if still
+            # over, and uploads (which only the user can re-create) last
+            shared_freed = self._trim(shared_files, max(0, self.total_quota - session_bytes - blob_bytes))
+            shared_bytes -= shared_freed
+            freed += shared_freed
+            if session_bytes + shared_bytes + blob_bytes > self.total_quota:
+                session_freed = self._trim(session_files, max(0, self.total_quota - shared_bytes - blob_bytes))
+                session_bytes -= session_freed
+                freed += session_freed
+            if session_bytes + shared_bytes + blob_bytes > self.total_quota:
+                freed += self._trim(blob_files, max(0, self.total_quota - shared_bytes - session_bytes))
+        if removed or freed:
+            logger.info("Scratch reaper: removed %d workdirs, freed %d bytes", removed, freed)
+        return removed, freed
+
+    @staticmethod
+    def _trim(files: List[Tuple[Path, os.stat_result]], quota: int, keep: Path = None) -> int:
+        """Delete least recently modified files until the rest fit in quota; returns bytes freed"""
+        used = sum(s.st_size for _, s in files)
+        freed = 0
+        for path, stat in sorted(files, key=lambda f: f[1].st_mtime):
+            if used - freed <= quota:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            freed += stat.st_size
+        return freed
+
+    def start(self) -> "ScratchManager":
+        """Reap once now (leftovers of earlier runs), then every reap_interval in the background"""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="scratch-reaper", daemon=True)
+            self._reaper.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _reap_loop(self) -> None:
+        while True:
+            try:
+                self.reap()
+            except Exception:
+                logger.exception("Scratch reaper failed")
+            if self._stop.wait(self.reap_interval):
+                return
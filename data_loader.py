@@ -1,97 +1,130 @@
 """
 Data loading utilities for Miscrits catalog
 (added raw miscrits loader that supports local/upload/server)
+Streamlit adapters: caching and st.error on top of core.catalog / core.catalog_store.
 """
 import json
-import requests
+import os
 import streamlit as st
+from io import BytesIO
 from pathlib import Path
-from typing import List, Dict, Optional, Union
-from config import BOSSES_CATALOG_PATH, MISCRITS_JSON_URL, FETCH_TIMEOUT, MISCRITS_LOCAL_PATH
-
-
-@st.cache_data(ttl=1800)
-def load_miscrits_from_api() -> List[Dict]:
+from typing import Callable, List, Dict, Optional, Union
+from config import (
+    BOSSES_CATALOG_PATH, MISCRITS_JSON_URL, FETCH_TIMEOUT, MISCRITS_LOCAL_PATH,
+    CATALOG_SNAPSHOT_PATH, CATALOG_REFRESH_INTERVAL, CATALOG_RETRY_INTERVAL,
+)
+from core.catalog import (
+    BossCatalog, Catalog, fingerprint, read_json_file,
+    # Re-exported for the views
+    get_all_stages_for_miscrit, get_miscrit_by_id_and_stage,
+)
+from core import metrics
+from core.catalog_store import CatalogStore
+from json_stream import load_json_array
+from moves_model import MovesDocument
+
+
+@st.cache_resource(show_spinner=False)
+def get_catalog_store() -> CatalogStore:
+    """Process-wide store holding the last good miscrits.json snapshot"""
+    return CatalogStore(
+        MISCRITS_JSON_URL,
+        CATALOG_SNAPSHOT_PATH,
+        refresh_interval=CATALOG_REFRESH_INTERVAL,
+        timeout=FETCH_TIMEOUT,
+        retry_interval=CATALOG_RETRY_INTERVAL,
+    )
+
+
+@metrics.timed()
+def load_miscrits_from_api() -> Catalog:
     """
     Load miscrits.json from the API and process into evolution stages (existing behaviour).
-    Returns a list of miscrits with all evolution stages.
+    Returns a shared, read-only Catalog of all evolution stages. Served from the persisted
+    snapshot; stale snapshots are refreshed in the background, so this only waits on the
+    upstream on the very first run.
     """
-    try:
-        response = requests.get(MISCRITS_JSON_URL, timeout=FETCH_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-
-        # Process the data to extract evolution information
-        processed = []
-        for miscrit in data:
-            # Get the names array (evolution stages)
-            names = miscrit.get("names", [miscrit.get("name", "Unknown")])
-
-            # Create entries for each evolution stage
-            for evo_idx, evo_name in enumerate(names):
-                processed.append({
-                    "id": miscrit.get("id"),
-                    "base_name": names[0] if names else "Unknown",
-                    "evo_stage": evo_idx + 1,
-                    "evo_name": evo_name,
-                    "total_stages": len(names),
-                    "element": miscrit.get("element", "None"),
-                    "rarity": miscrit.get("rarity", "Common"),
-                    "image": miscrit.get("image"),
-                    "locations": miscrit.get("locations", []),
-                    "all_names": names
-                })
-
-        return processed
-    except Exception as e:
-        st.error(f"Failed to load miscrits from API: {e}")
-        return []
+    snapshot = get_catalog_store().get()
+    if snapshot is None:
+        st.error(f"Failed to load miscrits from API: {get_catalog_store().last_error}")
+        return Catalog([])
+    return snapshot.catalog
 
 
-@st.cache_data
-def load_boss_catalog() -> List[Dict]:
-    """Load the bosses catalog"""
-    if not BOSSES_CATALOG_PATH.exists():
-        return []
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _build_boss_catalog(version: str, _content: bytes) -> BossCatalog:
+    return BossCatalog(json.loads(_content), version)
 
-    with open(BOSSES_CATALOG_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
+@metrics.timed()
+def load_boss_catalog() -> BossCatalog:
+    """
+    Load the bosses catalog (shared and read-only, like the Miscrits catalog).
+    The file is tiny, so it is re-read each call and only re-parsed when its
+    fingerprint changes.
+    """
+    if not BOSSES_CATALOG_PATH.exists():
+        return BossCatalog([])
 
-def get_miscrit_by_id_and_stage(miscrits: List[Dict], miscrit_id: int, stage: int) -> Optional[Dict]:
-    """Get a specific evolution stage of a miscrit"""
-    for m in miscrits:
-        if m["id"] == miscrit_id and m["evo_stage"] == stage:
-            return m
-    return None
+    content = BOSSES_CATALOG_PATH.read_bytes()
+    return _build_boss_catalog(fingerprint(content), content)
 
 
-def get_all_stages_for_miscrit(miscrits: List[Dict], miscrit_id: int) -> List[Dict]:
-    """Get all evolution stages for a given miscrit ID"""
-    stages = [m for m in miscrits if m["id"] == miscrit_id]
-    return sorted(stages, key=lambda x: x["evo_stage"])
+def catalog_version(dataset: str = "Miscrits") -> str:
+    """Fingerprint of the catalog behind a dataset; key for derived caches"""
+    if dataset == "Bosses":
+        return load_boss_catalog().version
+    return load_miscrits_from_api().version
 
 
 # ------------------------------
 # New helpers for Move Editor
 # ------------------------------
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_json_file(path: str, mtime_ns: int, size: int):
+    return read_json_file(Path(path))
+
+
+# Parses of a file the game keeps rewriting before giving up
+_TORN_READ_ATTEMPTS = 3
+
+
+def load_json_file_cached(path: Path):
+    """
+    Parse a JSON file once per (path, mtime, size).
+    A stat() per call detects when the game rewrites the file; unchanged files are
+    served from memory. The result is shared between callers: treat it as read-only.
+    Raises ValueError if the file changes during each of _TORN_READ_ATTEMPTS parses.
+    """
+    for _ in range(_TORN_READ_ATTEMPTS):
+        before = os.stat(path)
+        key = (str(path), before.st_mtime_ns, before.st_size)
+        data = _load_json_file(*key)
+        after = os.stat(path)
+        if (after.st_mtime_ns, after.st_size) == key[1:]:
+            return data
+        # Rewritten while we were parsing: drop only the torn result and parse again
+        _load_json_file.clear(*key)
+    raise ValueError(f"{path} kept changing while it was being read")
+
+
 def load_miscrits_raw(source: str = "auto", uploaded_bytes: Optional[bytes] = None) -> Optional[List[Dict]]:
     """
     Load the raw miscrits.json as a Python list of dicts.
     source: "auto" (tries local -> uploaded -> api), "local", "upload", "api"
     uploaded_bytes: bytes provided by uploader (if source == "upload")
+    The local game file is memoized (see load_json_file_cached) and must not be mutated.
     """
     try:
         # Upload path provided?
         if source == "upload" and uploaded_bytes is not None:
-            return json.loads(uploaded_bytes.decode("utf-8"))
+            return load_json_array(BytesIO(uploaded_bytes))[0]
 
         # Local file check
         if source in ("auto", "local"):
             try:
                 if MISCRITS_LOCAL_PATH.exists():
-                    with open(MISCRITS_LOCAL_PATH, "r", encoding="utf-8") as f:
-                        return json.load(f)
+                    return load_json_file_cached(MISCRITS_LOCAL_PATH)
             except Exception:
                 # swallow here and try fallback
                 pass
@@ -100,14 +133,44 @@ def load_miscrits_raw(source: str = "auto", uploaded_bytes: Optional[bytes] = No
                 # explicit local requested but failed: return None
                 return None
 
-        # API fallback
+        # API fallback (served from the catalog snapshot)
         if source in ("auto", "api"):
-            resp = requests.get(MISCRITS_JSON_URL, timeout=FETCH_TIMEOUT)
-            resp.raise_for_status()
-            return resp.json()
+            snapshot = get_catalog_store().get()
+            if snapshot is None:
+                raise RuntimeError(get_catalog_store().last_error or "catalog unavailable")
+            return snapshot.load_document()
 
     except Exception as e:
         st.error(f"Failed to load miscrits.json ({source}): {e}")
         return None
 
     return None
+
+
+# ------------------------------
+# Shared Moves Editor documents
+# ------------------------------
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _moves_document(version: str, _load: Callable[[], List[Dict]]) -> MovesDocument:
+    return MovesDocument(_load(), version)
+
+
+@metrics.timed()
+def load_moves_document() -> Optional[MovesDocument]:
+    """
+    Immutable base miscrits.json for the Moves Editor, parsed once per catalog
+    version and shared by every session.
+    """
+    store = get_catalog_store()
+    snapshot = store.get()
+    if snapshot is None:
+        st.error(f"Failed to load miscrits.json (api): {store.last_error}")
+        return None
+    return _moves_document(snapshot.version, snapshot.load_document)
+
+
+def share_moves_document(data: List[Dict], digest: str) -> MovesDocument:
+    """Register an imported document; identical uploads resolve to one shared copy"""
+    # Truncated like core.catalog.fingerprint, so an upload of the live file shares its version
+    return _moves_document(digest[:16], lambda: data)
+
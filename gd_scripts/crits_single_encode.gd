@@ -2,23 +2,24 @@ extends SceneTree
 
 func _init() -> void:
     var args: PackedStringArray = OS.get_cmdline_user_args()
-    if args.size() < 2:
-        push_error("Usage: godot --headless --script crits_single_encode.gd -- <PNG_IN> <ENCRYPTED_OUT>")
-        quit()
+    if args.size() < 2 or args.size() % 2 != 0:
+        push_error("Usage: godot --headless --script crits_single_encode.gd -- <PNG_IN> <ENCRYPTED_OUT> [<PNG_IN> <ENCRYPTED_OUT> ...]")
+        quit(1)
         return
 
-    var image_path: String = args[0]
-    var cache_path: String = args[1]
+    # Any number of in/out pairs: one engine start encodes a whole batch
+    var failed: int = 0
+    for i in range(0, args.size(), 2):
+        if not _encode_one(args[i], args[i + 1]):
+            failed += 1
+    quit(1 if failed > 0 else 0)
 
-    _encode_one(image_path, cache_path)
-    quit()
-
-func _encode_one(image_path: String, cache_path: String) -> void:
+func _encode_one(image_path: String, cache_path: String) -> bool:
     var img: Image = Image.new()
     var err: int = img.load(image_path)
     if err != OK:
         push_error("Failed to load image: " + image_path + " (error code " + str(err) + ")")
-        return
+        return false
 
     var ext: String = image_path.get_extension().to_lower()
     var bytes: PackedByteArray = PackedByteArray()
@@ -33,7 +34,7 @@ func _encode_one(image_path: String, cache_path: String) -> void:
 
     if bytes.is_empty():
         push_error("Could not encode image: " + image_path)
-        return
+        return false
 
     var dir_path: String = cache_path.get_base_dir()
     if dir_path != "":
@@ -42,10 +43,11 @@ func _encode_one(image_path: String, cache_path: String) -> void:
     var f: FileAccess = FileAccess.open(cache_path, FileAccess.WRITE)
     if f == null:
         push_error("Cannot write cache file: " + cache_path)
-        return
+        return false
 
     # Store PNG/JPG bytes as PackedByteArray (same format the game uses)
     f.store_var(bytes, true)
     f.close()
 
     print("Encoded and wrote cache file: " + cache_path)
+    return true
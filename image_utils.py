@@ -1,99 +1,73 @@
 """
-Image processing and display utilities
+Image processing and display utilities (Streamlit adapters over core.fetch / core.image)
 """
-import hashlib
-import requests
 import streamlit as st
 from io import BytesIO
 from PIL import Image
-from pathlib import Path
 from typing import Tuple, Union, Literal
-from config import FETCH_TIMEOUT
-
-
-def sprite_cdn_url(name: str, suffix: str = "_back") -> str:
-    """Build CDN URL for a miscrit sprite"""
-    slug = name.replace(" ", "_").lower()
-    return f"https://cdn.worldofmiscrits.com/miscrits/{slug}{suffix}.png"
-
-
-def avatar_cdn_url(name: str) -> str:
-    """Build CDN URL for a Miscrit avatar icon (50x50)"""
-    slug = name.replace(" ", "_").lower()
-    return f"https://cdn.worldofmiscrits.com/avatars/{slug}_avatar.png"
-
-
-def element_icon_url(element: str) -> str:
-    """Get the element icon URL"""
-    if not element:
-        return ""
-    slug = element.strip().lower().replace(" ", "")
-    return f"https://worldofmiscrits.com/{slug}.png"
-
-
-def sprite_cache_filename(url: str) -> str:
-    """Cache filename is SHA256 of the full CDN URL"""
-    return hashlib.sha256(url.encode("utf-8")).hexdigest()
-
-
-# OPTIMIZATION: Cache this function to prevent re-downloading on every click
-@st.cache_data(show_spinner=False, ttl=3600)
-def load_sprite_on_canvas(url: str, canvas_size: Tuple[int, int] = (256, 256)) -> Image.Image:
+from config import SPRITE_CACHE_MAX_ENTRIES
+# Re-exported: the views import these from here
+from core.fetch import (
+    DEFAULT_SPRITE_SIZE, fetch_bytes, fetch_image_size,
+    sprite_cdn_url, avatar_cdn_url, element_icon_url, sprite_cache_filename,
+)
+from core import metrics
+from core.image import blank_canvas, fit_on_canvas, place_on_canvas
+from session_manager import get_scratch
+
+
+# OPTIMIZATION: Cache this function to prevent re-downloading on every click.
+# Entries are keyed on the catalog version instead of expiring on a timer.
+@st.cache_data(show_spinner=False, max_entries=SPRITE_CACHE_MAX_ENTRIES)
+def _sprite_on_canvas(url: str, canvas_size: Tuple[int, int], catalog_version: str) -> Image.Image:
+    # Runs on cache misses only. Failures raise: st.cache_data keeps only returned
+    # values, so a sprite that failed to load is fetched again next time
+    metrics.inc("cache_misses", cache="sprite")
+    return fit_on_canvas(fetch_bytes(url), canvas_size)
+
+
+@metrics.timed()
+def load_sprite_on_canvas(url: str, canvas_size: Tuple[int, int] = (256, 256), catalog_version: str = "") -> Image.Image:
     """
     Load a sprite from CDN, scale to fit canvas while keeping aspect ratio,
     and center on a transparent canvas.
+    catalog_version only keys the cache: a new game catalog refetches the sprite.
     """
+    metrics.inc("cache_lookups", cache="sprite")
     try:
-        resp = requests.get(url, timeout=FETCH_TIMEOUT)
-        resp.raise_for_status()
+        return _sprite_on_canvas(url, canvas_size, catalog_version)
     except Exception:
-        return Image.new("RGBA", canvas_size, (0, 0, 0, 0))
-    
-    try:
-        img = Image.open(BytesIO(resp.content)).convert("RGBA")
-        img.thumbnail(canvas_size, Image.LANCZOS)
-        
-        canvas = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
-        x = (canvas_size[0] - img.width) // 2
-        y = (canvas_size[1] - img.height) // 2
-        canvas.paste(img, (x, y), img)
-        
-        return canvas
-    except Exception:
-        return Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+        return blank_canvas(canvas_size)
 
 
-def place_on_canvas(img: Image.Image, canvas_size: Tuple[int, int] = (256, 256)) -> Image.Image:
-    """Center an image on a transparent canvas of fixed size"""
-    canvas = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
-    x = (canvas_size[0] - img.width) // 2
-    y = (canvas_size[1] - img.height) // 2
-    canvas.paste(img, (x, y), img)
-    return canvas
+@st.cache_data(show_spinner=False, max_entries=SPRITE_CACHE_MAX_ENTRIES)
+def _original_sprite_size(url: str, catalog_version: str) -> Tuple[int, int]:
+    metrics.inc("cache_misses", cache="sprite_size")
+    size = fetch_image_size(url)
+    if size is None:
+        # Not cached (see _sprite_on_canvas): the fallback is substituted by the caller
+        raise LookupError(f"No image at {url}")
+    return size
 
 
-@st.cache_data(show_spinner=False)
-def get_original_sprite_size(url: str) -> Tuple[int, int]:
-    """Download sprite and return its original dimensions"""
+def get_original_sprite_size(url: str, catalog_version: str = "") -> Tuple[int, int]:
+    """Download sprite and return its original dimensions (cached per catalog version)"""
+    metrics.inc("cache_lookups", cache="sprite_size")
     try:
-        resp = requests.get(url, timeout=FETCH_TIMEOUT)
-        resp.raise_for_status()
-        img = Image.open(BytesIO(resp.content))
-        return img.size
-    except Exception:
-        return (256, 256)
+        return _original_sprite_size(url, catalog_version)
+    except LookupError:
+        return DEFAULT_SPRITE_SIZE
 
 
+@metrics.timed()
 def show_pil_via_file(
-    workdir: Path,
     img: Image.Image,
-    filename: str,
     *,
     caption: str = None,
     width: Union[int, Literal["stretch", "content"]] = "stretch",
 ) -> None:
-    workdir.mkdir(parents=True, exist_ok=True)
-    path = workdir / filename
-
-    img.save(path)
-    st.image(str(path), caption=caption, width=width)
\ No newline at end of file
+    """Show an image from a PNG in shared scratch storage (identical previews share one file)"""
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    path = get_scratch().put_shared(buf.getvalue(), suffix=".png")
+    st.image(str(path), caption=caption, width=width)
@@ -0,0 +1,73 @@
+"""
+Background jobs (Streamlit adapter over core.jobs): the process-wide job service and a
+status panel that polls a job instead of blocking the script run.
+"""
+from io import BytesIO
+from typing import Optional
+
+import streamlit as st
+from PIL import Image
+
+from config import (
+    ARTIFACT_DIR, ARTIFACT_QUOTA, JOB_POLL_INTERVAL, JOB_PRUNE_INTERVAL, JOB_TTL, JOB_WORKERS, JOBS_DB_PATH,
+)
+from core.encode_jobs import register_encode_jobs
+from core.jobs import DONE, FAILED, Job, JobService
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_service() -> JobService:
+    """One job service per server process, shared by every session"""
+    service = JobService(JOBS_DB_PATH, ARTIFACT_DIR, workers=JOB_WORKERS, job_ttl=JOB_TTL,
+                         artifact_quota=ARTIFACT_QUOTA, prune_interval=JOB_PRUNE_INTERVAL)
+    register_encode_jobs(service)
+    return service
+
+
+def store_png(img: Image.Image) -> str:
+    """Save an image as a PNG artifact (a job input); returns its digest"""
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return get_job_service().artifacts.put(buf.getvalue())
+
+
+def render_job(job_id: str, label: str, file_name: str, mime: str = "application/octet-stream"):
+    """
+    Progress (with Cancel) while the job runs, then its download button.
+    Only the panel refreshes while polling; the page reruns once the job ends.
+    """
+    job = get_job_service().get(job_id)
+    polling = job is not None and job.active
+    st.fragment(_job_panel, run_every=JOB_POLL_INTERVAL if polling else None)(
+        job_id, label, file_name, mime, polling,
+    )
+
+
+def _job_panel(job_id: str, label: str, file_name: str, mime: str, polling: bool):
+    service = get_job_service()
+    job: Optional[Job] = service.get(job_id)
+    if job is None:
+        return
+    if job.active:
+        st.progress(job.progress, text=job.message or "Queued...")
+        st.button("✖️ Cancel", key=f"cancel_{job_id}", on_click=service.cancel, args=(job_id,),
+                  use_container_width=True)
+        return
+    if polling:
+        # Finished since the page last ran: stop polling
+        st.rerun()
+
+    path = service.artifact_path(job)
+    if job.state == DONE and path is not None:
+        with open(path, "rb") as f:
+            st.download_button(label, data=f, file_name=file_name, mime=mime, type="primary",
+                               use_container_width=True)
+        return
+    if job.state == FAILED:
+        st.error(job.error or "Job failed")
+    else:
+        st.info("Cancelled")
+    if st.button("🔁 Retry", key=f"retry_{job_id}", use_container_width=True):
+        service.submit(job.kind, job.params, retry=True)
+        # A full run: only it can start the fragment polling again (run_every)
+        st.rerun(scope="app")
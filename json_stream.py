@@ -0,0 +1,124 @@
+"""
+Incremental parsing of large top-level JSON arrays (miscrits.json).
+
+Items are decoded one at a time from fixed-size chunks, so the whole document never
+exists as a second decoded string next to the raw bytes.
+"""
+import codecs
+import hashlib
+import json
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+_WS = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Chunked UTF-8 reader that feeds an optional hasher with the raw bytes"""
+
+    def __init__(self, fp: BinaryIO, chunk_size: int, hasher=None):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.hasher = hasher
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.eof = False
+
+    def read(self, size: Optional[int] = None) -> str:
+        raw = self.fp.read(size or self.chunk_size)
+        if self.hasher is not None and raw:
+            self.hasher.update(raw)
+        if not raw:
+            self.eof = True
+            return self.decoder.decode(b"", final=True)
+        return self.decoder.decode(raw)
+
+
+def iter_json_array(fp: BinaryIO, chunk_size: int = 1 << 16, hasher=None) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array read from a binary file object.
+    Peak memory is one item plus one chunk. `hasher` (e.g. hashlib.sha256()) is updated
+    with every byte read, so the content hash comes for free.
+    Raises json.JSONDecodeError / ValueError on malformed input.
+    """
+    reader = _Reader(fp, chunk_size, hasher)
+    buf = ""
+    pos = 0
+
+    def fill(want: int = 0) -> bool:
+        nonlocal buf, pos
+        if reader.eof:
+            return False
+        buf = buf[pos:] + reader.read(want or None)
+        pos = 0
+        return True
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("Expected a JSON array at the top level")
+    pos += 1
+
+    expect_item = True
+    count = 0
+    while True:
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of JSON array")
+        ch = buf[pos]
+        if ch == "]":
+            if expect_item and count:
+                raise ValueError(f"Trailing ',' in JSON array at offset {pos}")
+            pos += 1
+            break
+        if ch == ",":
+            if expect_item:
+                raise ValueError(f"Unexpected ',' in JSON array at offset {pos}")
+            expect_item = True
+            pos += 1
+            continue
+        if not expect_item:
+            raise ValueError(f"Expected ',' or ']' in JSON array at offset {pos}")
+
+        want = chunk_size
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Incomplete item: read more (doubling, so huge items stay linear)
+                if not fill(want):
+                    raise
+                want *= 2
+                continue
+            if end == len(buf) and fill(want):
+                # A bare number may continue in the next chunk: decode again
+                continue
+            break
+        pos = end
+        expect_item = False
+        count += 1
+        yield item
+        # Release the consumed part of the buffer
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+    skip_ws()
+    if pos < len(buf):
+        raise ValueError(f"Extra data after JSON array at offset {pos}")
+
+
+def load_json_array(fp: BinaryIO, chunk_size: int = 1 << 16) -> Tuple[List[Any], str]:
+    """Parse a whole top-level JSON array incrementally; returns (items, sha256 hexdigest)"""
+    hasher = hashlib.sha256()
+    items = list(iter_json_array(fp, chunk_size, hasher))
+    # Hash any trailing bytes the parser did not need to read
+    for rest in iter(lambda: fp.read(chunk_size), b""):
+        hasher.update(rest)
+    return items, hasher.hexdigest()
@@ -0,0 +1,109 @@
+"""
+Memory accounting across sessions (Streamlit adapter over core.memory).
+
+Shared objects (catalog snapshot, moves documents and their search indexes, boss
+catalog) are accounted once as globals; each session is charged only for what it
+alone holds.
+"""
+import hmac
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from config import ADMIN_TOKEN, MEMORY_LOG_INTERVAL, MEMORY_TRACEMALLOC
+from core.memory import MemoryLogger, deep_sizeof, format_bytes, rss_bytes, start_tracing, state_sizes
+from data_loader import get_catalog_store, load_boss_catalog
+from session_manager import get_blob_store
+
+
+# Listing other sessions goes through Streamlit's private Runtime._session_mgr, which
+# is only trusted on the release requirements.txt pins
+_SESSION_MGR_VERSION = (1, 51)
+
+
+def admin_authorized(token: Optional[str]) -> bool:
+    """True when ADMIN_TOKEN is set and `token` matches it"""
+    return bool(ADMIN_TOKEN) and hmac.compare_digest((token or "").encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def _active_sessions() -> Optional[list]:
+    """Streamlit's SessionInfos for every connected session, or None when unavailable"""
+    import streamlit
+    from streamlit.runtime import Runtime
+    if tuple(int(p) for p in streamlit.__version__.split(".")[:2]) != _SESSION_MGR_VERSION:
+        return None
+    if not Runtime.exists():
+        return None
+    session_mgr = getattr(Runtime.instance(), "_session_mgr", None)
+    list_active = getattr(session_mgr, "list_active_sessions", None)
+    return list_active() if list_active is not None else None
+
+
+def session_states() -> List[Tuple[str, Dict[str, Any]]]:
+    """(session id, state) of every connected session; only this one outside a server"""
+    try:
+        sessions = _active_sessions()
+    except Exception:
+        sessions = None
+    if sessions is None:
+        # Bare mode, AppTest or an untested Streamlit release
+        return [("this session", st.session_state.to_dict())]
+    return [(info.session.id, info.session.session_state.filtered_state) for info in sessions]
+
+
+def shared_objects(states: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, List[Any]]:
+    """Objects sessions reference but do not own, by category"""
+    snapshot = get_catalog_store().get()
+    documents, indexes = {}, {}
+    for _, state in states:
+        base = state.get("moves_base")
+        if base is not None:
+            documents[id(base)] = base
+        search = state.get("_move_search")
+        if search is not None:
+            indexes[id(search.index)] = search.index
+    return {
+        "catalog": [snapshot] if snapshot is not None else [],
+        "moves documents": list(documents.values()),
+        "move indexes": list(indexes.values()),
+        "boss catalog": [load_boss_catalog()],
+    }
+
+
+def global_sizes(shared: Dict[str, List[Any]]) -> Dict[str, int]:
+    """Bytes held by the process-wide caches"""
+    from streamlit.runtime.caching import cache_data_api
+    seen = set()
+    sizes = {name: sum(deep_sizeof(obj, seen) for obj in objs) for name, objs in shared.items()}
+    sizes["blob store"] = get_blob_store().memory_bytes()
+    # st.cache_data keeps pickled values: their length is their size (sprite caches etc.)
+    sizes["st.cache_data"] = sum(stat.byte_length for stat in cache_data_api.get_data_cache_stats_provider().get_stats())
+    return sizes
+
+
+def session_sizes(states: List[Tuple[str, Dict[str, Any]]],
+                  shared: Dict[str, List[Any]]) -> Dict[str, Dict[str, int]]:
+    """Per session, deep size per state key"""
+    shared_objs = [obj for objs in shared.values() for obj in objs]
+    return {sid: state_sizes(state, shared_objs) for sid, state in states}
+
+
+def memory_report() -> str:
+    """One log line: RSS, global caches and the session total"""
+    states = session_states()
+    shared = shared_objects(states)
+    sessions = session_sizes(states, shared)
+    parts = [f"rss={format_bytes(rss_bytes())}", f"sessions={len(sessions)}",
+             f"session_state={format_bytes(sum(sum(s.values()) for s in sessions.values()))}"]
+    parts += [f"{name.replace(' ', '_')}={format_bytes(size)}" for name, size in global_sizes(shared).items()]
+    return "memory: " + " ".join(parts)
+
+
+@st.cache_resource(show_spinner=False)
+def get_memory_logger():
+    """Starts tracemalloc (if configured) and the periodic memory log line, once per process"""
+    if MEMORY_TRACEMALLOC:
+        start_tracing()
+    if MEMORY_LOG_INTERVAL <= 0:
+        return None
+    return MemoryLogger(memory_report, MEMORY_LOG_INTERVAL).start()
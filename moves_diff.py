@@ -0,0 +1,178 @@
+"""
+Structural diff between a MovesDocument and a session's edits, and the patch file format.
+
+The overlay already holds the net effect of the edit log (values equal to the base are
+dropped), so a diff costs O(edits) and never walks the two documents. PatchIndex applies
+a patch file to a document one Miscrit at a time (see patch_miscrits.py).
+"""
+import json
+from typing import Dict, List, Set, TextIO
+
+from moves_model import EDITABLE_FIELDS, EditOverlay, get_game_icon_name
+
+PATCH_FORMAT = "miscrits-moves-patch"
+PATCH_VERSION = 1
+
+_FIELD_RANK = {field: i for i, field in enumerate(EDITABLE_FIELDS)}
+
+
+def field_changes(overlay: EditOverlay) -> List[Dict]:
+    """Changed ability fields: miscrit_id, ability_id, field, old, new"""
+    changes = []
+    for (mid, aid, field), new in overlay.fields.items():
+        base_ability = overlay.base.ability(mid, aid)
+        changes.append({
+            "miscrit_id": mid,
+            "ability_id": aid,
+            "field": field,
+            "old": base_ability.get(field) if base_ability is not None else None,
+            "new": new,
+        })
+    changes.sort(key=lambda c: (c["miscrit_id"], c["ability_id"], _FIELD_RANK.get(c["field"], 99)))
+    return changes
+
+
+def order_changes(overlay: EditOverlay) -> List[Dict]:
+    """
+    Changed ability_order lists: miscrit_id, old, new and `moved`, the abilities whose
+    position differs as {ability_id, from, to}.
+    """
+    changes = []
+    for mid in sorted(overlay.orders):
+        new = overlay.orders[mid]
+        miscrit = overlay.base.miscrit(mid)
+        old = miscrit.get("ability_order", []) if miscrit is not None else []
+        if new == old:
+            # Reordered and moved back
+            continue
+        old_positions = overlay.base.positions.get(mid, {})
+        moved = [
+            {"ability_id": aid, "from": old_positions.get(aid, -1), "to": idx}
+            for idx, aid in enumerate(new)
+            if old_positions.get(aid, -1) != idx
+        ]
+        changes.append({"miscrit_id": mid, "old": list(old), "new": list(new), "moved": moved})
+    return changes
+
+
+def build_patch(overlay: EditOverlay) -> Dict:
+    """Patch document for the session's edits (see PATCH_FORMAT)"""
+    return {
+        "format": PATCH_FORMAT,
+        "version": PATCH_VERSION,
+        "base_version": overlay.base.version,
+        "changes": field_changes(overlay),
+        "orders": [
+            {"miscrit_id": o["miscrit_id"], "old": o["old"], "new": o["new"]}
+            for o in order_changes(overlay)
+        ],
+    }
+
+
+def dumps_patch(patch: Dict) -> str:
+    return json.dumps(patch, ensure_ascii=False, indent=1)
+
+
+# ------------------------------
+# Applying patches
+# ------------------------------
+def load_patch(fp: TextIO) -> Dict:
+    """Read and validate a patch file. Raises ValueError on anything else."""
+    patch = json.load(fp)
+    if not isinstance(patch, dict) or patch.get("format") != PATCH_FORMAT:
+        raise ValueError(f"Not a {PATCH_FORMAT} file")
+    if patch.get("version") != PATCH_VERSION:
+        raise ValueError(f"Unsupported patch version {patch.get('version')!r}")
+    changes, orders = patch.get("changes", []), patch.get("orders", [])
+    if not isinstance(changes, list) or not isinstance(orders, list):
+        raise ValueError("`changes` and `orders` must be lists")
+    for i, change in enumerate(changes):
+        _require(change, _CHANGE_KEYS, f"changes[{i}]")
+        if change["field"] not in EDITABLE_FIELDS:
+            raise ValueError(f"Field {change['field']!r} is not editable")
+    for i, order in enumerate(orders):
+        _require(order, _ORDER_KEYS, f"orders[{i}]")
+        if not isinstance(order["old"], list) or not isinstance(order["new"], list):
+            raise ValueError(f"orders[{i}]: `old` and `new` must be lists")
+    return patch
+
+
+_CHANGE_KEYS = ("miscrit_id", "ability_id", "field", "old", "new")
+_ORDER_KEYS = ("miscrit_id", "old", "new")
+
+
+def _require(entry, keys, where: str) -> None:
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where}: expected an object")
+    missing = [k for k in keys if k not in entry]
+    if missing:
+        raise ValueError(f"{where}: missing {', '.join(missing)}")
+
+
+class PatchIndex:
+    """
+    A patch grouped by Miscrit id, so a streamed document can be patched one Miscrit at
+    a time. Conflicts (the document no longer matches the patch's `old` values) are
+    collected in `conflicts`; the patch's values still win.
+    """
+
+    def __init__(self, patch: Dict):
+        self.base_version = patch.get("base_version")
+        self.fields: Dict[int, Dict[int, List[Dict]]] = {}
+        self.orders: Dict[int, Dict] = {}
+        for change in patch.get("changes", []):
+            self.fields.setdefault(change["miscrit_id"], {}).setdefault(change["ability_id"], []).append(change)
+        for order in patch.get("orders", []):
+            self.orders[order["miscrit_id"]] = order
+        self.applied: Set[int] = set()
+        self.conflicts: List[str] = []
+        self.icon_changes = 0
+
+    def __len__(self) -> int:
+        return len(set(self.fields) | set(self.orders))
+
+    def missing(self) -> List[int]:
+        """Patched Miscrit ids that never showed up in the document"""
+        return sorted((set(self.fields) | set(self.orders)) - self.applied)
+
+    def apply(self, miscrit: Dict) -> Dict:
+        """Patch one Miscrit dict in place (it must be a private copy) and return it"""
+        if not isinstance(miscrit, dict):
+            # null or other stray elements are copied through untouched
+            return miscrit
+        mid = miscrit.get("id")
+        ability_changes = self.fields.get(mid)
+        order = self.orders.get(mid)
+        if ability_changes is None and order is None:
+            return miscrit
+        self.applied.add(mid)
+
+        if ability_changes:
+            abilities = {a["id"]: a for a in miscrit.get("abilities", [])}
+            for aid, changes in ability_changes.items():
+                ability = abilities.get(aid)
+                if ability is None:
+                    self.conflicts.append(f"Miscrit {mid}: ability {aid} not found")
+                    continue
+                icon = get_game_icon_name(ability)
+                for change in changes:
+                    current = ability.get(change["field"])
+                    if current != change["old"]:
+                        self.conflicts.append(
+                            f"Miscrit {mid}, ability {aid}: {change['field']} is {current!r}, "
+                            f"patch expected {change['old']!r}"
+                        )
+                    ability[change["field"]] = change["new"]
+                if get_game_icon_name(ability) != icon:
+                    self.icon_changes += 1
+
+        if order is not None:
+            current = miscrit.get("ability_order", [])
+            if current != order["old"]:
+                self.conflicts.append(f"Miscrit {mid}: ability_order differs from the patch base")
+            if sorted(current) != sorted(order["new"]):
+                # Never drop or invent abilities: only a permutation of the current order applies
+                self.conflicts.append(f"Miscrit {mid}: patched ability_order is not a permutation, skipped")
+            else:
+                miscrit["ability_order"] = list(order["new"])
+        return miscrit
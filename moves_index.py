@@ -0,0 +1,155 @@
+"""
+Inverted index over the abilities of a MovesDocument ("which Miscrits have this move").
+
+MoveIndex is built once per shared document and maps terms to (miscrit_id, ability_id)
+keys: ability name tokens plus `type:`, `element:` and `icon:` values (the icon from
+get_game_icon_name). MoveSearch layers one session's edits on top of it and is updated
+from the overlay's edit notifications, so queries never rescan the catalog.
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from moves_model import EditOverlay, MovesDocument, get_game_icon_name
+from search_index import tokenize
+
+Key = Tuple[int, int]
+
+# Qualifiers accepted in queries, e.g. `type:buff icon:fire_poison`
+FIELD_PREFIXES = ("type", "element", "icon")
+
+
+def ability_terms(ability: Dict) -> Set[str]:
+    """Index terms of one ability"""
+    terms = set(tokenize(ability.get("name", "")))
+    terms.add(f"type:{str(ability.get('type', 'Attack')).lower()}")
+    terms.add(f"element:{str(ability.get('element', 'Physical')).lower()}")
+    terms.add(f"icon:{get_game_icon_name(ability).lower()}")
+    return terms
+
+
+def parse_query(query: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a query into (field, value) words. Plain words have field None and match
+    name tokens by prefix, or a type/element/icon exactly.
+    """
+    words = []
+    for word in query.lower().split():
+        field, sep, value = word.partition(":")
+        if sep and field in FIELD_PREFIXES:
+            if value:
+                words.append((field, value))
+        else:
+            words.extend((None, token) for token in tokenize(word))
+    return words
+
+
+class MoveIndex:
+    """Term -> ability keys for one MovesDocument. Immutable once built; share it."""
+
+    def __init__(self, doc: MovesDocument):
+        self.doc = doc
+        self.postings: Dict[str, Set[Key]] = {}
+        for key, ability in doc.abilities.items():
+            for term in ability_terms(ability):
+                self.postings.setdefault(term, set()).add(key)
+        # Name tokens only: field terms ("type:buff") are matched exactly, never by prefix
+        self.name_terms: List[str] = sorted(t for t in self.postings if ":" not in t)
+
+    def prefix_terms(self, prefix: str) -> Iterable[str]:
+        """Name terms starting with `prefix`"""
+        i = bisect_left(self.name_terms, prefix)
+        while i < len(self.name_terms) and self.name_terms[i].startswith(prefix):
+            yield self.name_terms[i]
+            i += 1
+
+
+class MoveSearch:
+    """
+    One session's view of a MoveIndex: abilities edited in the overlay are indexed
+    separately (from their edited values) and hidden from the base postings.
+    """
+
+    def __init__(self, index: MoveIndex, overlay: EditOverlay):
+        self.index = index
+        self.overlay = overlay
+        # Keys edited since the last query; filled by the overlay
+        self._dirty = overlay.watch()
+        self._dirty.update((mid, aid) for mid, aid, _ in overlay.fields)
+        self._terms: Dict[Key, Set[str]] = {}
+        self._postings: Dict[str, Set[Key]] = {}
+        self._lock = threading.Lock()
+
+    def _sync(self) -> None:
+        """Re-index the abilities edited since the last query"""
+        doc = self.index.doc
+        while self._dirty:
+            key = self._dirty.pop()
+            for term in self._terms.pop(key, ()):
+                keys = self._postings[term]
+                keys.discard(key)
+                if not keys:
+                    del self._postings[term]
+            base_ability = doc.ability(*key)
+            if base_ability is None:
+                continue
+            resolved = self.overlay.resolve_ability(key[0], base_ability)
+            if resolved is base_ability:
+                continue
+            terms = ability_terms(resolved)
+            self._terms[key] = terms
+            for term in terms:
+                self._postings.setdefault(term, set()).add(key)
+
+    def _word_terms(self, field: Optional[str], value: str) -> Set[str]:
+        if field is not None:
+            return {f"{field}:{value}"}
+        terms = set(self.index.prefix_terms(value))
+        terms.update(t for t in self._postings if ":" not in t and t.startswith(value))
+        # A plain word also matches a type/element/icon, but only as the whole value
+        terms.update(f"{f}:{value}" for f in FIELD_PREFIXES)
+        return terms
+
+    def _keys(self, terms: Set[str]) -> Set[Key]:
+        edited = self._terms
+        keys: Set[Key] = set()
+        for term in terms:
+            base = self.index.postings.get(term)
+            if base:
+                keys.update(k for k in base if k not in edited)
+            keys.update(self._postings.get(term, ()))
+        return keys
+
+    def search(self, query: str) -> List[Key]:
+        """Keys of abilities matching every query word, ordered by (miscrit id, ability id)"""
+        words = parse_query(query)
+        if not words:
+            return []
+        with self._lock:
+            self._sync()
+            result: Optional[Set[Key]] = None
+            for field, value in words:
+                keys = self._keys(self._word_terms(field, value))
+                result = keys if result is None else result & keys
+                if not result:
+                    return []
+        return sorted(result)
+
+    def rows(self, keys: Iterable[Key]) -> List[Dict]:
+        """Display rows (as edited) for search results"""
+        doc = self.index.doc
+        rows = []
+        for mid, aid in keys:
+            miscrit = doc.miscrit(mid)
+            ability = self.overlay.resolve_ability(mid, doc.ability(mid, aid))
+            names = miscrit.get("names") or [miscrit.get("name", "Unknown")]
+            rows.append({
+                "miscrit_id": mid,
+                "ability_id": aid,
+                "miscrit": names[0],
+                "name": ability.get("name", ""),
+                "type": ability.get("type"),
+                "element": ability.get("element"),
+                "icon": get_game_icon_name(ability),
+            })
+        return rows
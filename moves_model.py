@@ -0,0 +1,615 @@
+"""
+Moves Editor data model (no Streamlit dependency).
+
+A MovesDocument is one immutable miscrits.json shared by every session editing that
+version. Each session only keeps an EditOverlay: the fields and ability orders it
+changed. Reads resolve through the overlay, so per-session memory is proportional to
+the number of edits rather than to the size of the catalog.
+"""
+import csv
+import gzip
+import io
+import json
+import re
+import time
+from collections import Counter, deque
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Base URL for icons
+TYPE_ICON_BASE = "https://worldofmiscrits.com"
+
+# Standard Elements (Imply type="Attack")
+STANDARD_ELEMENTS = [
+    "Physical", "Fire", "Water", "Nature", "Wind", "Earth",
+    "Lightning", "Misc", "FireWind", "FireEarth", "FireLightning",
+    "WaterWind", "WaterEarth", "WaterLightning", "NatureWind",
+    "NatureEarth", "NatureLightning"
+]
+
+# Ability fields the editor can change
+EDITABLE_FIELDS = ("name", "type", "element")
+
+
+def ui_type_to_fields(ui_type: str) -> Tuple[str, str]:
+    """Map the editor's single Type dropdown value to (type, element)"""
+    if ui_type in STANDARD_ELEMENTS:
+        return "Attack", ui_type
+    return ui_type, "Misc"
+
+
+def get_game_icon_name(ability: Dict) -> str:
+    """
+    Replicates the logic from models/Ability.gd get_icon() exactly.
+    """
+    t = ability.get("type", "Attack")
+    e = ability.get("element", "Physical")
+    ap = ability.get("ap", 0)
+    keys = ability.get("keys", [])
+    true_dmg = ability.get("true_dmg", False)
+
+    # 1. Status / Special Logic
+    if t == "Dot" and e != "Misc":
+        return f"{e}_poison"
+    if t == "Hot":
+        return "heal"
+    if t == "ForceSwitch":
+        return "confuse"
+    if true_dmg:
+        return "truedamage"
+
+    # 2. Misc Logic (Buffs/Debuffs)
+    if e == "Misc":
+        if t == "Buff":
+            if ap > 0 and "acc" in keys:
+                return "accuracy_buff"
+            elif ap < 0 and "acc" in keys:
+                return "accuracy_debuff"
+            elif ap > 0:
+                return "buff"
+            elif ap < 0:
+                return "debuff"
+        elif t == "Bot":
+            if ap > 0:
+                return "bot_buff"
+            else:
+                return "bot_debuff"
+        elif t == "Heal":
+            return "heal"
+
+    # 3. Attack Logic
+    if t == "Attack":
+        return e
+
+    # 4. Fallback
+    return t
+
+
+def selector_label(miscrit: Dict) -> str:
+    """`id. First / Final` label used by the Miscrit selector"""
+    m_id = miscrit.get("id", 0)
+    name_list = miscrit.get("names", [])
+    first_name = name_list[0] if name_list else miscrit.get("name", "Unknown")
+    final_name = name_list[-1] if len(name_list) > 1 else ""
+    if final_name:
+        return f"{m_id}. {first_name} / {final_name}"
+    return f"{m_id}. {first_name}"
+
+
+def _positions(order: List[int]) -> Dict[int, int]:
+    return {ability_id: idx for idx, ability_id in enumerate(order)}
+
+
+class MovesDocument:
+    """
+    A parsed miscrits.json shared between sessions. Never mutate `data`:
+    edits belong in an EditOverlay.
+    Indexes are built once here so edit and reorder lookups don't scan the catalog.
+    """
+
+    def __init__(self, data: List[Dict], version: str):
+        self.data = data
+        self.version = version
+        self.by_id: Dict[int, Dict] = {}
+        self.abilities: Dict[Tuple[int, int], Dict] = {}
+        self.positions: Dict[int, Dict[int, int]] = {}
+        for m in data:
+            mid = m.get("id")
+            self.by_id[mid] = m
+            for a in m.get("abilities", []):
+                self.abilities[(mid, a["id"])] = a
+            self.positions[mid] = _positions(m.get("ability_order", []))
+        # Selector order; sorted once per document instead of on every rerun
+        self.sorted_miscrits: List[Dict] = sorted(data, key=lambda x: x.get("id", 0))
+
+        # Derived aggregates of the base, computed once and shared by every session
+        self.total_moves = sum(len(m.get("abilities", [])) for m in data)
+        self.type_counts: Counter = Counter(
+            a.get("type") for m in data for a in m.get("abilities", [])
+            if a.get("type") not in (None, "Attack")
+        )
+        self.selector_options: List[str] = []
+        self.selector_map: Dict[str, Dict] = {}
+        for m in self.sorted_miscrits:
+            label = selector_label(m)
+            self.selector_options.append(label)
+            self.selector_map[label] = m
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def miscrit(self, miscrit_id: int) -> Optional[Dict]:
+        return self.by_id.get(miscrit_id)
+
+    def ability(self, miscrit_id: int, ability_id: int) -> Optional[Dict]:
+        return self.abilities.get((miscrit_id, ability_id))
+
+
+class EditOverlay:
+    """
+    Sparse per-session edits on top of a MovesDocument.
+    fields: (miscrit_id, ability_id, field) -> value
+    orders: miscrit_id -> replacement ability_order (with a matching position map)
+    Field values equal to the base are dropped, so `fields` is always the minimal diff.
+    """
+
+    def __init__(self, base: MovesDocument):
+        self.base = base
+        self.fields: Dict[Tuple[int, int, str], Any] = {}
+        self.orders: Dict[int, List[int]] = {}
+        self._positions: Dict[int, Dict[int, int]] = {}
+        self.revision = 0
+        # Incremental aggregates: non-Attack type counts relative to the base
+        self._type_delta: Counter = Counter()
+        self._ui_types: Optional[List[str]] = None
+        # Sets collecting (miscrit_id, ability_id) of field edits (see watch())
+        self._watchers: List[set] = []
+
+    def __len__(self) -> int:
+        return len(self.fields) + len(self.orders)
+
+    def watch(self) -> set:
+        """A set that every later field edit adds its (miscrit_id, ability_id) to"""
+        dirty: set = set()
+        self._watchers.append(dirty)
+        return dirty
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+    def get_field(self, miscrit_id: int, ability: Dict, field: str, default=None):
+        key = (miscrit_id, ability["id"], field)
+        if key in self.fields:
+            return self.fields[key]
+        return ability.get(field, default)
+
+    def resolve_ability(self, miscrit_id: int, ability: Dict) -> Dict:
+        """The ability as edited (the base dict itself when untouched)"""
+        changes = {
+            field: self.fields[(miscrit_id, ability["id"], field)]
+            for field in EDITABLE_FIELDS
+            if (miscrit_id, ability["id"], field) in self.fields
+        }
+        if not changes:
+            return ability
+        merged = dict(ability)
+        merged.update(changes)
+        return merged
+
+    def ability_order(self, miscrit: Dict) -> List[int]:
+        """Current ability_order of a Miscrit (do not mutate the returned list)"""
+        order = self.orders.get(miscrit.get("id"))
+        return order if order is not None else miscrit.get("ability_order", [])
+
+    def position(self, miscrit_id: int, ability_id: int) -> int:
+        """Index of an ability in the current ability_order, or -1"""
+        positions = self._positions.get(miscrit_id)
+        if positions is None:
+            positions = self.base.positions.get(miscrit_id, {})
+        return positions.get(ability_id, -1)
+
+    def ui_types(self) -> List[str]:
+        """
+        Options of the Type dropdown: standard elements, then every non-Attack type in
+        use. Cached until a type edit changes which types are in use.
+        """
+        if self._ui_types is None:
+            in_use = self.base.type_counts + self._type_delta
+            self._ui_types = sorted(set(STANDARD_ELEMENTS)) + sorted(in_use)
+        return self._ui_types
+
+    def resolve_miscrit(self, miscrit: Dict) -> Dict:
+        """The Miscrit as edited (the base dict itself when untouched)"""
+        mid = miscrit.get("id")
+        abilities = miscrit.get("abilities", [])
+        resolved = [self.resolve_ability(mid, a) for a in abilities]
+        changed = any(r is not a for r, a in zip(resolved, abilities))
+        if not changed and mid not in self.orders:
+            return miscrit
+        merged = dict(miscrit)
+        merged["abilities"] = resolved
+        if mid in self.orders:
+            merged["ability_order"] = list(self.orders[mid])
+        return merged
+
+    def iter_resolved(self) -> Iterator[Dict]:
+        for miscrit in self.base.data:
+            yield self.resolve_miscrit(miscrit)
+
+    # ------------------------------
+    # Writes
+    # ------------------------------
+    def set_field(self, miscrit_id: int, ability_id: int, field: str, value) -> bool:
+        """Record an edit; returns True when the effective value changed"""
+        key = (miscrit_id, ability_id, field)
+        base_ability = self.base.ability(miscrit_id, ability_id)
+        base_value = base_ability.get(field) if base_ability is not None else None
+        current = self.fields.get(key, base_value)
+        if current == value:
+            return False
+        if value == base_value:
+            self.fields.pop(key, None)
+        else:
+            self.fields[key] = value
+        if field == "type":
+            self._count_type(current, -1)
+            self._count_type(value, +1)
+        for dirty in self._watchers:
+            dirty.add((miscrit_id, ability_id))
+        self.revision += 1
+        return True
+
+    def _count_type(self, ability_type, step: int) -> None:
+        if ability_type in (None, "Attack"):
+            return
+        before = self.base.type_counts[ability_type] + self._type_delta[ability_type]
+        self._type_delta[ability_type] += step
+        if (before > 0) != (before + step > 0):
+            self._ui_types = None
+
+    def set_order(self, miscrit_id: int, order: List[int]) -> None:
+        """Replace a whole ability_order (O(len(order)))"""
+        miscrit = self.base.miscrit(miscrit_id)
+        if miscrit is not None and list(order) == miscrit.get("ability_order", []):
+            self.orders.pop(miscrit_id, None)
+            self._positions.pop(miscrit_id, None)
+        else:
+            self.orders[miscrit_id] = list(order)
+            self._positions[miscrit_id] = _positions(order)
+        self.revision += 1
+
+    def move(self, miscrit_id: int, ability_id: int, delta: int) -> bool:
+        """
+        Swap an ability with its neighbour `delta` (+1/-1) places away in ability_order.
+        The copied order is dropped again once it matches the base (as in set_order).
+        Returns False when the ability is missing or already at that end.
+        """
+        idx = self.position(miscrit_id, ability_id)
+        if idx < 0:
+            return False
+        other = idx + delta
+        order = self.orders.get(miscrit_id)
+        if order is None:
+            base_order = self.base.miscrit(miscrit_id).get("ability_order", [])
+            # Bounds first: a refused move must not leave a copied, unchanged order behind
+            if not 0 <= other < len(base_order):
+                return False
+            order = self.orders[miscrit_id] = list(base_order)
+            self._positions[miscrit_id] = dict(self.base.positions[miscrit_id])
+        elif not 0 <= other < len(order):
+            return False
+        positions = self._positions[miscrit_id]
+        order[idx], order[other] = order[other], order[idx]
+        positions[order[idx]] = idx
+        positions[order[other]] = other
+        if order == self.base.miscrit(miscrit_id).get("ability_order", []):
+            # Moved back: no longer an edit
+            del self.orders[miscrit_id]
+            del self._positions[miscrit_id]
+        self.revision += 1
+        return True
+
+
+# ------------------------------
+# Undo / redo
+# ------------------------------
+class Patch:
+    """
+    One undoable step: field changes (miscrit_id, ability_id, field, old, new) and
+    ability moves (miscrit_id, ability_id, delta). The inverse is derived, not stored.
+    """
+    __slots__ = ("fields", "moves", "key", "stamp")
+
+    def __init__(self, fields=(), moves=(), key=None, stamp: float = 0.0):
+        self.fields: List[Tuple[int, int, str, Any, Any]] = list(fields)
+        self.moves: List[Tuple[int, int, int]] = list(moves)
+        self.key = key
+        self.stamp = stamp
+
+    def __len__(self) -> int:
+        return len(self.fields) + len(self.moves)
+
+    def touched(self) -> Iterator[Tuple[int, int]]:
+        """(miscrit_id, ability_id) pairs affected by this step"""
+        for mid, aid, *_ in self.fields:
+            yield mid, aid
+        for mid, aid, _ in self.moves:
+            yield mid, aid
+
+
+class EditHistory:
+    """
+    Bounded undo/redo over an EditOverlay.
+    Keeps at most max_steps steps and max_items individual changes across both stacks;
+    the oldest steps are dropped first. Consecutive edits of the same field within
+    coalesce_window seconds merge into one step.
+    """
+
+    def __init__(self, overlay: EditOverlay, max_steps: int = 100,
+                 max_items: int = 20000, coalesce_window: float = 2.0):
+        self.overlay = overlay
+        self.max_steps = max_steps
+        self.max_items = max_items
+        self.coalesce_window = coalesce_window
+        self._undo: "deque[Patch]" = deque()
+        self._redo: "deque[Patch]" = deque()
+        self._items = 0
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    # ------------------------------
+    # Recording (the overlay change is applied here)
+    # ------------------------------
+    def set_fields(self, miscrit_id: int, ability_id: int, values: Dict[str, Any],
+                   key=None, stamp: Optional[float] = None) -> bool:
+        """Apply field edits to one ability as a single undoable step"""
+        stamp = time.monotonic() if stamp is None else stamp
+        base_ability = self.overlay.base.ability(miscrit_id, ability_id) or {}
+        changes = []
+        for field, value in values.items():
+            old = self.overlay.fields.get((miscrit_id, ability_id, field), base_ability.get(field))
+            if self.overlay.set_field(miscrit_id, ability_id, field, value):
+                changes.append((miscrit_id, ability_id, field, old, value))
+        if not changes:
+            return False
+
+        key = key or (miscrit_id, ability_id, tuple(values))
+        top = self._undo[-1] if self._undo else None
+        if (top is not None and not self._redo and top.key == key
+                and stamp - top.stamp <= self.coalesce_window):
+            # Coalesce: keep the oldest "old", take the newest "new"
+            merged = {c[2]: c for c in top.fields}
+            for mid, aid, field, old, new in changes:
+                first_old = merged[field][3] if field in merged else old
+                merged[field] = (mid, aid, field, first_old, new)
+            self._items -= len(top)
+            top.fields = [c for c in merged.values() if c[3] != c[4]]
+            top.stamp = stamp
+            if not top.fields:
+                self._undo.pop()
+            else:
+                self._items += len(top)
+            return True
+
+        self._push(Patch(changes, key=key, stamp=stamp))
+        return True
+
+    def move(self, miscrit_id: int, ability_id: int, delta: int) -> bool:
+        """Reorder through the overlay as an undoable step"""
+        if not self.overlay.move(miscrit_id, ability_id, delta):
+            return False
+        self._push(Patch(moves=[(miscrit_id, ability_id, delta)], stamp=time.monotonic()))
+        return True
+
+    def record(self, patch: Patch) -> None:
+        """Push a step whose changes were already applied to the overlay (batch edits)"""
+        if len(patch):
+            self._push(patch)
+
+    def _push(self, patch: Patch) -> None:
+        self._items -= sum(len(p) for p in self._redo)
+        self._redo.clear()
+        self._undo.append(patch)
+        self._items += len(patch)
+        # The newest step always stays undoable, even a batch larger than max_items
+        while len(self._undo) > 1 and (len(self._undo) > self.max_steps or self._items > self.max_items):
+            self._items -= len(self._undo.popleft())
+
+    # ------------------------------
+    # Undo / redo
+    # ------------------------------
+    def undo(self) -> Optional[Patch]:
+        if not self._undo:
+            return None
+        patch = self._undo.pop()
+        for mid, aid, delta in reversed(patch.moves):
+            self.overlay.move(mid, aid, -delta)
+        for mid, aid, field, old, _ in reversed(patch.fields):
+            self.overlay.set_field(mid, aid, field, old)
+        self._redo.append(patch)
+        return patch
+
+    def redo(self) -> Optional[Patch]:
+        if not self._redo:
+            return None
+        patch = self._redo.pop()
+        for mid, aid, field, _, new in patch.fields:
+            self.overlay.set_field(mid, aid, field, new)
+        for mid, aid, delta in patch.moves:
+            self.overlay.move(mid, aid, delta)
+        self._undo.append(patch)
+        return patch
+
+
+# ------------------------------
+# Bulk edits
+# ------------------------------
+BULK_COLUMNS = ("miscrit_id", "ability_id", "miscrit", "name", "type", "element")
+
+
+def ui_type_of(ability: Dict) -> str:
+    """Inverse of ui_type_to_fields: the Type dropdown value of an ability"""
+    if ability.get("type", "Attack") == "Attack":
+        return ability.get("element", "Physical")
+    return ability.get("type")
+
+
+def select_abilities(overlay: EditOverlay, pattern: str = "", regex: bool = False,
+                     ui_types: Iterable[str] = (), elements: Iterable[str] = ()) -> List[Dict]:
+    """
+    Abilities (as edited) matching a name pattern, Type dropdown values and Miscrit
+    elements. Each row carries miscrit_id/ability_id plus the BULK_COLUMNS fields.
+    """
+    ui_types, elements = set(ui_types or ()), set(elements or ())
+    if regex and pattern:
+        matcher = re.compile(pattern, re.IGNORECASE).search
+    else:
+        needle = pattern.lower()
+        matcher = lambda name: needle in name.lower()
+
+    rows = []
+    for miscrit in overlay.base.sorted_miscrits:
+        if elements and miscrit.get("element") not in elements:
+            continue
+        mid = miscrit.get("id")
+        names = miscrit.get("names") or [miscrit.get("name", "Unknown")]
+        for base_ability in miscrit.get("abilities", []):
+            ability = overlay.resolve_ability(mid, base_ability)
+            if ui_types and ui_type_of(ability) not in ui_types:
+                continue
+            if pattern and not matcher(ability.get("name", "")):
+                continue
+            rows.append({
+                "miscrit_id": mid,
+                "ability_id": ability["id"],
+                "miscrit": names[0],
+                "name": ability.get("name", ""),
+                "type": ability.get("type"),
+                "element": ability.get("element"),
+            })
+    return rows
+
+
+def apply_batch(history: EditHistory, changes: Iterable[Tuple[int, int, Dict[str, Any]]]) -> Patch:
+    """
+    Apply many ability edits in one pass and record them as a single undo step.
+    Unknown ids and no-op values are skipped; returns the recorded Patch.
+    """
+    overlay = history.overlay
+    patch = Patch(stamp=time.monotonic())
+    for mid, aid, values in changes:
+        base_ability = overlay.base.ability(mid, aid)
+        if base_ability is None:
+            continue
+        for field, value in values.items():
+            if field not in EDITABLE_FIELDS:
+                continue
+            old = overlay.fields.get((mid, aid, field), base_ability.get(field))
+            if overlay.set_field(mid, aid, field, value):
+                patch.fields.append((mid, aid, field, old, value))
+    history.record(patch)
+    return patch
+
+
+def replace_changes(rows: List[Dict], find: str, replace: str, regex: bool = False,
+                    ui_type: Optional[str] = None) -> List[Tuple[int, int, Dict[str, Any]]]:
+    """Changes for apply_batch: find/replace in names and/or set one Type for every row"""
+    sub = re.compile(find, re.IGNORECASE).sub if regex and find else None
+    changes = []
+    for row in rows:
+        values: Dict[str, Any] = {}
+        if find:
+            if sub is not None:
+                new_name = sub(replace, row["name"])
+            else:
+                new_name = re.sub(re.escape(find), lambda _: replace, row["name"], flags=re.IGNORECASE)
+            if new_name != row["name"]:
+                values["name"] = new_name
+        if ui_type:
+            values["type"], values["element"] = ui_type_to_fields(ui_type)
+        if values:
+            changes.append((row["miscrit_id"], row["ability_id"], values))
+    return changes
+
+
+def rows_to_csv(rows: List[Dict]) -> str:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=BULK_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def rows_to_json(rows: List[Dict]) -> str:
+    return json.dumps([{k: r.get(k) for k in BULK_COLUMNS} for r in rows], ensure_ascii=False, indent=1)
+
+
+def parse_rows(data: bytes, filename: str) -> List[Dict]:
+    """
+    Read rows back from a CSV or JSON file produced by rows_to_csv/rows_to_json
+    (or edited in a spreadsheet). Raises ValueError on malformed input.
+    """
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith(".json"):
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON list of rows")
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict) or "miscrit_id" not in row or "ability_id" not in row:
+            raise ValueError(f"Row {number}: every row needs miscrit_id and ability_id")
+        try:
+            row["miscrit_id"] = int(row["miscrit_id"])
+            row["ability_id"] = int(row["ability_id"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Row {number}: miscrit_id and ability_id must be integers") from None
+        for field in EDITABLE_FIELDS:
+            if row.get(field) is not None and not isinstance(row[field], str):
+                raise ValueError(f"Row {number}: {field} must be text")
+    return rows
+
+
+def row_changes(rows: List[Dict]) -> List[Tuple[int, int, Dict[str, Any]]]:
+    """Changes for apply_batch from imported rows (empty cells are left alone)"""
+    changes = []
+    for row in rows:
+        values = {f: row[f] for f in EDITABLE_FIELDS if row.get(f) not in (None, "")}
+        if values:
+            changes.append((row["miscrit_id"], row["ability_id"], values))
+    return changes
+
+
+# ------------------------------
+# Export
+# ------------------------------
+def iter_export_chunks(overlay: EditOverlay) -> Iterator[bytes]:
+    """
+    The edited document as compact JSON, one Miscrit per chunk.
+    Byte-identical to json.dumps(list, separators=(",", ":"), ensure_ascii=False).
+    """
+    yield b"["
+    for i, miscrit in enumerate(overlay.iter_resolved()):
+        if i:
+            yield b","
+        yield json.dumps(miscrit, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    yield b"]"
+
+
+def write_export(overlay: EditOverlay, fp: BinaryIO, compress: bool = False) -> None:
+    """Stream the edited document into a binary file object, optionally gzipped"""
+    if compress:
+        # mtime=0 keeps the output reproducible for identical edits
+        with gzip.GzipFile(fileobj=fp, mode="wb", mtime=0) as gz:
+            for chunk in iter_export_chunks(overlay):
+                gz.write(chunk)
+    else:
+        for chunk in iter_export_chunks(overlay):
+            fp.write(chunk)
+
@@ -0,0 +1,125 @@
+"""
+Apply a Moves Editor patch file to a miscrits.json without Streamlit.
+
+    python patch_miscrits.py miscrits.json patch.json -o miscrits.patched.json [--strict]
+
+The input is stream-parsed one Miscrit at a time, patched through a PatchIndex and
+streamed to a temporary file next to the output, which then replaces the output
+atomically. Memory stays at one Miscrit plus the patch. Paths ending in .gz are read /
+written gzipped. Per-phase timings are reported on stderr.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Tuple
+
+from json_stream import iter_json_array
+from moves_diff import PatchIndex, load_patch
+from timing import PhaseTimer
+
+# next() default: a JSON null element is a value, not the end of the array
+_END = object()
+
+
+def _open_input(path: Path) -> BinaryIO:
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _output_mode(dst: Path) -> int:
+    """Mode for the new output: keep dst's, else what open() would give under the umask"""
+    try:
+        return dst.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def apply_patch_file(src: Path, dst: Path, index: PatchIndex, timer: PhaseTimer) -> Tuple[int, str]:
+    """
+    Stream src through the patch into a temporary file next to dst.
+    Returns (Miscrit count, temp path); the caller os.replace()s it onto dst.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=dst.name, suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as raw, _open_input(src) as fin:
+            # mkstemp creates the file 0600; the replaced output must not lose its permissions
+            os.fchmod(raw.fileno(), _output_mode(dst))
+            out = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) if dst.suffix == ".gz" else raw
+            items = iter_json_array(fin)
+            out.write(b"[")
+            while True:
+                with timer.phase("parse"):
+                    miscrit = next(items, _END)
+                if miscrit is _END:
+                    break
+                with timer.phase("apply"):
+                    miscrit = index.apply(miscrit)
+                with timer.phase("write"):
+                    if count:
+                        out.write(b",")
+                    # Same serialization as the editor's export
+                    out.write(json.dumps(miscrit, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+                count += 1
+            with timer.phase("write"):
+                out.write(b"]")
+                if out is not raw:
+                    out.close()
+                raw.flush()
+                os.fsync(raw.fileno())
+        return count, tmp
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply a Moves Editor patch to miscrits.json")
+    parser.add_argument("input", type=Path, help="miscrits.json (or .json.gz)")
+    parser.add_argument("patch", type=Path, help="patch file downloaded from the Moves Editor")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output path (.gz to compress)")
+    parser.add_argument("--strict", action="store_true", help="do not write the output if anything conflicts")
+    args = parser.parse_args(argv)
+
+    timer = PhaseTimer()
+    try:
+        with timer.phase("patch"):
+            with open(args.patch, "r", encoding="utf-8") as f:
+                index = PatchIndex(load_patch(f))
+        count, tmp = apply_patch_file(args.input, args.output, index, timer)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    for miscrit_id in index.missing():
+        index.conflicts.append(f"Miscrit {miscrit_id}: not in {args.input.name}")
+    for conflict in index.conflicts:
+        print(f"conflict: {conflict}", file=sys.stderr)
+
+    if args.strict and index.conflicts:
+        os.unlink(tmp)
+        print(f"{len(index.conflicts)} conflicts, {args.output} left untouched", file=sys.stderr)
+        return 1
+
+    with timer.phase("commit"):
+        os.replace(tmp, args.output)
+
+    print(
+        f"Patched {len(index.applied)}/{count} Miscrits ({index.icon_changes} icon changes) -> {args.output}",
+        file=sys.stderr,
+    )
+    print(timer.report(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Prebuilt search index for the selection grid.
+
+Built once per catalog; answers queries with exact, prefix, substring (trigram) and
+typo-tolerant matching, and caches result sets per (query, filters) so reruns and
+pagination don't re-filter the catalog.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+_SPLIT_RE = re.compile(r"[^0-9a-z]+")
+
+# Match quality per query word
+_EXACT, _PREFIX, _INFIX, _FUZZY = 4.0, 3.0, 2.0, 1.0
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse separators (spaces, underscores, punctuation)"""
+    return " ".join(_SPLIT_RE.split(str(text).lower())).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _SPLIT_RE.split(str(text).lower()) if t]
+
+
+def trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (adjacent transpositions) distance, capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _typo_limit(token: str) -> int:
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+class SearchIndex:
+    """
+    Token index over a catalog (Miscrits or bosses).
+    Entries only need dict-style `.get()`; searchable fields are the names and rarity.
+    """
+
+    NAME_FIELDS = ("base_name", "first_name", "evo_name", "final_name", "all_names", "rarity")
+
+    def __init__(
+        self,
+        entries: Sequence,
+        synonyms: Optional[Mapping[str, str]] = None,
+        cache_size: int = 128,
+        source=None,
+    ):
+        self.entries: Tuple = tuple(entries)
+        # Keep the catalog the index was built from alive (it may key the index cache)
+        self.source = source
+        self.synonyms: Dict[str, str] = {normalize(k): normalize(v) for k, v in (synonyms or {}).items()}
+        self.rarities: List[str] = sorted({m.get("rarity", "Common") for m in self.entries})
+        self.elements: List[str] = sorted({m.get("element", "None") for m in self.entries})
+
+        self._postings: Dict[str, Set[int]] = {}
+        for pos, m in enumerate(self.entries):
+            for token in self._entry_tokens(m):
+                self._postings.setdefault(token, set()).add(pos)
+
+        self._tokens: List[str] = sorted(self._postings)
+        self._trigrams: Dict[str, Set[str]] = {}
+        for token in self._tokens:
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(token)
+
+        self._cache: "OrderedDict[tuple, Tuple]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _entry_tokens(self, m) -> Set[str]:
+        tokens: Set[str] = set()
+        for field in self.NAME_FIELDS:
+            value = m.get(field)
+            if not value:
+                continue
+            values = value if isinstance(value, (list, tuple)) else (value,)
+            for v in values:
+                tokens.update(tokenize(v))
+        return tokens
+
+    # ------------------------------
+    # Query side
+    # ------------------------------
+    def _expand(self, query: str) -> List[str]:
+        """Apply synonyms to the whole query, then to each word"""
+        q = normalize(query)
+        q = self.synonyms.get(q, q)
+        words: List[str] = []
+        for word in q.split():
+            words.extend(self.synonyms.get(word, word).split())
+        return words
+
+    def _prefix_tokens(self, word: str) -> Iterable[str]:
+        i = bisect_left(self._tokens, word)
+        while i < len(self._tokens) and self._tokens[i].startswith(word):
+            yield self._tokens[i]
+            i += 1
+
+    def _infix_tokens(self, word: str) -> Iterable[str]:
+        if len(word) < 3:
+            return (t for t in self._tokens if word in t)
+        grams = trigrams(word)
+        candidates = set.intersection(*(self._trigrams.get(g, set()) for g in grams))
+        return (t for t in candidates if word in t)
+
+    def _fuzzy_tokens(self, word: str) -> Iterable[Tuple[str, int]]:
+        limit = _typo_limit(word)
+        if not limit:
+            return
+        candidates: Set[str] = set()
+        for gram in trigrams(word):
+            candidates.update(self._trigrams.get(gram, ()))
+        for token in candidates:
+            # Compare against the whole token and against its prefix (partially typed names)
+            dist = min(
+                edit_distance(word, token, limit),
+                edit_distance(word, token[:len(word)], limit),
+            )
+            if dist <= limit:
+                yield token, dist
+
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        """Best match quality of one query word for every entry it matches"""
+        scores: Dict[int, float] = {}
+
+        def credit(tokens: Iterable[str], score: float):
+            for token in tokens:
+                for pos in self._postings[token]:
+                    if scores.get(pos, 0.0) < score:
+                        scores[pos] = score
+
+        if word in self._postings:
+            credit((word,), _EXACT)
+        credit(self._prefix_tokens(word), _PREFIX)
+        credit(self._infix_tokens(word), _INFIX)
+        if not scores:
+            for token, dist in self._fuzzy_tokens(word):
+                credit((token,), _FUZZY - 0.25 * dist)
+        return scores
+
+    def _search(self, words: List[str], rarities: frozenset, elements: frozenset) -> Tuple:
+        if words:
+            total: Optional[Dict[int, float]] = None
+            for word in words:
+                scores = self._word_scores(word)
+                if total is None:
+                    total = scores
+                else:
+                    total = {pos: total[pos] + s for pos, s in scores.items() if pos in total}
+                if not total:
+                    return ()
+            ranked = sorted(total, key=lambda pos: (-total[pos], pos))
+        else:
+            ranked = range(len(self.entries))
+
+        results = []
+        for pos in ranked:
+            m = self.entries[pos]
+            if rarities and m.get("rarity") not in rarities:
+                continue
+            if elements and m.get("element") not in elements:
+                continue
+            results.append(m)
+        return tuple(results)
+
+    def search(self, query: str = "", rarities: Iterable[str] = (), elements: Iterable[str] = ()) -> Tuple:
+        """Entries matching every query word and the filters, best matches first"""
+        words = self._expand(query or "")
+        key = (tuple(words), frozenset(rarities or ()), frozenset(elements or ()))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        results = self._search(words, key[1], key[2])
+
+        with self._lock:
+            self._cache[key] = results
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return results
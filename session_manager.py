@@ -1,11 +1,47 @@
 """
 Session state management utilities
-(added temp_miscrits and relevant keys for Move Editor)
+(added Moves Editor keys: shared base document + per-session edit overlay)
 """
-import tempfile
-import shutil
+import uuid
 from pathlib import Path
 import streamlit as st
+from typing import Optional
+from config import (
+    BLOB_MEMORY_BUDGET, SCRATCH_DIR, SCRATCH_REAP_INTERVAL, SCRATCH_SESSION_QUOTA, SCRATCH_SESSION_TTL, SCRATCH_TOTAL_QUOTA,
+)
+from core.blobs import BlobStore, Buffer
+from core.scratch import QuotaExceeded, ScratchManager
+
+
+@st.cache_resource(show_spinner=False)
+def get_scratch() -> ScratchManager:
+    """Process-wide scratch storage; its reaper removes workdirs of abandoned sessions"""
+    return ScratchManager(
+        SCRATCH_DIR,
+        session_ttl=SCRATCH_SESSION_TTL,
+        session_quota=SCRATCH_SESSION_QUOTA,
+        total_quota=SCRATCH_TOTAL_QUOTA,
+        reap_interval=SCRATCH_REAP_INTERVAL,
+    ).start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_blob_store() -> BlobStore:
+    """Process-wide store for uploads; blobs spill into scratch storage (under its quota, evicted last)"""
+    return BlobStore(get_scratch().blobs_dir, BLOB_MEMORY_BUDGET)
+
+
+def put_blob(data: bytes) -> str:
+    return get_blob_store().put(data)
+
+
+def get_blob(key: str) -> Optional[Buffer]:
+    """The blob whose handle is in session_state[key]; the handle is dropped if the blob is gone"""
+    handle = st.session_state.get(key)
+    data = get_blob_store().get(handle)
+    if handle and data is None:
+        st.session_state[key] = None
+    return data
 
 
 def initialize_session_state():
@@ -15,53 +51,58 @@ def initialize_session_state():
         "selected_miscrit": None,
         "selected_stage": None,
         "edit_mode": "Sprite",  # Added: Track Sprite vs Avatar mode
-        "workdir": tempfile.mkdtemp(prefix="miscrits_sprites_"),
+        # Names this session's workdir in scratch storage
+        "scratch_id": uuid.uuid4().hex,
         "page": 0,
-        "uploaded_image_bytes": None,
+        # Blob store handle of the upload (the bytes never live in session state)
+        "uploaded_image_blob": None,
         "uploaded_image_name": None,
         "scale_factor": 10.0,
         "keep_aspect": True,
-        "sprite_encoded": None,
-        "needs_reencode": False,
         "prev_scale_factor": None,
         "prev_keep_aspect": None,
-        "upload_hash": None,
+        # "Apply to all stages": the encode job and the inputs it was submitted for
+        "all_stages_job": None,
+        "all_stages_key": None,
         "dataset": "Miscrits",
 
         # Move Editor additions
-        # temp_miscrits contains the working copy of the entire miscrits JSON (as Python list/dict)
-        # when user chooses to edit moves we deep copy the loaded JSON here and mutate it.
-        "temp_miscrits": None,
+        # moves_base is the shared, immutable miscrits.json (one per version, never mutated);
+        # moves_overlay holds only this session's edits on top of it.
+        "moves_base": None,
+        "moves_overlay": None,
         # original source info (api/local/upload)
         "temp_miscrits_source": None,
+        # sha256 of the imported upload and the uploader file_id it came from
+        "temp_miscrits_hash": None,
+        "temp_miscrits_upload_id": None,
     }
 
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
+    # Every run keeps the workdir from being reaped
+    get_scratch().heartbeat(st.session_state["scratch_id"])
+
 
 def reset_workdir():
     """Delete current workdir and create a fresh one"""
-    old_dir = Path(st.session_state.get("workdir", tempfile.gettempdir()))
-    shutil.rmtree(old_dir, ignore_errors=True)
-    new_dir = tempfile.mkdtemp(prefix="miscrits_sprites_")
-    st.session_state["workdir"] = new_dir
-    return Path(new_dir)
+    get_scratch().release(st.session_state["scratch_id"])
+    return get_workdir()
 
 
 def clear_upload_state():
     """Clear all upload-related state"""
     keys_to_clear = [
-        "uploaded_image_bytes",
+        "uploaded_image_blob",
         "uploaded_image_name",
-        "sprite_encoded",
-        "needs_reencode",
         "scale_factor",
         "keep_aspect",
         "prev_scale_factor",
         "prev_keep_aspect",
-        "upload_hash",
+        "all_stages_job",
+        "all_stages_key",
     ]
 
     for key in keys_to_clear:
@@ -82,11 +123,30 @@ def go_back_to_selection():
     st.session_state["step"] = 1
     st.session_state["edit_mode"] = "Sprite"
     # Clear move editor temp data when returning
-    st.session_state["temp_miscrits"] = None
+    st.session_state["moves_base"] = None
+    st.session_state["moves_overlay"] = None
+    st.session_state["edit_history"] = None
+    st.session_state["_move_search"] = None
+    st.session_state["_moves_patch"] = None
     st.session_state["temp_miscrits_source"] = None
+    st.session_state["temp_miscrits_hash"] = None
+    st.session_state["temp_miscrits_upload_id"] = None
     clear_upload_state()
 
 
 def get_workdir() -> Path:
     """Get current working directory"""
-    return Path(st.session_state.get("workdir", tempfile.gettempdir()))
+    return get_scratch().workdir(st.session_state["scratch_id"])
+
+
+def commit_workdir_file(path: Path) -> bool:
+    """
+    Count a file just written to the workdir against the session quota (older files are
+    evicted to make room). False, with an error shown, if it is too large on its own.
+    """
+    try:
+        get_scratch().commit(st.session_state["scratch_id"], path)
+        return True
+    except QuotaExceeded as e:
+        st.error(f"Not enough scratch space: {e}")
+        return False
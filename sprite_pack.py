@@ -0,0 +1,145 @@
+"""
+Batch sprite packs: size, resize and encode many replacement images at once.
+
+No Streamlit dependency. The sizing rule is the one the editor uses for a single
+upload (core.image.target_size); resizing runs in a process pool and encoding
+(core.encode.encode_batch) hands many in/out pairs to each Godot start.
+"""
+import csv
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from config import FETCH_TIMEOUT
+from core.fetch import DEFAULT_SPRITE_SIZE, avatar_cdn_url, fetch_sizes, sprite_cdn_url, sprite_cache_filename
+from core.image import resize_image
+
+
+class PackItem(NamedTuple):
+    """One manifest row: a replacement image for a stage's sprite or avatar"""
+    name: str
+    stage: int
+    kind: str  # "sprite" or "avatar"
+    image: Path
+    scale: float = 1.0
+    keep_aspect: bool = True
+
+    @property
+    def is_avatar(self) -> bool:
+        return self.kind == "avatar"
+
+    @property
+    def url(self) -> str:
+        return avatar_cdn_url(self.name) if self.is_avatar else sprite_cdn_url(self.name)
+
+    @property
+    def cache_name(self) -> str:
+        return sprite_cache_filename(self.url)
+
+
+def _flag(value, default: bool = True) -> bool:
+    if value in (None, ""):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def read_manifest(path: Path) -> List[PackItem]:
+    """
+    Read a CSV (header: name,stage,kind,image,scale[,keep_aspect]) or JSON list manifest.
+    Image paths are relative to the manifest. Raises ValueError on bad rows.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8-sig")
+    rows = json.loads(text) if path.suffix.lower() == ".json" else list(csv.DictReader(text.splitlines()))
+    items = []
+    for line, row in enumerate(rows, start=1):
+        try:
+            kind = str(row.get("kind") or "sprite").strip().lower()
+            if kind not in ("sprite", "avatar"):
+                raise ValueError(f"kind must be sprite or avatar, not {kind!r}")
+            items.append(PackItem(
+                name=str(row["name"]).strip(),
+                stage=int(row.get("stage") or 1),
+                kind=kind,
+                image=path.parent / str(row["image"]).strip(),
+                scale=float(row.get("scale") or 1.0),
+                keep_aspect=_flag(row.get("keep_aspect")),
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path.name} row {line}: {e}") from e
+    return items
+
+
+def resolve_stage_names(items: Iterable[PackItem], miscrits: Sequence[Dict]) -> List[PackItem]:
+    """
+    Replace each item's name by the name of its evolution stage, looking the Miscrit up
+    by any of its names in miscrits.json data. Unknown names are kept as given.
+    """
+    by_name: Dict[str, List[str]] = {}
+    for miscrit in miscrits:
+        names = miscrit.get("names", [miscrit.get("name", "Unknown")])
+        for name in names:
+            by_name.setdefault(name.lower(), names)
+    resolved = []
+    for item in items:
+        names = by_name.get(item.name.lower())
+        if names and 1 <= item.stage <= len(names):
+            item = item._replace(name=names[item.stage - 1])
+        resolved.append(item)
+    return resolved
+
+
+def fetch_original_sizes(items: Iterable[PackItem], timeout: float = FETCH_TIMEOUT,
+                         workers: int = 8) -> Dict[str, Tuple[int, int]]:
+    """Original sprite size per sprite URL (avatars need none)"""
+    return fetch_sizes((item.url for item in items if not item.is_avatar), timeout, workers)
+
+
+def _resize_job(job: Tuple[str, Tuple[int, int], float, bool, bool, str]) -> Tuple[int, int]:
+    """Process-pool worker: load, size and resize one image to a PNG; returns its size"""
+    image_path, original_size, scale, keep_aspect, is_avatar, out_path = job
+    resized = resize_image(Image.open(image_path).convert("RGBA"), original_size, scale, keep_aspect, is_avatar)
+    resized.save(out_path)
+    return resized.size
+
+
+def resize_all(items: Sequence[PackItem], original_sizes: Dict[str, Tuple[int, int]], workdir: Path,
+               processes: Optional[int] = None) -> List[Path]:
+    """Resize every item into workdir/<cache_name>.png in parallel; returns the PNG paths"""
+    workdir.mkdir(parents=True, exist_ok=True)
+    jobs, paths = [], []
+    for item in items:
+        out_path = workdir / f"{item.cache_name}.png"
+        jobs.append((
+            str(item.image), original_sizes.get(item.url, DEFAULT_SPRITE_SIZE),
+            item.scale, item.keep_aspect, item.is_avatar, str(out_path),
+        ))
+        paths.append(out_path)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # Surfaces the first worker exception (unreadable image etc.)
+        list(pool.map(_resize_job, jobs, chunksize=4))
+    return paths
+
+
+def write_zip(files: Iterable[Tuple[str, Path]], zip_path: Path) -> None:
+    """
+    Stream (archive name, file) pairs into a zip, written next to zip_path and moved
+    into place once complete. Encoded sprites are already compressed: stored as-is.
+    """
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = zip_path.with_name(zip_path.name + ".tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as zf:
+            for arcname, path in files:
+                zf.write(path, arcname)
+        os.replace(tmp, zip_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,43 @@
+import json
+import threading
+import time
+
+import core.catalog_store
+from core.catalog_store import CatalogStore
+
+DOCUMENT = [{"id": 1, "names": ["Flue"], "element": "Fire", "abilities": [], "ability_order": []}]
+
+
+class _Response:
+    status_code = 200
+    headers = {"ETag": '"v1"'}
+    content = json.dumps(DOCUMENT).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+def test_cold_start_callers_wait_for_the_same_fetch(tmp_path, monkeypatch):
+    calls = []
+
+    def slow_get(url, headers=None, timeout=None):
+        calls.append(url)
+        time.sleep(0.3)
+        return _Response()
+
+    monkeypatch.setattr(core.catalog_store.requests, "get", slow_get)
+    store = CatalogStore("https://example.invalid/miscrits.json", tmp_path / "miscrits.json.gz",
+                         refresh_interval=3600, timeout=5)
+    results = [None] * 4
+
+    def load(i):
+        results[i] = store.get()
+
+    threads = [threading.Thread(target=load, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(snapshot is not None and snapshot.version == results[0].version for snapshot in results)
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+import data_loader
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    data_loader._load_json_file.clear()
+    yield
+    data_loader._load_json_file.clear()
+
+
+def _bump(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_file_rewritten_on_every_parse_raises(tmp_path, monkeypatch):
+    path = tmp_path / "miscrits.json"
+    path.write_text(json.dumps([{"id": 1}]))
+    parse = data_loader.read_json_file
+    calls = []
+
+    def rewriting_parse(p):
+        calls.append(p)
+        data = parse(p)
+        _bump(path)
+        return data
+
+    monkeypatch.setattr(data_loader, "read_json_file", rewriting_parse)
+    with pytest.raises(ValueError, match="kept changing"):
+        data_loader.load_json_file_cached(path)
+    assert len(calls) == data_loader._TORN_READ_ATTEMPTS
+
+
+def test_torn_parse_keeps_other_entries(tmp_path, monkeypatch):
+    other, path = tmp_path / "other.json", tmp_path / "miscrits.json"
+    other.write_text("[1]")
+    path.write_text("[2]")
+    assert data_loader.load_json_file_cached(other) == [1]
+
+    parse = data_loader.read_json_file
+    calls = []
+
+    def rewrite_once(p):
+        calls.append(p)
+        data = parse(p)
+        if len(calls) == 1:
+            _bump(path)
+        return data
+
+    monkeypatch.setattr(data_loader, "read_json_file", rewrite_once)
+    assert data_loader.load_json_file_cached(path) == [2]
+    assert len(calls) == 2
+    # Still cached: no parse for the untouched file
+    assert data_loader.load_json_file_cached(other) == [1]
+    assert len(calls) == 2
@@ -0,0 +1,44 @@
+from io import BytesIO
+
+import streamlit as st
+from PIL import Image
+
+import image_utils
+from core.fetch import DEFAULT_SPRITE_SIZE
+
+
+def _png(size):
+    buf = BytesIO()
+    Image.new("RGBA", size, (255, 0, 0, 255)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _flaky(monkeypatch, data):
+    """fetch_bytes that fails on the first call, then returns `data`"""
+    calls = []
+
+    def fetch_bytes(url, timeout=None):
+        calls.append(url)
+        if len(calls) == 1:
+            raise OSError("CDN down")
+        return data
+
+    monkeypatch.setattr(image_utils, "fetch_bytes", fetch_bytes)
+    monkeypatch.setattr("core.fetch.fetch_bytes", fetch_bytes)
+    st.cache_data.clear()
+    return calls
+
+
+def test_failed_sprite_is_not_cached(monkeypatch):
+    _flaky(monkeypatch, _png((64, 64)))
+    url = "https://example.invalid/sprite.png"
+    blank = image_utils.load_sprite_on_canvas(url, (32, 32), "v1")
+    assert blank.getbbox() is None
+    assert image_utils.load_sprite_on_canvas(url, (32, 32), "v1").getbbox() is not None
+
+
+def test_failed_size_is_not_cached(monkeypatch):
+    _flaky(monkeypatch, _png((300, 200)))
+    url = "https://example.invalid/sprite.png"
+    assert image_utils.get_original_sprite_size(url, "v1") == DEFAULT_SPRITE_SIZE
+    assert image_utils.get_original_sprite_size(url, "v1") == (300, 200)
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import job_service
+from core.jobs import DONE, FAILED, JobService
+
+
+def _panel_app():
+    import streamlit as st
+    from job_service import get_job_service, render_job
+
+    st.session_state["runs"] = st.session_state.get("runs", 0) + 1
+    job = get_job_service().submit("flaky", {"n": 1})
+    render_job(job.id, "Download", "out.bin")
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    attempts = []
+
+    def flaky(ctx, params):
+        attempts.append(params)
+        if len(attempts) == 1:
+            raise RuntimeError("first attempt fails")
+        return b"ok"
+
+    service = JobService(tmp_path / "jobs.sqlite3", tmp_path / "artifacts", workers=1)
+    service.register("flaky", flaky)
+    monkeypatch.setattr(job_service, "get_job_service", lambda: service)
+    return service
+
+
+def _settle(service, state):
+    deadline = time.monotonic() + 10
+    while not any(job.state == state for job in service.jobs()):
+        assert time.monotonic() < deadline, f"no job reached {state}"
+        time.sleep(0.01)
+
+
+def test_retry_resubmits_and_reruns_the_page(service):
+    at = AppTest.from_function(_panel_app, default_timeout=30)
+    at.run()
+    _settle(service, FAILED)
+    at.run()
+    runs = at.session_state["runs"]
+
+    next(b for b in at.button if b.label == "🔁 Retry").click().run()
+    assert not at.exception
+    # The button's full rerun, not just the fragment's
+    assert at.session_state["runs"] > runs
+    _settle(service, DONE)
+    at.run()
+    assert [b.label for b in at.get("download_button")] == ["Download"]
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from core.encode import encode_batch
+from core.jobs import DONE, JobService
+
+STUB_GODOT = Path(__file__).resolve().parent.parent / "benchmarks" / "stub_godot.py"
+
+
+def _wait(service, jid, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while service.get(jid).active:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return service.get(jid)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = JobService(tmp_path / "jobs.sqlite3", tmp_path / "artifacts", workers=1,
+                         job_ttl=60, artifact_quota=10_000)
+    service.register("echo", lambda ctx, params: params["data"].encode("utf-8"))
+    return service
+
+
+def test_cancel_kills_running_encode(tmp_path, monkeypatch):
+    monkeypatch.setenv("MISCRITS_STUB_ENCODE_DELAY", "30")
+    src = tmp_path / "in.png"
+    src.write_bytes(b"png")
+    stop = threading.Event()
+    threading.Timer(0.5, stop.set).start()
+    started = time.monotonic()
+    results = encode_batch([(src, tmp_path / "out")], godot_bin=STUB_GODOT, workers=1, cancelled=stop.is_set)
+    assert results == [False]
+    assert time.monotonic() - started < 5
+
+
+def test_prune_drops_old_jobs_and_unreferenced_artifacts(service):
+    old = service.submit("echo", {"data": "old"})
+    new = service.submit("echo", {"data": "new"})
+    _wait(service, old.id)
+    new = _wait(service, new.id)
+    stray = service.artifacts.put(b"stray input")
+
+    stale = time.time() - 120
+    service._db.execute("UPDATE jobs SET updated = ? WHERE id = ?", (stale, old.id))
+    for digest in (_wait(service, old.id).artifact, stray):
+        os.utime(service.artifacts.path(digest), (stale, stale))
+
+    assert service.prune() == (1, 2)
+    assert service.get(old.id) is None
+    assert service.artifact_path(service.get(new.id)) is not None
+
+
+def test_prune_keeps_store_under_quota(service):
+    jobs = [service.submit("echo", {"data": str(i) * 4000}) for i in range(4)]
+    jobs = [_wait(service, job.id) for job in jobs]
+    for age, job in enumerate(reversed(jobs)):
+        stamp = time.time() - age
+        os.utime(service.artifacts.path(job.artifact), (stamp, stamp))
+
+    service.prune()
+    assert sum(stat.st_size for _, stat in service.artifacts.files()) <= service.artifact_quota
+    # Least recently used results went first, and their jobs with them
+    assert [service.get(job.id) is not None for job in jobs] == [False, False, True, True]
+    assert service.get(jobs[-1].id).state == DONE
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    metrics.set_enabled(False)
+    metrics.reset()
+    yield
+    metrics.end_run()
+    metrics.set_enabled(False)
+    metrics.reset()
+
+
+def test_recording_a_run_leaves_process_totals_off():
+    metrics.begin_run(record=True)
+    with metrics.span("outer"):
+        with metrics.span("inner"):
+            pass
+    assert [(name, depth) for name, depth, _ in metrics.end_run()] == [("outer", 0), ("inner", 1)]
+    assert metrics.span_stats() == []
+
+
+def test_unrecorded_run_is_a_no_op():
+    metrics.begin_run()
+    assert metrics.span("x") is metrics.span("y")
+    assert metrics.end_run() == []
+
+
+def test_propagate_carries_the_trace_into_workers():
+    metrics.begin_run(record=True)
+
+    def work(i):
+        with metrics.span("fetch"):
+            return i
+
+    with metrics.span("batch"):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert list(pool.map(metrics.propagate(work), range(8))) == list(range(8))
+    trace = metrics.end_run()
+    assert [(name, depth) for name, depth, _ in trace] == [("batch", 0)] + [("fetch", 1)] * 8
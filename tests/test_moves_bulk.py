@@ -0,0 +1,59 @@
+from streamlit.testing.v1 import AppTest
+
+
+def _bulk_app():
+    import streamlit as st
+    from moves_model import EditHistory, EditOverlay, MovesDocument
+    from views.moves_bulk import render_bulk_panel
+
+    if "history" not in st.session_state:
+        doc = MovesDocument([{
+            "id": 1, "names": ["Flue"], "element": "Fire",
+            "abilities": [
+                {"id": 11, "name": "Fire Blast", "type": "Attack", "element": "Fire"},
+                {"id": 12, "name": "Fireball", "type": "Attack", "element": "Fire"},
+                {"id": 13, "name": "Tackle", "type": "Attack", "element": "Physical"},
+            ],
+            "ability_order": [11, 12, 13],
+        }], "test")
+        st.session_state["history"] = EditHistory(EditOverlay(doc))
+    history = st.session_state["history"]
+    render_bulk_panel(history.overlay, history)
+
+
+def _names(at):
+    overlay = at.session_state["history"].overlay
+    miscrit = overlay.base.miscrit(1)
+    return [overlay.resolve_ability(1, a)["name"] for a in miscrit["abilities"]]
+
+
+def _filter_fire(at):
+    at.run()
+    at.text_input(key="bulk_pattern").input("fire")
+    at.button[0].click().run()
+
+
+def test_type_only_bulk_edit_keeps_names():
+    at = AppTest.from_function(_bulk_app)
+    _filter_fire(at)
+    assert at.text_input(key="bulk_find").value == ""
+    at.selectbox(key="bulk_set_type").select("Water")
+    next(b for b in at.button if b.label.startswith("✏️")).click().run()
+
+    assert not at.exception
+    assert _names(at) == ["Fire Blast", "Fireball", "Tackle"]
+    overlay = at.session_state["history"].overlay
+    assert overlay.resolve_ability(1, overlay.base.ability(1, 11))["element"] == "Water"
+
+
+def test_find_replace_needs_opt_in():
+    at = AppTest.from_function(_bulk_app)
+    _filter_fire(at)
+    at.checkbox(key="bulk_rename").check()
+    at.text_input(key="bulk_find").input("fire")
+    at.text_input(key="bulk_replace").input("Ice")
+    at.run()
+    next(b for b in at.button if b.label.startswith("✏️")).click().run()
+
+    assert not at.exception
+    assert _names(at) == ["Ice Blast", "Iceball", "Tackle"]
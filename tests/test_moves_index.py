@@ -0,0 +1,37 @@
+import pytest
+
+from moves_index import MoveIndex, MoveSearch
+from moves_model import EditOverlay, MovesDocument
+
+
+@pytest.fixture
+def search():
+    doc = MovesDocument([{
+        "id": 1, "names": ["Flue"], "element": "Fire",
+        "abilities": [
+            {"id": 11, "name": "Fire Blast", "type": "Attack", "element": "Fire"},
+            {"id": 12, "name": "Tackle", "type": "Attack", "element": "Physical"},
+            {"id": 13, "name": "Harden", "type": "Buff", "element": "Misc", "ap": 5},
+        ],
+        "ability_order": [11, 12, 13],
+    }], "test")
+    return MoveSearch(MoveIndex(doc), EditOverlay(doc))
+
+
+@pytest.mark.parametrize("query", ["t", "ty", "ele", "ic"])
+def test_plain_word_does_not_prefix_match_fields(search, query):
+    # Only "Tackle" starts with "t"; no name starts with the others
+    expected = [(1, 12)] if query == "t" else []
+    assert search.search(query) == expected
+
+
+def test_plain_word_matches_whole_field_value(search):
+    assert search.search("buff") == [(1, 13)]
+    assert search.search("fire") == [(1, 11)]
+    assert search.search("type:attack") == [(1, 11), (1, 12)]
+
+
+def test_edited_names_follow_the_same_rules(search):
+    search.overlay.set_field(1, 13, "name", "Typhoon")
+    assert search.search("ty") == [(1, 13)]
+    assert search.search("ha") == []
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from moves_model import EditOverlay, MovesDocument, parse_rows
+
+
+def _overlay():
+    return EditOverlay(MovesDocument([{
+        "id": 2, "names": ["Flue"], "element": "Fire",
+        "abilities": [{"id": 10, "name": "Tackle"}, {"id": 20, "name": "Fire Blast"}],
+        "ability_order": [10, 20],
+    }], "test"))
+
+
+def test_refused_move_leaves_no_order_behind():
+    overlay = _overlay()
+    assert not overlay.move(2, 20, 1)
+    assert not overlay.move(2, 10, -1)
+    assert overlay.orders == {}
+    assert overlay.revision == 0
+
+
+def test_move_swaps_neighbours():
+    overlay = _overlay()
+    assert overlay.move(2, 20, -1)
+    assert overlay.orders == {2: [20, 10]}
+    assert overlay.position(2, 10) == 1
+    assert not overlay.move(2, 20, -1)
+    assert overlay.orders == {2: [20, 10]}
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"miscrit_id": None, "ability_id": 10}, "Row 2: miscrit_id and ability_id must be integers"),
+    ({"miscrit_id": 2, "ability_id": [10]}, "Row 2: miscrit_id and ability_id must be integers"),
+    ({"miscrit_id": 2, "ability_id": {}}, "Row 2: miscrit_id and ability_id must be integers"),
+    ({"miscrit_id": 2, "ability_id": 10, "name": 5}, "Row 2: name must be text"),
+])
+def test_parse_rows_rejects_bad_json_values(row, message):
+    data = json.dumps([{"miscrit_id": 2, "ability_id": 20, "name": "Ember"}, row]).encode("utf-8")
+    with pytest.raises(ValueError, match=message):
+        parse_rows(data, "rows.json")
+
+
+def test_parse_rows_reads_csv_ids():
+    rows = parse_rows(b"miscrit_id,ability_id,name\n2,10,Tackle\n", "rows.csv")
+    assert rows[0]["miscrit_id"] == 2 and rows[0]["ability_id"] == 10
+
+
+def test_moving_back_drops_the_order_edit():
+    from moves_diff import build_patch
+
+    overlay = _overlay()
+    assert overlay.move(2, 20, -1)
+    assert overlay.move(2, 20, 1)
+    assert overlay.orders == {} and len(overlay) == 0
+    assert build_patch(overlay)["orders"] == []
+    assert overlay.position(2, 20) == 1
+    assert overlay.move(2, 20, -1)
+    assert overlay.orders == {2: [20, 10]}
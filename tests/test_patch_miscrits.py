@@ -0,0 +1,69 @@
+import json
+import os
+import stat
+
+import pytest
+
+import patch_miscrits
+from moves_diff import PATCH_FORMAT, PATCH_VERSION
+
+MISCRITS = [
+    {"id": 1, "abilities": [{"id": 11, "name": "Fire Blast", "type": "Attack", "element": "Fire"}],
+     "ability_order": [11]},
+    None,
+    {"id": 2, "abilities": [], "ability_order": []},
+]
+
+
+def _patch(changes, orders=()):
+    return {"format": PATCH_FORMAT, "version": PATCH_VERSION, "base_version": "test",
+            "changes": list(changes), "orders": list(orders)}
+
+
+@pytest.fixture
+def files(tmp_path):
+    src = tmp_path / "miscrits.json"
+    src.write_text(json.dumps(MISCRITS))
+    patch = tmp_path / "patch.json"
+    patch.write_text(json.dumps(_patch([
+        {"miscrit_id": 1, "ability_id": 11, "field": "name", "old": "Fire Blast", "new": "Ice Blast"},
+    ])))
+    return src, patch, tmp_path / "out.json"
+
+
+def test_null_element_does_not_end_the_stream(files):
+    src, patch, out = files
+    assert patch_miscrits.main([str(src), str(patch), "-o", str(out)]) == 0
+    data = json.loads(out.read_text())
+    assert len(data) == 3 and data[1] is None
+    assert data[0]["abilities"][0]["name"] == "Ice Blast"
+
+
+def test_output_keeps_existing_mode(files):
+    src, patch, out = files
+    out.write_text("[]")
+    os.chmod(out, 0o644)
+    assert patch_miscrits.main([str(src), str(patch), "-o", str(out)]) == 0
+    assert stat.S_IMODE(out.stat().st_mode) == 0o644
+
+
+def test_new_output_follows_umask(files):
+    src, patch, out = files
+    old = os.umask(0o022)
+    try:
+        assert patch_miscrits.main([str(src), str(patch), "-o", str(out)]) == 0
+    finally:
+        os.umask(old)
+    assert stat.S_IMODE(out.stat().st_mode) == 0o644
+
+
+@pytest.mark.parametrize("entry", [
+    {"ability_id": 11, "field": "name", "old": "a", "new": "b"},
+    "not an object",
+])
+def test_malformed_patch_is_a_clean_error(files, capsys, entry):
+    src, patch, out = files
+    patch.write_text(json.dumps(_patch([entry])))
+    assert patch_miscrits.main([str(src), str(patch), "-o", str(out)]) == 2
+    assert "error: changes[0]" in capsys.readouterr().err
+    assert not out.exists()
@@ -0,0 +1,45 @@
+import os
+import time
+
+from core.blobs import BlobStore
+from core.scratch import ScratchManager
+
+
+def _age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def _scratch(tmp_path, total_quota):
+    return ScratchManager(tmp_path, session_ttl=600, session_quota=10_000, total_quota=total_quota)
+
+
+def test_previews_and_session_files_go_before_uploads(tmp_path):
+    scratch = _scratch(tmp_path, total_quota=2500)
+    blobs = BlobStore(scratch.blobs_dir, memory_budget=0)
+    upload = blobs.put(b"u" * 1000)
+    _age(blobs.path(upload), 300)
+    preview = scratch.put_shared(b"p" * 1000)
+    session_file = scratch.workdir("s1") / "out.bin"
+    session_file.write_bytes(b"s" * 1000)
+
+    scratch.reap()
+    assert not preview.exists()
+    assert session_file.exists()
+    assert blobs.get(upload) is not None
+
+    scratch.total_quota = 1500
+    scratch.reap()
+    assert not session_file.exists()
+    assert blobs.get(upload) is not None
+
+
+def test_unread_uploads_expire(tmp_path):
+    scratch = _scratch(tmp_path, total_quota=1 << 30)
+    blobs = BlobStore(scratch.blobs_dir, memory_budget=0)
+    fresh, stale = blobs.put(b"fresh"), blobs.put(b"stale")
+    _age(blobs.path(stale), 900)
+
+    scratch.reap()
+    assert bytes(blobs.get(fresh)) == b"fresh"
+    assert blobs.get(stale) is None
@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_session_leak import STATE_BUDGET_PER_CYCLE, TRACED_BUDGET_PER_CYCLE
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _measure(cycles: int, warmup: int, inject_growth: int = 0) -> dict:
+    # A fresh interpreter: the bench points config at private cache dirs before it loads
+    code = (
+        "import json, shutil\n"
+        "from benchmarks.bench_session_leak import measure, prepare\n"
+        "workdir = prepare()\n"
+        f"print(json.dumps(measure({cycles}, {warmup}, {inject_growth})))\n"
+        "shutil.rmtree(workdir, ignore_errors=True)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_select_upload_back_cycles_do_not_grow_memory():
+    result = _measure(cycles=6, warmup=3)
+    assert result["traced_growth"] <= TRACED_BUDGET_PER_CYCLE
+    assert result["state_growth"] <= STATE_BUDGET_PER_CYCLE
+
+
+@pytest.mark.parametrize("inject_growth", [4096])
+def test_injected_leak_is_detected(inject_growth):
+    result = _measure(cycles=3, warmup=2, inject_growth=inject_growth)
+    assert result["state_growth"] > STATE_BUDGET_PER_CYCLE
@@ -0,0 +1,27 @@
+"""
+Wall-clock phase timing for the command-line tools
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class PhaseTimer:
+    """Accumulates wall time per named phase"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> str:
+        total = sum(self.totals.values())
+        lines = [f"  {name:<8} {secs * 1000:9.1f} ms" for name, secs in self.totals.items()]
+        lines.append(f"  {'total':<8} {total * 1000:9.1f} ms")
+        return "\n".join(lines)
@@ -3,6 +3,7 @@ Reusable UI components and styling
 """
 import streamlit as st
 from config import ROOT
+from core import metrics
 
 # =====================================================================
 # THEME: Gold/Brown/Black (Structure: Modern/Neon)
@@ -212,6 +213,49 @@ def render_sidebar():
                 del st.session_state[key]
             st.rerun()
 
+        render_debug_panel()
+
+
+def render_debug_panel():
+    """
+    Sidebar performance panel: this session's last run, span by span. Process-wide
+    totals, cache hit rates and bytes fetched only when MISCRITS_METRICS=1.
+    """
+    st.toggle("🐞 Performance debug", key="perf_debug", help="Traces this session's script runs")
+    if not st.session_state.get("perf_debug"):
+        return
+
+    last_run = st.session_state.get("_perf_last_run") or []
+    st.caption(f"**Last run** · {sum(secs for _, depth, secs in last_run if depth == 0) * 1000:.0f} ms")
+    if last_run:
+        st.dataframe(
+            [{"span": "· " * depth + name, "ms": round(secs * 1000, 1)} for name, depth, secs in last_run],
+            hide_index=True, use_container_width=True,
+        )
+
+    if not metrics.enabled():
+        st.caption("Process-wide totals are off (set `MISCRITS_METRICS=1` on the server).")
+        return
+    st.caption("**Since start**")
+    st.dataframe(metrics.span_stats(), hide_index=True, use_container_width=True)
+
+    counts = metrics.counters()
+    caches = sorted({dict(labels)["cache"] for name, labels in counts if name == "cache_lookups"})
+    for cache in caches:
+        lookups = metrics.counter("cache_lookups", cache=cache)
+        misses = metrics.counter("cache_misses", cache=cache)
+        st.caption(f"Cache `{cache}`: {lookups - misses:.0f}/{lookups:.0f} hits ({(lookups - misses) / lookups:.0%})")
+    fetched = {dict(labels)["source"]: value for (name, labels), value in counts.items() if name == "fetch_bytes"}
+    for source, value in sorted(fetched.items()):
+        st.caption(f"Fetched from {source}: {value / 1024:.0f} KiB")
+
+    c_export, c_reset = st.columns(2)
+    with c_export:
+        st.download_button("⬇️ Prometheus", metrics.prometheus_text(), file_name="metrics.prom",
+                           mime="text/plain", use_container_width=True)
+    with c_reset:
+        st.button("Reset", on_click=metrics.reset, use_container_width=True)
+
 
 def render_pagination(page: int, total_items: int, page_size: int):
     max_page = max((total_items - 1) // page_size, 0)
@@ -1,10 +1,18 @@
 """
 Views package for the Miscrits Sprite Replacer
+Views load on first access, so importing one view doesn't import the others.
 """
-from .selection import render_selection_view
-from .editor import render_editor_view
+import importlib
 
-__all__ = [
-    'render_selection_view',
-    'render_editor_view',
-]
+_VIEWS = {
+    'render_selection_view': '.selection',
+    'render_editor_view': '.editor',
+}
+
+__all__ = list(_VIEWS)
+
+
+def __getattr__(name):
+    if name in _VIEWS:
+        return getattr(importlib.import_module(_VIEWS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,23 +1,27 @@
 """
 Sprite/Avatar editor view (Step 2)
 """
-import hashlib
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from PIL import Image
-from pathlib import Path
-from data_loader import load_miscrits_from_api, get_all_stages_for_miscrit
+from typing import Dict, List, Tuple
+from data_loader import load_miscrits_from_api, get_all_stages_for_miscrit, catalog_version
 from image_utils import (
     sprite_cdn_url, avatar_cdn_url, sprite_cache_filename,
     load_sprite_on_canvas, place_on_canvas, get_original_sprite_size,
     show_pil_via_file
 )
+from core import metrics
+from core.encode_jobs import ENCODE_PACK, ENCODE_SPRITE
+from core.image import resize_image, target_size
+from job_service import get_job_service, render_job, store_png
 from ui_components import display_name, render_page_header
-from encoder import encode_with_progress
-from session_manager import get_workdir, go_back_to_selection, clear_upload_state
+from session_manager import get_blob, go_back_to_selection, clear_upload_state, put_blob
 from config import AVATAR_SIZE
 
 
+@metrics.timed()
 def render_editor_view():
     """Render the sprite/avatar editing interface"""
     m = st.session_state.get("selected_miscrit")
@@ -35,6 +39,15 @@ def render_editor_view():
 
     # For Miscrits, show evolution stage selector
     if dataset == "Miscrits":
+        # Switching modes keeps the upload: it is the input of both
+        if st.toggle("Apply to all stages", key="all_stages_mode",
+                     help="One upload → the sprite and avatar of every evolution stage, in one zip"):
+            render_all_stages_view(m)
+            st.divider()
+            if st.button("⬅️ Back to Selection", use_container_width=True):
+                go_back_to_selection()
+                st.rerun()
+            return
         render_stage_selector(m)
         # Refresh data after rendering selector (in case user clicked something)
         selected_stage_data = get_selected_stage_data(m, dataset)
@@ -115,8 +128,8 @@ def render_stage_selector(m):
                     st.caption(f"Stage {stage['evo_stage']}")
 
                 sprite_url = sprite_cdn_url(stage["evo_name"])
-                sprite_img = load_sprite_on_canvas(sprite_url, canvas_size=(128, 128))
-                show_pil_via_file(get_workdir(), sprite_img, f"stage_{stage['evo_stage']}.png", width="stretch")
+                sprite_img = load_sprite_on_canvas(sprite_url, canvas_size=(128, 128), catalog_version=all_miscrits.version)
+                show_pil_via_file(sprite_img, width="stretch")
                 
                 btn_type = "primary" if is_selected else "secondary"
                 btn_label = "Selected" if is_selected else "Select"
@@ -139,7 +152,8 @@ def get_selected_stage_data(m, dataset):
         return {
             "name": m.get("first_name", "Unknown"),
             "id": m["id"],
-            "stage": 1
+            "stage": 1,
+            "catalog_version": catalog_version(dataset),
         }
     
     # For Miscrits
@@ -158,27 +172,28 @@ def get_selected_stage_data(m, dataset):
                 "name": stage["evo_name"],
                 "id": m["id"],
                 "stage": selected_stage,
-                "total_stages": len(stages)
+                "total_stages": len(stages),
+                "catalog_version": all_miscrits.version,
             }
     return None
 
 
 def render_current_preview(stage_data, is_avatar):
     """Render the current sprite or avatar preview"""
-    resource_label = "avatar" if is_avatar else "sprite"
     name = stage_data["name"]
+    version = stage_data["catalog_version"]
     
     if is_avatar:
         url = avatar_cdn_url(name)
-        img = load_sprite_on_canvas(url, canvas_size=(128, 128))
+        img = load_sprite_on_canvas(url, canvas_size=(128, 128), catalog_version=version)
         caption = "Original: 50×50px"
     else:
         url = sprite_cdn_url(name)
-        img = load_sprite_on_canvas(url, canvas_size=(256, 256))
-        orig_w, orig_h = get_original_sprite_size(url)
+        img = load_sprite_on_canvas(url, canvas_size=(256, 256), catalog_version=version)
+        orig_w, orig_h = get_original_sprite_size(url, catalog_version=version)
         caption = f"Original: {orig_w}×{orig_h}px"
 
-    show_pil_via_file(get_workdir(), img, f"current_{resource_label}.png", width="stretch")
+    show_pil_via_file(img, width="stretch")
     st.caption(caption)
     
     cache_name = sprite_cache_filename(url)
@@ -186,20 +201,25 @@ def render_current_preview(stage_data, is_avatar):
         st.code(cache_name, language="text")
 
 
-def render_upload_section(stage_data, dataset, is_avatar):
-    """Render the upload and editing section"""
-    uploaded_bytes = st.session_state.get("uploaded_image_bytes")
-    
+def render_image_uploader():
+    """File uploader for the replacement image; returns the stored upload bytes or None"""
+    uploaded_bytes = get_blob("uploaded_image_blob")
     if uploaded_bytes is None:
         new_file = st.file_uploader(
             "Upload Image (PNG/JPG)",
             type=["png", "jpg", "jpeg"],
         )
         if new_file:
-            st.session_state["uploaded_image_bytes"] = new_file.read()
+            st.session_state["uploaded_image_blob"] = put_blob(new_file.getvalue())
             st.session_state["uploaded_image_name"] = new_file.name
-            st.session_state["needs_reencode"] = True
             st.rerun()
+    return uploaded_bytes
+
+
+def render_upload_section(stage_data, dataset, is_avatar):
+    """Render the upload and editing section"""
+    uploaded_bytes = render_image_uploader()
+    if uploaded_bytes is None:
         return
     
     # Process uploaded image
@@ -209,46 +229,36 @@ def render_upload_section(stage_data, dataset, is_avatar):
 def process_uploaded_image(stage_data, dataset, uploaded_bytes, is_avatar):
     """Process and display uploaded image with controls"""
     img = Image.open(BytesIO(uploaded_bytes)).convert("RGBA")
-    workdir = get_workdir()
     
     if is_avatar:
-        target_w, target_h = 50, 50
+        target_w, target_h = target_size(img.size, AVATAR_SIZE, is_avatar=True)
         img_resized = img.resize((target_w, target_h), Image.LANCZOS)
         preview_canvas = place_on_canvas(img_resized, canvas_size=(128, 128))
-        show_pil_via_file(workdir, preview_canvas, "preview_avatar.png", width="stretch")
-        st.caption("Auto-resized to 50×50px")
+        show_pil_via_file(preview_canvas, width="stretch")
+        st.caption(f"Auto-resized to {target_w}×{target_h}px")
         
     else:
         sprite_url = sprite_cdn_url(stage_data["name"])
-        orig_w, orig_h = get_original_sprite_size(sprite_url)
+        orig_size = get_original_sprite_size(sprite_url, catalog_version=stage_data["catalog_version"])
         
         scale_factor = st.session_state.get("scale_factor", 1.0)
         keep_aspect = st.session_state.get("keep_aspect", True)
         
-        if keep_aspect:
-            aspect_ratio = img.width / img.height
-            target_h = int(orig_h * scale_factor)
-            target_w = int(target_h * aspect_ratio)
-        else:
-            target_w = int(orig_w * scale_factor)
-            target_h = int(orig_h * scale_factor)
+        # Same sizing rule as the batch sprite-pack builder
+        target_w, target_h = target_size(img.size, orig_size, scale_factor, keep_aspect)
         
         img_resized = img.resize((target_w, target_h), Image.LANCZOS)
         preview_canvas = place_on_canvas(img_resized, canvas_size=(256, 256))
         show_pil_via_file(
-            workdir, preview_canvas, "preview_sprite.png",
+            preview_canvas,
             caption=f"New Size: {target_w}×{target_h}px",
             width="stretch"
         )
         
         render_size_controls(scale_factor, keep_aspect)
     
-    filename_part = "avatar" if is_avatar else "sprite"
-    resized_path = workdir / f"{stage_data['name'].replace(' ', '_')}_{filename_part}.resized.png"
-    img_resized.save(resized_path)
-    
     st.markdown("---")
-    render_download_section(resized_path, stage_data, uploaded_bytes, is_avatar)
+    render_download_section(store_png(img_resized), stage_data, is_avatar)
 
 
 def render_size_controls(scale_factor, keep_aspect):
@@ -263,13 +273,10 @@ def render_size_controls(scale_factor, keep_aspect):
     if new_scale != scale_factor or new_keep != keep_aspect:
         st.session_state["scale_factor"] = new_scale
         st.session_state["keep_aspect"] = new_keep
-        st.session_state["needs_reencode"] = True
         st.rerun()
 
 
-def render_download_section(resized_path, stage_data, uploaded_bytes, is_avatar):
-    workdir = get_workdir()
-    
+def render_download_section(png_digest, stage_data, is_avatar):
     if is_avatar:
         target_url = avatar_cdn_url(stage_data["name"])
         label_text = "⬇️ Encrypted Avatar"
@@ -279,35 +286,100 @@ def render_download_section(resized_path, stage_data, uploaded_bytes, is_avatar)
         
     cache_name = sprite_cache_filename(target_url)
     
-    current_hash = hashlib.sha256(uploaded_bytes).hexdigest()
-    needs_reencode = (
-        st.session_state.get("needs_reencode", False) or
-        st.session_state.get("upload_hash") != current_hash or
-        st.session_state.get("sprite_encoded") is None
+    # The job is keyed on the exact resized pixels: resubmitting on every rerun is free,
+    # and an identical upload from any session reuses the finished encode
+    job = get_job_service().submit(ENCODE_SPRITE, {"png": png_digest, "name": cache_name})
+    render_job(job.id, label_text, cache_name)
+
+    if st.button("🔄 Reset", use_container_width=True):
+        clear_upload_state()
+        st.rerun()
+
+# =====================================================================
+# Apply to all stages
+# =====================================================================
+
+def get_original_sprite_sizes(urls: Tuple[str, ...], catalog_version: str = "") -> Dict[str, Tuple[int, int]]:
+    """Original sizes of several sprites, fetched concurrently (each cached like get_original_sprite_size)"""
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(urls)))) as pool:
+        fetch = metrics.propagate(lambda url: get_original_sprite_size(url, catalog_version))
+        return dict(zip(urls, pool.map(fetch, urls)))
+
+
+def render_all_stages_view(m):
+    """One upload → sprites for every evolution stage plus their avatars, as one zip"""
+    all_miscrits = load_miscrits_from_api()
+    version = all_miscrits.version
+    stages = get_all_stages_for_miscrit(all_miscrits, m["id"])
+    if not stages:
+        st.warning("No evolution stages found for this Miscrit.")
+        return
+
+    include_avatars = st.checkbox("Include avatars", value=True, key="all_stages_avatars")
+    st.info(
+        f"ℹ️ One image replaces the **sprite{' and avatar' if include_avatars else ''}** "
+        f"of all {len(stages)} stages. Sprites are sized to each stage's original sprite."
     )
-    
-    if needs_reencode:
-        output_path = workdir / cache_name
-        encoded_bytes = encode_with_progress(resized_path, output_path, "Encrypting...")
-        
-        if encoded_bytes:
-            st.session_state["sprite_encoded"] = encoded_bytes
-            st.session_state["upload_hash"] = current_hash
-            st.session_state["needs_reencode"] = False
-        else:
-            return
-    
-    encoded_bytes = st.session_state.get("sprite_encoded")
-    if encoded_bytes:
-        st.download_button(
-            label=label_text,
-            data=encoded_bytes,
-            file_name=cache_name,
-            mime="application/octet-stream",
-            type="primary",
-            use_container_width=True
-        )
-        
-        if st.button("🔄 Reset", use_container_width=True):
-            clear_upload_state()
-            st.rerun()
\ No newline at end of file
+
+    uploaded_bytes = render_image_uploader()
+    if uploaded_bytes is None:
+        return
+
+    img = Image.open(BytesIO(uploaded_bytes)).convert("RGBA")
+    scale_factor = st.session_state.get("scale_factor", 1.0)
+    keep_aspect = st.session_state.get("keep_aspect", True)
+    sprite_urls = tuple(sprite_cdn_url(stage["evo_name"]) for stage in stages)
+    sizes = get_original_sprite_sizes(sprite_urls, catalog_version=version)
+
+    # Previews: one column per stage
+    cols = st.columns(len(stages))
+    resized = []
+    for col, stage, url in zip(cols, stages, sprite_urls):
+        sprite = resize_image(img, sizes[url], scale_factor, keep_aspect)
+        resized.append((stage["evo_name"], sprite))
+        with col:
+            show_pil_via_file(
+                fit_preview(sprite),
+                caption=f"{display_name(stage['evo_name'])}: {sprite.width}×{sprite.height}px", width="stretch",
+            )
+    render_size_controls(scale_factor, keep_aspect)
+
+    # The blob handle is the upload's sha256
+    key = f"{st.session_state['uploaded_image_blob']}:{scale_factor}:{keep_aspect}:{include_avatars}:{version}"
+    n_files = len(stages) * (2 if include_avatars else 1)
+    job_id = st.session_state.get("all_stages_job")
+    if job_id and get_job_service().get(job_id) is None:
+        # Pruned while the page sat idle: offer the button again
+        st.session_state["all_stages_job"] = st.session_state["all_stages_key"] = None
+    if st.button(f"⚙️ Encrypt {n_files} files", type="primary", use_container_width=True,
+                 disabled=st.session_state.get("all_stages_key") == key):
+        files = all_stages_files(resized, img, include_avatars)
+        job = get_job_service().submit(ENCODE_PACK, {"files": files})
+        st.session_state["all_stages_job"] = job.id
+        st.session_state["all_stages_key"] = key
+
+    job_id = st.session_state.get("all_stages_job")
+    if job_id and st.session_state.get("all_stages_key") == key:
+        zip_name = f"{m.get('base_name', 'miscrit').replace(' ', '_')}_all_stages.zip"
+        render_job(job_id, f"⬇️ All stages ({n_files} files, .zip)", zip_name, mime="application/zip")
+
+
+def fit_preview(img: Image.Image) -> Image.Image:
+    """Sprite centered on the 256×256 preview canvas (shrunk if larger)"""
+    preview = img.copy()
+    preview.thumbnail((256, 256), Image.LANCZOS)
+    return place_on_canvas(preview, canvas_size=(256, 256))
+
+
+def all_stages_files(sprites, img, include_avatars) -> List[List[str]]:
+    """
+    [cache_name, PNG digest] for every stage's sprite (and avatar): the input of an
+    encode_pack job, which encodes them in one batch and zips them.
+    """
+    avatar_digest = store_png(resize_image(img, AVATAR_SIZE, is_avatar=True)) if include_avatars else None
+    files = []
+    for name, sprite in sprites:
+        files.append([sprite_cache_filename(sprite_cdn_url(name)), store_png(sprite)])
+        if avatar_digest:
+            files.append([sprite_cache_filename(avatar_cdn_url(name)), avatar_digest])
+    return files
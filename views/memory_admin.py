@@ -0,0 +1,74 @@
+"""
+Memory admin view (?admin=memory): process RSS, global caches, per-session state sizes
+and tracemalloc allocation sites
+"""
+import gc
+import tracemalloc
+
+import streamlit as st
+
+from core.memory import format_bytes, rss_bytes, top_allocations
+from memory_accounting import global_sizes, session_sizes, session_states, shared_objects
+
+
+@st.cache_resource(show_spinner=False)
+def _snapshots() -> dict:
+    """Baseline tracemalloc snapshot, kept across reruns for comparisons"""
+    return {}
+
+
+def render_memory_admin():
+    st.header("🧠 Memory")
+    if st.button("🧹 Collect garbage"):
+        gc.collect()
+
+    states = session_states()
+    shared = shared_objects(states)
+    globals_ = global_sizes(shared)
+    sessions = session_sizes(states, shared)
+    session_total = sum(sum(sizes.values()) for sizes in sessions.values())
+
+    c_rss, c_global, c_sessions = st.columns(3)
+    c_rss.metric("Process RSS", format_bytes(rss_bytes()))
+    c_global.metric("Global caches", format_bytes(sum(globals_.values())))
+    c_sessions.metric(f"Session state ({len(sessions)} sessions)", format_bytes(session_total))
+
+    st.subheader("Global caches")
+    st.dataframe(
+        [{"cache": name, "size": format_bytes(size), "bytes": size} for name, size in globals_.items()],
+        hide_index=True, use_container_width=True,
+    )
+
+    st.subheader("Sessions")
+    rows = []
+    for sid, sizes in sessions.items():
+        top = sorted(sizes.items(), key=lambda kv: kv[1], reverse=True)[:3]
+        rows.append({
+            "session": sid[:12], "total": format_bytes(sum(sizes.values())), "bytes": sum(sizes.values()),
+            "largest keys": ", ".join(f"{key} ({format_bytes(size)})" for key, size in top),
+        })
+    rows.sort(key=lambda r: r["bytes"], reverse=True)
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+    if sessions:
+        picked = st.selectbox("Session details", list(sessions), format_func=lambda sid: sid[:12])
+        st.dataframe(
+            [{"key": key, "size": format_bytes(size), "bytes": size}
+             for key, size in sorted(sessions[picked].items(), key=lambda kv: kv[1], reverse=True)],
+            hide_index=True, use_container_width=True,
+        )
+
+    st.subheader("Allocation sites (tracemalloc)")
+    if not tracemalloc.is_tracing():
+        st.info("tracemalloc is off. Start the app with MISCRITS_TRACEMALLOC=1 to see allocation sites.")
+        return
+    snapshots = _snapshots()
+    snapshot = tracemalloc.take_snapshot()
+    c_base, c_clear = st.columns(2)
+    if c_base.button("📌 Set baseline", use_container_width=True):
+        snapshots["baseline"] = snapshot
+    if c_clear.button("Clear baseline", use_container_width=True):
+        snapshots.pop("baseline", None)
+    baseline = snapshots.get("baseline")
+    st.caption("Growth since the baseline" if baseline else "Largest allocation sites")
+    st.dataframe(top_allocations(snapshot, previous=baseline), hide_index=True, use_container_width=True)
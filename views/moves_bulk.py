@@ -0,0 +1,105 @@
+"""
+Bulk edit panel for the Moves Editor: find & replace, batch retype and CSV/JSON round-trip
+"""
+import streamlit as st
+from typing import Optional
+
+from moves_model import (
+    EditHistory, EditOverlay, Patch,
+    apply_batch, parse_rows, replace_changes, row_changes, rows_to_csv, rows_to_json, select_abilities,
+)
+
+# Rows shown in the preview table (the batch always applies to every match)
+PREVIEW_ROWS = 500
+
+
+def _matches(overlay: EditOverlay, query: tuple):
+    """Matching rows, recomputed only when the query or the overlay changes"""
+    cached = st.session_state.get("_bulk_matches")
+    key = (id(overlay), overlay.revision, query)
+    if cached and cached[0] == key:
+        return cached[1]
+    pattern, regex, ui_types, elements = query
+    rows = select_abilities(overlay, pattern, regex, ui_types, elements)
+    st.session_state["_bulk_matches"] = (key, rows)
+    return rows
+
+
+def render_bulk_panel(overlay: EditOverlay, history: EditHistory) -> Optional[Patch]:
+    """
+    Render the bulk edit panel. Returns the applied Patch (one undo step) so the
+    caller can refresh the edited cards and rerun, or None.
+    """
+    ui_types = overlay.ui_types()
+    elements = sorted({m.get("element", "Physical") for m in overlay.base.sorted_miscrits})
+
+    # A form: typing a pattern doesn't rerun the script on every keystroke
+    with st.form("bulk_filter"):
+        c_pat, c_regex = st.columns([0.8, 0.2])
+        with c_pat:
+            pattern = st.text_input("Ability name contains", key="bulk_pattern")
+        with c_regex:
+            regex = st.checkbox("Regex", key="bulk_regex")
+        c_type, c_elem = st.columns(2)
+        with c_type:
+            type_filter = st.multiselect("Type", ui_types, key="bulk_types")
+        with c_elem:
+            element_filter = st.multiselect("Miscrit element", elements, key="bulk_elements")
+        st.form_submit_button("🔍 Preview matches")
+
+    query = (pattern, regex, tuple(type_filter), tuple(element_filter))
+    try:
+        rows = _matches(overlay, query) if any(query[:1] + query[2:]) else []
+    except Exception as e:
+        st.error(f"❌ Invalid pattern: {e}")
+        rows = []
+
+    patch = None
+    if rows:
+        st.caption(f"{len(rows)} matching abilities" + (f" (showing first {PREVIEW_ROWS})" if len(rows) > PREVIEW_ROWS else ""))
+        st.dataframe(rows[:PREVIEW_ROWS], use_container_width=True, hide_index=True)
+
+        # Renaming is opt-in: a type-only batch must never touch names
+        rename = st.checkbox("Find & replace in names", key="bulk_rename")
+        c_find, c_repl, c_set = st.columns(3)
+        with c_find:
+            find = st.text_input("Find in names", key="bulk_find", disabled=not rename)
+        with c_repl:
+            replace = st.text_input("Replace with", key="bulk_replace", disabled=not rename)
+        with c_set:
+            set_type = st.selectbox("Set Type", ["(keep)"] + ui_types, key="bulk_set_type")
+        if not rename:
+            find = replace = ""
+
+        if st.button(f"✏️ Apply to {len(rows)} abilities", type="primary", use_container_width=True):
+            try:
+                changes = replace_changes(rows, find, replace, regex, None if set_type == "(keep)" else set_type)
+            except Exception as e:
+                st.error(f"❌ Invalid pattern: {e}")
+                changes = []
+            if changes:
+                patch = apply_batch(history, changes)
+
+        c_csv, c_json = st.columns(2)
+        with c_csv:
+            st.download_button("⬇️ Matches as CSV", rows_to_csv(rows), file_name="abilities.csv", mime="text/csv", use_container_width=True)
+        with c_json:
+            st.download_button("⬇️ Matches as JSON", rows_to_json(rows), file_name="abilities.json", mime="application/json", use_container_width=True)
+    elif any(query[:1] + query[2:]):
+        st.info("No abilities match.")
+
+    # Round-trip: edit the exported rows in a spreadsheet, then import them back
+    imported = st.file_uploader("📥 Import edited CSV/JSON", type=["csv", "json"], key="bulk_import")
+    if imported is not None and st.button("Apply imported rows", use_container_width=True):
+        try:
+            changes = row_changes(parse_rows(imported.getvalue(), imported.name))
+        except (ValueError, KeyError) as e:
+            st.error(f"❌ Could not read {imported.name}: {e}")
+            changes = []
+        if changes:
+            patch = apply_batch(history, changes)
+
+    if patch is not None and not patch:
+        st.info("Nothing to change.")
+        return None
+    return patch
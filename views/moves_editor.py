@@ -1,49 +1,108 @@
 """
 Move Editor view - Game-Accurate Logic & UI
 """
+import os
 import streamlit as st
-import json
-from typing import List, Dict
+from pathlib import Path
+from typing import Dict, List, Tuple
 from datetime import datetime
 
-from data_loader import load_miscrits_raw
+from data_loader import load_moves_document, share_moves_document
+from json_stream import load_json_array
+from moves_diff import build_patch, dumps_patch, order_changes
+from moves_index import MoveIndex, MoveSearch
+from moves_model import (
+    TYPE_ICON_BASE, EditHistory, EditOverlay, MovesDocument,
+    get_game_icon_name, selector_label, ui_type_to_fields, write_export,
+)
+from config import UNDO_MAX_STEPS, UNDO_MAX_ITEMS, UNDO_COALESCE_SECONDS
+from core import metrics
+from session_manager import commit_workdir_file, get_workdir
+from views.moves_bulk import render_bulk_panel
 from ui_components import display_name
 
-# Base URL for icons
-TYPE_ICON_BASE = "https://worldofmiscrits.com"
-
-# Standard Elements (Imply type="Attack")
-STANDARD_ELEMENTS = [
-    "Physical", "Fire", "Water", "Nature", "Wind", "Earth", 
-    "Lightning", "Misc", "FireWind", "FireEarth", "FireLightning", 
-    "WaterWind", "WaterEarth", "WaterLightning", "NatureWind",
-    "NatureEarth", "NatureLightning"
-]
-
 def init_session_state():
     """Initialize session state variables"""
-    if "temp_miscrits" not in st.session_state:
-        st.session_state["temp_miscrits"] = None
+    # moves_base: shared immutable MovesDocument; moves_overlay: this session's edits
+    if "moves_base" not in st.session_state:
+        st.session_state["moves_base"] = None
+    if "moves_overlay" not in st.session_state:
+        st.session_state["moves_overlay"] = None
     if "temp_miscrits_source" not in st.session_state:
         st.session_state["temp_miscrits_source"] = "unknown"
-    if "_export_json" not in st.session_state:
-        st.session_state["_export_json"] = None
+    # Path of the last prepared export file (in the session workdir)
+    if "_export_path" not in st.session_state:
+        st.session_state["_export_path"] = None
+    # Bounded undo/redo stack over moves_overlay
     if "edit_history" not in st.session_state:
-        st.session_state["edit_history"] = []
+        st.session_state["edit_history"] = None
     if "unsaved_changes" not in st.session_state:
         st.session_state["unsaved_changes"] = False
+    if "temp_miscrits_hash" not in st.session_state:
+        st.session_state["temp_miscrits_hash"] = None
+    if "temp_miscrits_upload_id" not in st.session_state:
+        st.session_state["temp_miscrits_upload_id"] = None
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_move_index(_base: MovesDocument, version: str) -> MoveIndex:
+    """Ability index, built once per shared document version"""
+    return MoveIndex(_base)
+
+
+def get_move_search(overlay: EditOverlay) -> MoveSearch:
+    """This session's search over the index (follows the overlay's edits)"""
+    search = st.session_state.get("_move_search")
+    if search is None or search.overlay is not overlay:
+        search = MoveSearch(get_move_index(overlay.base, overlay.base.version), overlay)
+        st.session_state["_move_search"] = search
+    return search
+
+
+def open_miscrit(label: str):
+    """Point the Miscrit selector at a search result (widget callback)"""
+    st.session_state["miscrit_selector"] = label
+
+
+def get_patch(overlay: EditOverlay) -> Tuple[Dict, List[Dict]]:
+    """
+    Diff of the session's edits and its order changes (with moved abilities),
+    recomputed only when the overlay changes
+    """
+    cached = st.session_state.get("_moves_patch")
+    key = (id(overlay), overlay.revision)
+    if cached and cached[0] == key:
+        return cached[1], cached[2]
+    patch, orders = build_patch(overlay), order_changes(overlay)
+    st.session_state["_moves_patch"] = (key, patch, orders)
+    return patch, orders
+
+
+def start_editing(base: MovesDocument):
+    """Fresh overlay and undo history on top of a shared base document"""
+    overlay = EditOverlay(base)
+    st.session_state["moves_base"] = base
+    st.session_state["moves_overlay"] = overlay
+    st.session_state["edit_history"] = EditHistory(
+        overlay, max_steps=UNDO_MAX_STEPS, max_items=UNDO_MAX_ITEMS,
+        coalesce_window=UNDO_COALESCE_SECONDS,
+    )
+    st.session_state["unsaved_changes"] = False
 
-def log_edit(miscrit_id: int, ability_id: int, field: str, old_value: str, new_value: str):
-    """Log edits for undo functionality"""
-    st.session_state["edit_history"].append({
-        "timestamp": datetime.now().isoformat(),
-        "miscrit_id": miscrit_id,
-        "ability_id": ability_id,
-        "field": field,
-        "old_value": old_value,
-        "new_value": new_value
-    })
-    st.session_state["unsaved_changes"] = True
+
+def reset_card_widgets(touched):
+    """Drop widget state of edited cards so they re-read the overlay"""
+    for miscrit_id, ability_id in touched:
+        st.session_state.pop(f"name_{miscrit_id}_{ability_id}", None)
+        st.session_state.pop(f"ui_type_{miscrit_id}_{ability_id}", None)
+
+
+def undo_redo(action: str):
+    history: EditHistory = st.session_state["edit_history"]
+    patch = history.undo() if action == "undo" else history.redo()
+    if patch is not None:
+        reset_card_widgets(patch.touched())
+        st.session_state["unsaved_changes"] = True
+        st.rerun()
 
 def move_ability(miscrit: Dict, ability_id: int, direction: str):
     """
@@ -53,76 +112,15 @@ def move_ability(miscrit: Dict, ability_id: int, direction: str):
       - Visual UP   = Moving towards the END of the actual list (Index + 1)
       - Visual DOWN = Moving towards the START of the actual list (Index - 1)
     """
-    order = miscrit.get("ability_order", [])
-    if not order:
-        return
-
-    try:
-        idx = order.index(ability_id)
-        
-        # Visual UP (Real Index + 1)
-        if direction == "up":
-            if idx < len(order) - 1:
-                order[idx], order[idx+1] = order[idx+1], order[idx]
-                st.session_state["unsaved_changes"] = True
-                st.rerun()
-                
-        # Visual DOWN (Real Index - 1)
-        elif direction == "down":
-            if idx > 0:
-                order[idx], order[idx-1] = order[idx-1], order[idx]
-                st.session_state["unsaved_changes"] = True
-                st.rerun()
-                
-    except ValueError:
-        pass
-
-def get_game_icon_name(ability: Dict) -> str:
-    """
-    Replicates the logic from models/Ability.gd get_icon() exactly.
-    """
-    t = ability.get("type", "Attack")
-    e = ability.get("element", "Physical")
-    ap = ability.get("ap", 0)
-    keys = ability.get("keys", [])
-    true_dmg = ability.get("true_dmg", False)
-
-    # 1. Status / Special Logic
-    if t == "Dot" and e != "Misc":
-        return f"{e}_poison"
-    if t == "Hot":
-        return "heal"
-    if t == "ForceSwitch":
-        return "confuse"
-    if true_dmg:
-        return "truedamage"
-
-    # 2. Misc Logic (Buffs/Debuffs)
-    if e == "Misc":
-        if t == "Buff":
-            if ap > 0 and "acc" in keys:
-                return "accuracy_buff"
-            elif ap < 0 and "acc" in keys:
-                return "accuracy_debuff"
-            elif ap > 0:
-                return "buff"
-            elif ap < 0:
-                return "debuff"
-        elif t == "Bot":
-            if ap > 0:
-                return "bot_buff"
-            else:
-                return "bot_debuff"
-        elif t == "Heal":
-            return "heal"
+    history: EditHistory = st.session_state["edit_history"]
 
-    # 3. Attack Logic
-    if t == "Attack":
-        return e
-
-    # 4. Fallback
-    return t
+    # Visual UP (Real Index + 1) / Visual DOWN (Real Index - 1)
+    delta = 1 if direction == "up" else -1 if direction == "down" else 0
+    if delta and history.move(miscrit["id"], ability_id, delta):
+        st.session_state["unsaved_changes"] = True
+        st.rerun()
 
+@metrics.timed()
 def render_moves_editor():
     init_session_state()
     
@@ -213,12 +211,13 @@ def render_moves_editor():
     with st.sidebar:
         st.markdown("### 🎮 Editor Controls")
         
-        if st.session_state["temp_miscrits"]:
-            total_miscrits = len(st.session_state["temp_miscrits"])
+        if st.session_state["moves_base"]:
+            base = st.session_state["moves_base"]
+            total_miscrits = len(base)
             col1, col2 = st.columns(2)
             with col1: st.metric("Miscrits", total_miscrits)
             with col2:
-                total_moves = sum(len(m.get("abilities", [])) for m in st.session_state["temp_miscrits"])
+                total_moves = base.total_moves
                 st.metric("Moves", total_moves)
         
         st.divider()
@@ -226,9 +225,22 @@ def render_moves_editor():
         if st.button("💾 Auto-Save", use_container_width=True, help="Clear unsaved flag"):
             st.session_state["unsaved_changes"] = False
             st.toast("✅ Changes saved!")
+
+        history = st.session_state["edit_history"]
+        col_undo, col_redo = st.columns(2)
+        with col_undo:
+            if st.button("↩️ Undo", use_container_width=True, disabled=not (history and history.can_undo())):
+                undo_redo("undo")
+        with col_redo:
+            if st.button("↪️ Redo", use_container_width=True, disabled=not (history and history.can_redo())):
+                undo_redo("redo")
         
         if st.button("🔄 Reload Data", use_container_width=True):
-            st.session_state["temp_miscrits"] = None
+            st.session_state["moves_base"] = None
+            st.session_state["moves_overlay"] = None
+            st.session_state["edit_history"] = None
+            st.session_state["_move_search"] = None
+            st.session_state["temp_miscrits_hash"] = None
             st.rerun()
 
     # --- Main Content ---
@@ -236,50 +248,91 @@ def render_moves_editor():
         st.markdown("""<div class="unsaved-indicator">● Unsaved Changes</div>""", unsafe_allow_html=True)
 
     # --- Data Loading ---
-    if st.session_state["temp_miscrits"] is None:
+    if st.session_state["moves_base"] is None:
         with st.spinner("🔄 Loading Miscrits data..."):
-            data = load_miscrits_raw("api")
-            if data:
-                st.session_state["temp_miscrits"] = data
+            base = load_moves_document()
+            if base:
+                start_editing(base)
                 st.session_state["temp_miscrits_source"] = "server"
                 st.success("✅ Data loaded successfully!")
 
     uploaded = st.file_uploader("📂 Drag and drop miscrits.json here to override", type=["json"])
-    if uploaded:
+    # The uploader keeps its value across reruns: import each uploaded file only once
+    if uploaded and uploaded.file_id != st.session_state["temp_miscrits_upload_id"]:
+        st.session_state["temp_miscrits_upload_id"] = uploaded.file_id
         try:
-            st.session_state["temp_miscrits"] = json.loads(uploaded.read().decode("utf-8"))
-            st.session_state["temp_miscrits_source"] = "upload"
-            st.session_state["unsaved_changes"] = False
-            st.success("✅ File imported successfully!")
-            st.rerun()
-        except Exception as e:
+            uploaded.seek(0)
+            data, digest = load_json_array(uploaded)
+            if digest != st.session_state["temp_miscrits_hash"]:
+                start_editing(share_moves_document(data, digest))
+                st.session_state["temp_miscrits_hash"] = digest
+                st.session_state["temp_miscrits_source"] = "upload"
+                st.toast("✅ File imported successfully!")
+                st.rerun()
+        except ValueError as e:
             st.error(f"❌ Invalid JSON: {e}")
 
-    miscrits: List[Dict] = st.session_state.get("temp_miscrits")
-    if not miscrits:
+    base = st.session_state.get("moves_base")
+    overlay: EditOverlay = st.session_state.get("moves_overlay")
+    if not base:
         st.error("❌ Could not load Miscrits data.")
         return
 
+    # --- Move Search (whole catalog) ---
+    with st.expander("🔎 Find Moves Across All Miscrits"):
+        query = st.text_input(
+            "Search moves", key="move_search_query", placeholder="e.g. zap  ·  type:buff  ·  icon:fire_poison",
+            help="Words match move names by prefix, or a type/element/icon exactly. Qualify with type:, element: or icon:.",
+        )
+        if query:
+            search = get_move_search(overlay)
+            keys = search.search(query)
+            if not keys:
+                st.info("No moves match.")
+            else:
+                mids = list(dict.fromkeys(mid for mid, _ in keys))
+                st.caption(f"{len(keys)} moves in {len(mids)} Miscrits")
+                st.dataframe(search.rows(keys[:500]), use_container_width=True, hide_index=True)
+                c_pick, c_open = st.columns([3, 1])
+                with c_pick:
+                    labels = [selector_label(base.miscrit(mid)) for mid in mids]
+                    pick = st.selectbox("Miscrit", labels, key="move_search_pick", label_visibility="collapsed")
+                with c_open:
+                    st.button("Open", on_click=open_miscrit, args=(pick,), use_container_width=True)
+
+    # --- Bulk Edit (one undo step, one rerun per batch) ---
+    with st.expander("🧰 Bulk Edit & Find/Replace"):
+        patch = render_bulk_panel(overlay, st.session_state["edit_history"])
+        if patch is not None:
+            reset_card_widgets(set(patch.touched()))
+            st.session_state["unsaved_changes"] = True
+            st.toast(f"Updated {len(patch)} fields")
+            st.rerun()
+
+    # --- Review Changes (diff against the base document) ---
+    patch, orders = get_patch(overlay)
+    with st.expander(f"🧾 Review Changes ({len(patch['changes']) + len(patch['orders'])})"):
+        if not patch["changes"] and not patch["orders"]:
+            st.info("No changes yet.")
+        else:
+            st.caption(f"{len(patch['changes'])} field changes · {len(patch['orders'])} reordered Miscrits · base version `{base.version}`")
+            if patch["changes"]:
+                st.dataframe(patch["changes"], use_container_width=True, hide_index=True)
+            for order in orders:
+                moved = ", ".join(f"{m['ability_id']}: {m['from']}→{m['to']}" for m in order["moved"])
+                st.markdown(f"**{selector_label(base.miscrit(order['miscrit_id']))}** — {moved}")
+            st.download_button(
+                "⬇️ Download patch (.json)", dumps_patch(patch),
+                file_name=f"miscrits_patch_{datetime.now().strftime('%Y%m%d')}.json",
+                mime="application/json", use_container_width=True,
+            )
+
     # --- 1. Miscrit Selector (Searchable Dropdown) ---
     st.markdown("### 1️⃣ Select Miscrit")
     
-    miscrit_options = []
-    id_map = {}
-    miscrits_sorted = sorted(miscrits, key=lambda x: x.get("id", 0))
-    
-    for m in miscrits_sorted:
-        m_id = m.get("id", 0)
-        name_list = m.get("names", [])
-        first_name = name_list[0] if name_list else m.get("name", "Unknown")
-        final_name = name_list[-1] if len(name_list) > 1 else ""
-        
-        if final_name:
-            label = f"{m_id}. {first_name} / {final_name}"
-        else:
-            label = f"{m_id}. {first_name}"
-            
-        miscrit_options.append(label)
-        id_map[label] = m
+    # Labels are built once per shared document
+    miscrit_options = base.selector_options
+    id_map = base.selector_map
     
     selected_label = st.selectbox(
         "Search by ID, First Name, or Final Name...",
@@ -298,17 +351,12 @@ def render_moves_editor():
     st.caption(f"Editing moves for **{selected_label}** (Element: {selected_element})")
     st.caption("ℹ️ Use ⬆️/⬇️ to reorder moves. Top moves appear last in game logic.")
     
-    other_types = {
-        ability["type"]
-        for m in miscrits
-        for ability in m.get("abilities", [])
-        if ability.get("type") != "Attack"
-    }
-    ALL_UI_TYPES = sorted(list(set(STANDARD_ELEMENTS))) + sorted(list(other_types))
+    # Cached on the overlay; type edits update it incrementally
+    ALL_UI_TYPES = overlay.ui_types()
 
     # NOTE: We reverse the order for display (to match game "learned last" order),
     # but the reorder logic handles the underlying list.
-    ability_order_list = selected.get("ability_order", [])
+    ability_order_list = overlay.ability_order(selected)
     display_order = list(reversed(ability_order_list))
     
     abilities_by_id = {a["id"]: a for a in selected.get("abilities", [])}
@@ -317,7 +365,7 @@ def render_moves_editor():
     for ab_id in display_order:
         ability = abilities_by_id.get(ab_id)
         if ability:
-            filtered_abilities.append((ab_id, ability))
+            filtered_abilities.append((ab_id, overlay.resolve_ability(selected["id"], ability)))
     
     if not filtered_abilities:
         st.info("No moves found for this Miscrit.")
@@ -350,11 +398,8 @@ def render_moves_editor():
                 # --- REORDER BUTTONS ---
                 c_up, c_down, c_spacer = st.columns([0.15, 0.15, 0.7])
                 
-                # Logic: Find where this ID is in the REAL list
-                try:
-                    real_idx = ability_order_list.index(ab_id)
-                except ValueError:
-                    real_idx = -1
+                # Logic: Find where this ID is in the REAL list (position map, O(1))
+                real_idx = overlay.position(selected["id"], ab_id)
                 
                 # Visual UP = Real Index + 1 (Towards End)
                 # Disabled if already at the End (Visual Top)
@@ -372,13 +417,7 @@ def render_moves_editor():
                 new_ui_sel = st.session_state.get(key_ui_type, current_ui_val)
                 temp_ability = ability.copy()
                 temp_ability["name"] = live_name
-                
-                if new_ui_sel in STANDARD_ELEMENTS:
-                    temp_ability["type"] = "Attack"
-                    temp_ability["element"] = new_ui_sel
-                else:
-                    temp_ability["type"] = new_ui_sel
-                    temp_ability["element"] = "Misc"
+                temp_ability["type"], temp_ability["element"] = ui_type_to_fields(new_ui_sel)
 
                 icon_name = get_game_icon_name(temp_ability)
                 icon_url = f"{TYPE_ICON_BASE}/{icon_name.lower()}.png"
@@ -398,38 +437,19 @@ def render_moves_editor():
                     new_ui_type = st.selectbox("Type", ALL_UI_TYPES, index=ALL_UI_TYPES.index(current_ui_val), key=key_ui_type, label_visibility="collapsed")
 
                 # --- SAVE ---
-                if new_ui_type in STANDARD_ELEMENTS:
-                    calc_type = "Attack"
-                    calc_element = new_ui_type
-                else:
-                    calc_type = new_ui_type
-                    calc_element = "Misc"
+                # Edits go to this session's overlay; the shared base is never mutated
+                calc_type, calc_element = ui_type_to_fields(new_ui_type)
 
+                history: EditHistory = st.session_state["edit_history"]
                 has_changed = False
                 if new_name != ability.get("name"):
-                    for m in st.session_state["temp_miscrits"]:
-                        if m["id"] == selected["id"]:
-                            for a in m["abilities"]:
-                                if a["id"] == ab_id:
-                                    log_edit(selected["id"], ab_id, "name", a.get("name"), new_name)
-                                    a["name"] = new_name
-                                    has_changed = True
-                                    break
-                            break
+                    has_changed |= history.set_fields(selected["id"], ab_id, {"name": new_name})
 
                 if calc_type != ability.get("type") or calc_element != ability.get("element"):
-                    for m in st.session_state["temp_miscrits"]:
-                         if m["id"] == selected["id"]:
-                            for a in m["abilities"]:
-                                if a["id"] == ab_id:
-                                    log_edit(selected["id"], ab_id, "type", f"{a.get('type')}/{a.get('element')}", f"{calc_type}/{calc_element}")
-                                    a["type"] = calc_type
-                                    a["element"] = calc_element
-                                    has_changed = True
-                                    break
-                            break
+                    has_changed |= history.set_fields(selected["id"], ab_id, {"type": calc_type, "element": calc_element})
                 
                 if has_changed:
+                    st.session_state["unsaved_changes"] = True
                     st.toast(f"Updated: {new_name}")
                 
                 st.markdown("<div style='margin-bottom: 25px;'></div>", unsafe_allow_html=True)
@@ -437,12 +457,33 @@ def render_moves_editor():
     st.divider()
     
     col_ex_1, col_ex_2 = st.columns([3, 1])
+    with col_ex_1:
+        compress = st.checkbox("Compress download (.json.gz)", value=False, key="export_gzip")
     with col_ex_2:
         if st.button("📦 Prepare Download", type="primary", use_container_width=True):
-            one_line = json.dumps(st.session_state["temp_miscrits"], separators=(",", ":"), ensure_ascii=False)
-            st.session_state["_export_json"] = one_line
-            st.session_state["unsaved_changes"] = False
-            st.success("Ready!")
+            export_path = prepare_export(overlay, compress)
+            if commit_workdir_file(export_path):
+                st.session_state["_export_path"] = str(export_path)
+                st.session_state["unsaved_changes"] = False
+                st.success("Ready!")
         
-        if st.session_state.get("_export_json"):
-            st.download_button("⬇️ Download .json", data=st.session_state["_export_json"].encode("utf-8"), file_name=f"miscrits_{datetime.now().strftime('%Y%m%d')}.json", mime="application/json", use_container_width=True)
\ No newline at end of file
+        export_path = st.session_state.get("_export_path")
+        if export_path and Path(export_path).exists():
+            is_gz = export_path.endswith(".gz")
+            file_name = f"miscrits_{datetime.now().strftime('%Y%m%d')}.json" + (".gz" if is_gz else "")
+            with open(export_path, "rb") as f:
+                st.download_button("⬇️ Download .json", data=f, file_name=file_name, mime="application/gzip" if is_gz else "application/json", use_container_width=True)
+
+
+def prepare_export(overlay: EditOverlay, compress: bool) -> Path:
+    """
+    Stream base + overlay into a file in the session workdir.
+    Nothing but the path is kept in session state.
+    """
+    workdir = get_workdir()
+    path = workdir / ("miscrits_export.json.gz" if compress else "miscrits_export.json")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        write_export(overlay, f, compress=compress)
+    os.replace(tmp, path)
+    return path
@@ -6,10 +6,11 @@ import concurrent.futures
 from data_loader import load_miscrits_from_api, load_boss_catalog
 from image_utils import element_icon_url, sprite_cdn_url, load_sprite_on_canvas, show_pil_via_file
 from ui_components import display_name, render_pagination, render_page_header
-from session_manager import get_workdir
-from config import PAGE_SIZE
-from views.moves_editor import render_moves_editor
+from config import PAGE_SIZE, SEARCH_SYNONYMS, SEARCH_RESULT_CACHE_SIZE
+from search_index import SearchIndex
+from core import metrics
 
+@metrics.timed()
 def render_selection_view():
     """Render the main selection interface"""
     st.header("Step 1: Choose Task")
@@ -27,6 +28,8 @@ def render_selection_view():
     
     # A. Move Editor Route
     if dataset == "Moves Editor":
+        # Imported on first use: the sprite routes never pay for the editor's modules
+        from views.moves_editor import render_moves_editor
         render_moves_editor()
         return
 
@@ -42,20 +45,11 @@ def render_selection_view():
         st.error(f"Could not load {dataset.lower()} catalog")
         st.stop()
     
-    # Filter Catalog for Display
-    if dataset == "Miscrits":
-        # Group by ID and only show first stage
-        seen_ids = set()
-        display_catalog = []
-        for m in catalog:
-            if m["id"] not in seen_ids and m["evo_stage"] == 1:
-                seen_ids.add(m["id"])
-                display_catalog.append(m)
-    else:
-        display_catalog = catalog
+    # Search index over the display catalog (first stage only for Miscrits)
+    index = get_search_index(catalog, dataset, catalog.version)
     
     # Search and filters
-    filtered = filter_catalog(display_catalog, dataset, search_ph)
+    filtered = filter_catalog(index, dataset, search_ph)
     
     if not filtered:
         st.caption("No results match your filters.")
@@ -67,10 +61,17 @@ def render_selection_view():
     page_items = filtered[start_idx:end_idx]
     
     # Render grid
-    render_miscrit_grid(page_items, dataset)
+    render_miscrit_grid(page_items, dataset, catalog.version)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_search_index(_catalog, dataset, catalog_version) -> SearchIndex:
+    """Build the search index once per catalog version"""
+    entries = _catalog.first_stages() if dataset == "Miscrits" else _catalog
+    return SearchIndex(entries, SEARCH_SYNONYMS, SEARCH_RESULT_CACHE_SIZE, source=_catalog)
 
 
-def filter_catalog(catalog, dataset, placeholder):
+def filter_catalog(index, dataset, placeholder):
     """Apply search and filter criteria"""
     col_search, col_rarity, col_element = st.columns([2, 1, 1])
     
@@ -80,48 +81,22 @@ def filter_catalog(catalog, dataset, placeholder):
             placeholder=placeholder
         )
     
-    all_rarities = sorted({m.get("rarity", "Common") for m in catalog})
-    all_elements = sorted({m.get("element", "None") for m in catalog})
-    
     with col_rarity:
         rarity_filter = st.multiselect(
             "Rarity" if dataset == "Miscrits" else "Location",
-            all_rarities,
+            index.rarities,
             default=None,
         )
     
     with col_element:
-        element_filter = st.multiselect("Element", all_elements, default=[])
-    
-    # Apply filters
-    filtered = []
-    for m in catalog:
-        if search_term:
-            s = search_term.strip().lower()
-            aliases = {"gb": "global boss", "globalboss": "global boss"}
-            s = aliases.get(s, s)
-            
-            haystack = " ".join([
-                m.get("base_name", m.get("first_name", "")),
-                m.get("evo_name", m.get("final_name", "")),
-                m.get("rarity", ""),
-            ]).lower()
-            
-            if s not in haystack:
-                continue
-        
-        if rarity_filter and m.get("rarity") not in rarity_filter:
-            continue
-        
-        if element_filter and m.get("element") not in element_filter:
-            continue
-        
-        filtered.append(m)
+        element_filter = st.multiselect("Element", index.elements, default=[])
     
-    return filtered
+    # Cached per (query, filters): pagination reruns reuse the same result tuple
+    return index.search(search_term, rarity_filter, element_filter)
 
 
-def fetch_sprite_batch(items, dataset):
+@metrics.timed()
+def fetch_sprite_batch(items, dataset, catalog_version=""):
     """
     Fetch all sprites for the page in parallel.
     Returns a dictionary: { miscrit_id: image_object }
@@ -133,11 +108,13 @@ def fetch_sprite_batch(items, dataset):
         sprite_name = m.get("evo_name") if dataset == "Miscrits" else m.get("first_name")
         url = sprite_cdn_url(sprite_name)
         # load_sprite_on_canvas should ideally be cached in image_utils
-        return m["id"], load_sprite_on_canvas(url, canvas_size=(256, 256))
+        return m["id"], load_sprite_on_canvas(url, canvas_size=(256, 256), catalog_version=catalog_version)
 
     # Run in parallel using threads
     with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
-        future_to_id = {executor.submit(fetch_one, m): m["id"] for m in items}
+        # Workers record into this run's trace (the sidebar debug panel)
+        fetch = metrics.propagate(fetch_one)
+        future_to_id = {executor.submit(fetch, m): m["id"] for m in items}
         for future in concurrent.futures.as_completed(future_to_id):
             try:
                 mid, img = future.result()
@@ -148,14 +125,12 @@ def fetch_sprite_batch(items, dataset):
     return results
 
 
-def render_miscrit_grid(page_items, dataset):
+def render_miscrit_grid(page_items, dataset, catalog_version=""):
     """Render the grid of miscrit cards"""
-    workdir = get_workdir()
-    
     # 1. OPTIMIZATION: Fetch all images in parallel first
     # This prevents the "loading one by one" visual effect
     with st.spinner("Loading sprites..."):
-        images_map = fetch_sprite_batch(page_items, dataset)
+        images_map = fetch_sprite_batch(page_items, dataset, catalog_version)
     
     cols = st.columns(4)
     
@@ -164,10 +139,10 @@ def render_miscrit_grid(page_items, dataset):
         with col:
             # Pass the pre-loaded image to the card
             img = images_map.get(m["id"])
-            render_miscrit_card(m, dataset, workdir, preloaded_img=img)
+            render_miscrit_card(m, dataset, preloaded_img=img, catalog_version=catalog_version)
 
 
-def render_miscrit_card(m, dataset, workdir, preloaded_img=None):
+def render_miscrit_card(m, dataset, preloaded_img=None, catalog_version=""):
     """Render a single miscrit card"""
     with st.container(border=True):
         # Header: element icon + name
@@ -201,9 +176,9 @@ def render_miscrit_card(m, dataset, workdir, preloaded_img=None):
         else:
             sprite_name = m.get("evo_name") if dataset == "Miscrits" else m.get("first_name")
             sprite_url = sprite_cdn_url(sprite_name)
-            sprite_img = load_sprite_on_canvas(sprite_url, canvas_size=(256, 256))
+            sprite_img = load_sprite_on_canvas(sprite_url, canvas_size=(256, 256), catalog_version=catalog_version)
             
-        show_pil_via_file(workdir, sprite_img, f"grid_{m['id']}.png", width="stretch")
+        show_pil_via_file(sprite_img, width="stretch")
         
         # Select button
         btn_label = "Select"